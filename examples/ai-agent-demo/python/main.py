@@ -2,19 +2,34 @@
 A2E AI Agent Integration Demo
 
 This script demonstrates how an AI Agent discovers and invokes services
-through the A2E (Agent-to-EveryThing) protocol.
+through the A2E (Agent-to-EveryThing) protocol, using the Python SDK.
 
-本脚本演示 AI Agent 如何通过 A2E 协议发现和调用服务。
+It runs the same workflow twice and prints the end-to-end latency of each:
+  - sequential: discovery → search → protocol → token → execute, one after another
+  - pipelined:  AgentPipeline overlaps discovery and token with search, and
+                prefetches protocols for the top search hits
+
+本脚本演示 AI Agent 如何通过 A2E 协议发现和调用服务，并对比逐步执行与
+流水线执行（并发发现、鉴权与搜索，预取候选服务协议）的端到端延迟。
+
+    python main.py --simulate            # 使用模拟平台离线运行（每次往返 80ms）
+    A2E_BASE_URL=https://... python main.py
 """
 
-import httpx
+import argparse
+import asyncio
 import json
 import os
-import sys
+
+from a2e import AgentPipeline, AsyncA2EClient, ConnectionPool, PipelineResult
+
+from simulated_platform import SimulatedPlatform
 
 
 BASE_URL = os.getenv("A2E_BASE_URL", "https://api.a2e-platform.com")
-API_PREFIX = f"{BASE_URL}/api/v1"
+
+# The user the agent acts for / 代表的用户
+USER_AUTH = ("phone", "13800138000")
 
 
 def print_step(step: int, title: str):
@@ -27,122 +42,86 @@ def print_json(data: dict):
     print(json.dumps(data, indent=2, ensure_ascii=False))
 
 
-def main():
-    """
-    Simulates an AI Agent completing a full service interaction
-    through the A2E protocol.
-    """
-    client = httpx.Client(base_url=API_PREFIX, timeout=30)
-
-    # ── Step 1: Platform Discovery ──────────────────────────────
-    print_step(1, "Platform Discovery / 平台发现")
-    print("AI Agent discovers the A2E platform capabilities...")
-
-    resp = client.get("/open/discovery")
-    if resp.status_code == 200:
-        discovery = resp.json().get("data", {})
-        print(f"Platform: {discovery.get('platform', {}).get('name', 'N/A')}")
-        print(f"Version:  {discovery.get('platform', {}).get('version', 'N/A')}")
-        endpoints = discovery.get("endpoints", {})
-        print(f"Available endpoints: {len(endpoints)}")
-    else:
-        print(f"Discovery failed (status {resp.status_code}), continuing...")
-
-    # ── Step 2: Service Search ──────────────────────────────────
-    print_step(2, "Service Search / 服务搜索")
-    keyword = "奶茶"
-    print(f'AI Agent searches for services with keyword: "{keyword}"')
-
-    resp = client.get("/open/services", params={"keyword": keyword, "page": 1, "size": 5})
-    if resp.status_code != 200:
-        print(f"Search failed with status {resp.status_code}")
-        return
+def print_timeline(label: str, run: PipelineResult):
+    """Show when each call started and finished / 各步骤的起止时间"""
+    print(f"{label}: {run.elapsed:.0f} ms end-to-end")
+    scale = max(run.elapsed, 1) / 40
+    for step, (start, end) in sorted(run.timings.items(), key=lambda t: t[1]):
+        bar = " " * int(start / scale) + "█" * max(1, int((end - start) / scale))
+        print(f"  {step:<28} {start:>6.0f} → {end:>6.0f} ms  |{bar}")
+    print()
 
-    result = resp.json().get("data", {})
-    services = result.get("list", [])
-    print(f"Found {result.get('total', 0)} services:")
-    for svc in services:
-        print(f"  - [{svc.get('id')}] {svc.get('name')}: {svc.get('description', '')[:50]}")
 
-    if not services:
-        print("No services found. Make sure the platform has published services.")
-        return
+def make_client(simulate: bool, latency: float) -> AsyncA2EClient:
+    if not simulate:
+        return AsyncA2EClient(BASE_URL)
+    platform = SimulatedPlatform(latency)
+    return AsyncA2EClient(
+        "http://a2e.simulated",
+        pool=ConnectionPool(async_transport=platform.transport()),
+    )
+
 
-    service = services[0]
-    service_id = service.get("id")
-    print(f"\nAI Agent selects service: {service.get('name')} (ID: {service_id})")
+async def run_workflow(args: argparse.Namespace, pipelined: bool) -> PipelineResult:
+    # A fresh client each time, so neither run benefits from the other's caches.
+    # 每次使用新的客户端，两次运行互不共享缓存
+    async with make_client(args.simulate, args.latency / 1000) as client:
+        pipeline = AgentPipeline(client, prefetch=3)
+        run = pipeline.run if pipelined else pipeline.run_sequential
+        result = await run(args.keyword, "get_menu", {}, auth=USER_AUTH)
+        await pipeline.drain()
+        return result
 
-    # ── Step 3: Get A2E Protocol ────────────────────────────────
-    print_step(3, "Get A2E Protocol / 获取 A2E 协议")
-    print(f"AI Agent retrieves the A2E protocol document for service {service_id}...")
 
-    resp = client.get(f"/open/services/{service_id}/protocol")
-    if resp.status_code != 200:
-        print(f"Failed to get protocol (status {resp.status_code})")
+async def main(args: argparse.Namespace):
+    """
+    Simulates an AI Agent completing a full service interaction
+    through the A2E protocol.
+    """
+    # ── Step 1: Sequential workflow ─────────────────────────────
+    print_step(1, "Sequential Workflow / 逐步执行")
+    print("discovery → search → protocol → token → execute, one round trip at a time...\n")
+    sequential = await run_workflow(args, pipelined=False)
+    print_timeline("Sequential", sequential)
+
+    # ── Step 2: Pipelined workflow ──────────────────────────────
+    print_step(2, "Pipelined Workflow / 流水线执行")
+    print("discovery and token run alongside search; top hits' protocols are prefetched...\n")
+    pipelined = await run_workflow(args, pipelined=True)
+    print_timeline("Pipelined", pipelined)
+
+    # ── Step 3: What the agent learned ──────────────────────────
+    print_step(3, "Result / 结果")
+    run = pipelined
+    if run.discovery:
+        platform = run.discovery.get("platform", {})
+        print(f"Platform: {platform.get('name', 'N/A')} {platform.get('version', '')}")
+
+    print(f'Found {run.search.total} services for "{args.keyword}":')
+    for svc in run.search.list:
+        print(f"  - [{svc.id}] {svc.name}: {svc.description[:50]}")
+    if run.service is None:
+        print("No services found. Make sure the platform has published services.")
         return
 
-    protocol = resp.json().get("data", {})
-    semantic = protocol.get("semantic", {})
-    endpoints = protocol.get("endpoints", [])
-    permissions = protocol.get("permissions", {})
-
-    print("Protocol received! AI Agent now understands the service:")
-    print(f"  Description: {semantic.get('description', 'N/A')[:100]}...")
-    print(f"  Capabilities: {semantic.get('capabilities', [])}")
-    print(f"  Constraints:  {semantic.get('constraints', [])}")
-    print(f"  Endpoints:    {[e.get('name') for e in endpoints]}")
-    print(f"  Required permissions: {[p.get('name') for p in permissions.get('required', [])]}")
-
-    # ── Step 4: Create Consumer Token ───────────────────────────
-    print_step(4, "Authentication / 身份认证")
-    print("AI Agent creates a Consumer Token on behalf of the user...")
-
-    resp = client.post("/open/consumer-tokens", json={
-        "phone": "13800138000",
-        "nickname": "Demo User",
-        "agent_name": "A2E-Demo-Agent",
-        "agent_platform": "demo"
-    })
-
-    if resp.status_code != 200 and resp.status_code != 201:
-        print(f"Token creation failed (status {resp.status_code})")
-        consumer_token = "demo_token"
-    else:
-        token_data = resp.json().get("data", {})
-        consumer_token = token_data.get("token", "demo_token")
-        print(f"Consumer Token obtained: {consumer_token[:20]}...")
-
-    # ── Step 5: Execute Service ─────────────────────────────────
-    print_step(5, "Execute Service / 执行服务")
-    print(f"AI Agent calls service endpoint using Consumer Token...")
-
-    resp = client.post(f"/open/services/{service_id}/execute", json={
-        "consumer_token": consumer_token,
-        "input": {
-            "action": "get_menu"
-        }
-    })
-
-    if resp.status_code == 200:
-        exec_result = resp.json().get("data", {})
-        print(f"Execution status: {exec_result.get('status', 'N/A')}")
-        print("Output:")
-        print_json(exec_result.get("output", {}))
-    else:
-        print(f"Execution returned status {resp.status_code}")
-        print(resp.text[:500])
+    protocol = run.protocol
+    print(f"\nAI Agent selected: {run.service.name} (ID: {run.service.id})")
+    print(f"  Capabilities: {protocol.semantic.capabilities}")
+    print(f"  Constraints:  {protocol.semantic.constraints}")
+    print(f"  Endpoints:    {[e.name for e in protocol.endpoints]}")
+    print(f"\nExecution status: {run.result.status}")
+    print("Output:")
+    print_json(run.result.output)
 
     # ── Summary ─────────────────────────────────────────────────
     print(f"\n{'='*60}")
     print("  Demo Complete / 演示完成")
     print(f"{'='*60}")
-    print("""
-The AI Agent successfully completed the full A2E workflow:
-  1. Discovered the platform
-  2. Searched for services by keyword
-  3. Retrieved the A2E protocol document
-  4. Authenticated on behalf of the user
-  5. Executed a service endpoint
+    saved = sequential.elapsed - pipelined.elapsed
+    print(f"""
+End-to-end latency / 端到端延迟:
+  sequential {sequential.elapsed:>6.0f} ms
+  pipelined  {pipelined.elapsed:>6.0f} ms   ({saved:.0f} ms saved)
 
 In a real scenario, the AI Agent would continue to:
   - Parse the menu and present it to the user
@@ -151,8 +130,12 @@ In a real scenario, the AI Agent would continue to:
   - Handle payment through the platform
 """)
 
-    client.close()
-
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="A2E AI Agent demo")
+    parser.add_argument("--simulate", action="store_true",
+                        help="use a simulated platform instead of A2E_BASE_URL")
+    parser.add_argument("--latency", type=float, default=80,
+                        help="simulated round-trip latency in ms")
+    parser.add_argument("--keyword", default="奶茶")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""
+Simulated A2E platform for running the demo offline.
+
+Every call waits ``latency`` seconds before answering, like a round trip
+to a remote platform, so the sequential and pipelined workflows can be
+compared without network access.
+
+用于离线运行演示的模拟平台：每个请求固定延迟后返回，模拟一次远程往返。
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, Dict
+
+import httpx
+
+SERVICES = [
+    {
+        "id": "demo_tea_shop",
+        "name": "示例奶茶店",
+        "type": "food_delivery",
+        "description": "示例奶茶店，提供各类奶茶、果茶，支持在线点餐和外卖配送",
+        "tags": ["奶茶", "果茶", "外卖"],
+    },
+    {
+        "id": "fruit_tea_lab",
+        "name": "鲜果茶研究所",
+        "type": "food_delivery",
+        "description": "现切鲜果茶，奶茶第二杯半价",
+        "tags": ["奶茶", "果茶"],
+    },
+    {
+        "id": "corner_cafe",
+        "name": "街角咖啡",
+        "type": "food_delivery",
+        "description": "咖啡与奶茶，提供外卖",
+        "tags": ["咖啡", "奶茶"],
+    },
+]
+
+MENU = {
+    "categories": [
+        {"name": "招牌系列", "items": [{"id": 1, "name": "招牌奶茶", "price": 12.0}]},
+        {"name": "鲜果系列", "items": [{"id": 3, "name": "杨枝甘露", "price": 22.0}]},
+    ],
+    "total_count": 2,
+}
+
+
+def _protocol(service: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "version": "1.0.0",
+        "service": {"id": service["id"], "name": service["name"], "type": service["type"]},
+        "semantic": {
+            "description": service["description"],
+            "capabilities": ["在线点餐", "自定义口味", "外卖配送"],
+            "constraints": ["营业时间 9:00-21:00", "配送范围 3 公里内"],
+        },
+        "permissions": {"required": [{"name": "user_phone"}, {"name": "user_address"}]},
+        "endpoints": [
+            {"name": "get_menu", "path": "/api/menu", "method": "GET"},
+            {"name": "create_order", "path": "/api/orders", "method": "POST"},
+            {"name": "get_order_status", "path": "/api/orders/{order_no}", "method": "GET"},
+        ],
+    }
+
+
+class SimulatedPlatform:
+    """Answers the SDK's platform API from fixed data."""
+
+    def __init__(self, latency: float = 0.08):
+        self.latency = latency
+        self.calls = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        path = request.url.path
+        data = self._route(request.method, path, request)
+        if data is None:
+            return httpx.Response(404, json={"code": 404, "message": f"{path} not found"})
+        return httpx.Response(200, json={"code": 0, "data": data})
+
+    def _route(self, method: str, path: str, request: httpx.Request) -> Any:
+        if path == "/api/v1/open/discovery":
+            return {
+                "platform": {"name": "A2E Platform (simulated)", "version": "1.0.0"},
+                "endpoints": {"search": "/api/v1/open/services/search"},
+            }
+        if path == "/api/v1/open/services/search":
+            keyword = json.loads(request.content or b"{}").get("keyword", "")
+            hits = [s for s in SERVICES if keyword in s["description"] + "".join(s["tags"])]
+            return {"total": len(hits), "list": hits}
+        if path == "/api/v1/open/platform/get_user_token":
+            return {"consumer_token": "token_demo_user", "expires_in": 7200}
+        match = re.fullmatch(r"/api/v1/open/services/([^/]+)/(protocol|execute/(\w+))", path)
+        if match is None:
+            return None
+        service = next((s for s in SERVICES if s["id"] == match.group(1)), None)
+        if service is None:
+            return None
+        if match.group(2) == "protocol":
+            return _protocol(service)
+        payload = json.loads(request.content or b"{}")
+        if not payload.get("consumer_token"):
+            return None
+        output = MENU if match.group(3) == "get_menu" else {}
+        return {"execution_id": "exec_demo_001", "status": "success", "output": output}
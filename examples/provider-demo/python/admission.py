@@ -0,0 +1,204 @@
+"""
+准入控制与限流
+
+AdmissionMiddleware 是一个 ASGI 中间件，在请求进入 FastAPI 之前：
+
+1. 按客户端 IP 和已验证的 Consumer Token 分别做令牌桶限流，
+   任一桶耗尽时返回 429 RATE_LIMITED。IP 桶总是生效：请求头可以随意伪造，
+   每次换一个 Token 也绕不过 IP 限额；未验证的 Token 不建桶，
+   随机 Token 不会占满桶表。X-App-ID 无法验证，不参与限流，否则任何人都能
+   冒用别人的 App ID 耗尽其限额
+2. 限制同时处理的请求数，超过 max_concurrency 时立即返回 503 OVERLOADED，
+   而不是让所有请求一起排队、延迟整体恶化
+
+拒绝时响应体与其他 A2E 错误相同（{"detail": {"code", "message"}}），并带
+Retry-After。计数保存在 AdmissionControl 中，可通过 stats() 查看，用来调整限额。
+SSE、长轮询这类长连接只限流，不占用并发名额。
+"""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class RateLimit:
+    """每秒 rate 个请求，最多累积 burst 个"""
+
+    __slots__ = ("rate", "burst")
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+
+
+class AdmissionControl:
+    """令牌桶与并发计数"""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        max_concurrency: int = 256,
+        max_keys: int = 100_000,
+    ):
+        # 键的种类 -> 限额：token（Consumer Token）、ip
+        self.limits = (
+            limits
+            if limits is not None
+            else {
+                "token": RateLimit(10, 20),
+                "ip": RateLimit(20, 40),
+            }
+        )
+        self.max_concurrency = max_concurrency
+        self.max_keys = max_keys
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.overloaded = 0
+        self.rate_limited: Dict[str, int] = {kind: 0 for kind in self.limits}
+        # (种类, 值) -> [剩余令牌, 上次补充时间]
+        self._buckets: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+    def take(self, keys: Iterable[Tuple[str, str]]) -> Optional[Tuple[str, float]]:
+        """
+        为一个请求从各个桶中各取一个令牌
+
+        全部足够时才扣减并返回 None，否则不扣减，返回 (种类, 需等待的秒数)。
+        已被拒绝的请求不再新建后面的桶，因此应把 IP 放在最前面
+        """
+        now = time.monotonic()
+        buckets = []
+        denied: Optional[Tuple[str, float]] = None
+        for key in keys:
+            limit = self.limits.get(key[0])
+            if limit is None:
+                continue
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if denied is not None:
+                    continue
+                bucket = self._buckets[key] = [limit.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+                bucket[1] = now
+            if bucket[0] < 1:
+                wait = (1 - bucket[0]) / limit.rate
+                if denied is None or wait > denied[1]:
+                    denied = (key[0], wait)
+            buckets.append(bucket)
+        if denied is not None:
+            self.rate_limited[denied[0]] += 1
+            return denied
+        for bucket in buckets:
+            bucket[0] -= 1
+        return None
+
+    def enter(self) -> bool:
+        """占用一个并发名额，已满时返回 False"""
+        if self.in_flight >= self.max_concurrency:
+            self.overloaded += 1
+            return False
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+        return True
+
+    def leave(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_concurrency": self.max_concurrency,
+            "admitted": self.admitted,
+            "rate_limited": dict(self.rate_limited),
+            "overloaded": self.overloaded,
+            "buckets": len(self._buckets),
+        }
+
+
+def _error(status: int, code: str, message: str, retry_after: float):
+    body = json.dumps(
+        {"detail": {"code": code, "message": message}}, ensure_ascii=False
+    ).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+    ]
+    return (
+        {"type": "http.response.start", "status": status, "headers": headers},
+        {"type": "http.response.body", "body": body},
+    )
+
+
+class AdmissionMiddleware:
+    """
+    ASGI 中间件
+
+    exempt 中的路径（健康检查、指标）不受限制；路径以 long_lived 中的后缀
+    结尾的请求（SSE、长轮询）只限流，不占用并发名额。verified 判断
+    Consumer Token 是否已通过验证，只有通过的 Token 才按 Token 限流；
+    不传时所有 Token 都按 Token 限流。
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        control: AdmissionControl,
+        exempt: Iterable[str] = ("/health", "/metrics"),
+        long_lived: Iterable[str] = ("/events", "/wait"),
+        verified: Optional[Callable[[str], bool]] = None,
+    ):
+        self.app = app
+        self.control = control
+        self.exempt = frozenset(exempt)
+        self.long_lived = tuple(long_lived)
+        self.verified = verified
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        control = self.control
+        denied = control.take(self._keys(scope))
+        if denied is not None:
+            for message in _error(
+                429, "RATE_LIMITED", "请求过于频繁，请稍后重试", denied[1]
+            ):
+                await send(message)
+            return
+
+        if path.endswith(self.long_lived):
+            control.admitted += 1
+            await self.app(scope, receive, send)
+            return
+
+        if not control.enter():
+            for message in _error(503, "OVERLOADED", "服务繁忙，请稍后重试", 1):
+                await send(message)
+            return
+        control.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            control.leave()
+
+    def _keys(self, scope) -> List[Tuple[str, str]]:
+        keys = []
+        if scope.get("client"):
+            keys.append(("ip", scope["client"][0]))
+        for name, value in scope["headers"]:
+            if name == b"x-consumer-token":
+                token = value.decode("latin-1")
+                if self.verified is None or self.verified(token):
+                    keys.append(("token", token))
+        return keys
@@ -0,0 +1,106 @@
+"""
+订单存储基准测试
+
+多个进程（模拟多个 uvicorn worker）同时向存储写入订单并按订单号读回，
+对比内存存储、逐条提交的 SQLite 与批量提交（group commit）的 SQLite。
+内存存储各进程互不共享，仅作为上限参考。
+
+运行：
+    python bench_orders.py --workers 1,2,4 --orders 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import secrets
+import tempfile
+import time
+from datetime import datetime
+
+from order_store import MemoryOrderStore, OrderStore, SQLiteOrderStore
+
+
+def make_store(kind: str, path: str) -> OrderStore:
+    if kind == "memory":
+        return MemoryOrderStore()
+    return SQLiteOrderStore(path, max_batch=1 if kind == "sqlite-单条提交" else 256)
+
+
+def make_order(worker: int, i: int) -> dict:
+    return {
+        "order_no": f"A2E{worker:02d}{i:08d}{secrets.token_hex(3).upper()}",
+        "user_id": f"user_{i % 1000}",
+        "items": [{"product_id": 1, "product_name": "招牌奶茶", "quantity": 2}],
+        "total_amount": 24.0,
+        "address": "示例地址",
+        "phone": "13800000000",
+        "status": "pending_payment",
+        "status_text": "待支付",
+        "created_at": datetime.now().isoformat(),
+    }
+
+
+async def drive(kind: str, path: str, worker: int, orders: int, concurrency: int):
+    store = make_store(kind, path)
+    jobs = iter(range(orders))
+
+    async def client():
+        for i in jobs:
+            order = make_order(worker, i)
+            await store.create(order)
+            assert await store.get(order["order_no"]) is not None
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    await store.close()
+
+
+def worker_main(kind, path, worker, orders, concurrency, ready, start):
+    ready.wait()
+    start.wait()
+    asyncio.run(drive(kind, path, worker, orders, concurrency))
+
+
+def run(kind: str, workers: int, orders: int, concurrency: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "orders.db")
+        if kind != "memory":
+            # 先建表，避免各进程同时初始化
+            asyncio.run(make_store(kind, path).close())
+        ready = multiprocessing.Barrier(workers + 1)
+        start = multiprocessing.Event()
+        procs = [
+            multiprocessing.Process(
+                target=worker_main,
+                args=(kind, path, w, orders, concurrency, ready, start),
+            )
+            for w in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        ready.wait()
+        begin = time.perf_counter()
+        start.set()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - begin
+    return workers * orders / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单存储基准测试")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--orders", type=int, default=5000, help="每个进程写入的订单数")
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="每个进程的并发请求数"
+    )
+    args = parser.parse_args()
+
+    for kind in ("memory", "sqlite-单条提交", "sqlite-批量提交"):
+        for workers in [int(w) for w in args.workers.split(",")]:
+            rate = run(kind, workers, args.orders, args.concurrency)
+            print(f"{kind:<14} workers={workers:<3} {rate:>9.0f} 订单/秒（写入并读回）")
+
+
+if __name__ == "__main__":
+    main()
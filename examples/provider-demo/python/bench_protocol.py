@@ -0,0 +1,112 @@
+"""
+协议端点基准测试
+
+在进程内（httpx.ASGITransport，不经过网络）对比：
+- 旧实现：每次请求构造并序列化协议字典
+- 新实现：预序列化 JSON、gzip 预压缩、If-None-Match 命中 304
+
+运行：
+    python bench_protocol.py --requests 5000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+import httpx
+from fastapi import FastAPI
+
+from main import ADMISSION, PROTOCOL, app
+
+# 压测时关闭限流，只测协议端点本身
+ADMISSION.limits.clear()
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/api/a2e/protocol")
+async def legacy_protocol():
+    """改造前的实现，仅用于对比"""
+    return {
+        "version": "1.0.0",
+        "service": {
+            "id": "demo_tea_shop",
+            "name": "示例奶茶店",
+            "type": "food_delivery",
+        },
+        "semantic": {
+            "description": "示例奶茶店，提供各类奶茶、果茶",
+            "capabilities": ["在线点餐", "自定义口味", "外卖配送"],
+        },
+        "endpoints": [
+            {"name": "get_menu", "path": "/api/menu", "method": "GET"},
+            {"name": "create_order", "path": "/api/orders", "method": "POST"},
+            {
+                "name": "get_order_status",
+                "path": "/api/orders/{order_no}",
+                "method": "GET",
+            },
+        ],
+    }
+
+
+full_app = FastAPI()
+
+
+@full_app.get("/api/a2e/protocol")
+async def full_protocol():
+    """每次请求序列化完整的 protocol.yaml 内容"""
+    return PROTOCOL.data
+
+
+async def run(
+    target: FastAPI,
+    headers: Dict[str, str],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://demo") as client:
+        jobs = iter(range(requests))
+        sizes = []
+
+        async def worker():
+            for _ in jobs:
+                response = await client.get("/api/a2e/protocol", headers=headers)
+                sizes.append(int(response.headers.get("content-length", 0)))
+
+        for _ in range(50):  # 预热
+            await client.get("/api/a2e/protocol", headers=headers)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {"req_per_s": requests / elapsed, "bytes": sizes[-1] if sizes else 0}
+
+
+async def main(requests: int, concurrency: int):
+    cases = [
+        (
+            "旧实现（每次序列化，仅部分字段）",
+            legacy_app,
+            {"Accept-Encoding": "identity"},
+        ),
+        ("每次序列化完整协议", full_app, {"Accept-Encoding": "identity"}),
+        ("新实现 identity", app, {"Accept-Encoding": "identity"}),
+        ("新实现 gzip", app, {"Accept-Encoding": "gzip"}),
+        ("新实现 If-None-Match -> 304", app, {"If-None-Match": PROTOCOL.etag}),
+    ]
+    for label, target, headers in cases:
+        result = await run(target, headers, requests, concurrency)
+        print(
+            f"{label:<34} {result['req_per_s']:>9.0f} req/s"
+            f"  响应体 {result['bytes']:>6} 字节"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="协议端点基准测试")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,104 @@
+"""
+幂等键
+
+create_order 携带 Idempotency-Key 时，同一用户的同一个键只会创建一个订单：
+
+- 首次请求正常执行，成功的响应保存 ttl 秒，之后的重复请求直接返回保存的响应
+- 首次请求尚未完成时到达的重复请求等待它完成，共享同一结果
+- 同一个键配上不同的请求体视为客户端错误（IdempotencyKeyReusedError）
+- 首次请求失败时不保存，客户端可以用同一个键重试
+
+记录保存在进程内，超过 maxsize 时淘汰最早的记录；多个 worker 部署时需要
+把记录放到共享存储中。
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class IdempotencyKeyReusedError(Exception):
+    """同一个幂等键用于不同的请求"""
+
+
+class _Record:
+    __slots__ = ("fingerprint", "future", "expires_at")
+
+    def __init__(self, fingerprint: str, future: "asyncio.Future[Any]"):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.expires_at: Optional[float] = None  # 完成前为 None
+
+
+def fingerprint(body: bytes) -> str:
+    """请求体摘要，用于识别同一个键下的不同请求"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyStore:
+    """按 (用户, 幂等键) 保存响应"""
+
+    def __init__(self, maxsize: int = 100_000, ttl: float = 24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.replayed = 0
+        self.joined = 0
+        self._records: "OrderedDict[Hashable, _Record]" = OrderedDict()
+
+    async def run(
+        self,
+        key: Hashable,
+        request_fingerprint: str,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """
+        执行 func 或返回同一个键保存的结果
+
+        返回 (结果, 是否为重放)
+        """
+        self._expire()
+        record = self._records.get(key)
+        if record is not None:
+            if record.fingerprint != request_fingerprint:
+                raise IdempotencyKeyReusedError(key)
+            if record.expires_at is None:
+                self.joined += 1
+            else:
+                self.replayed += 1
+            return await asyncio.shield(record.future), True
+
+        # 在独立任务中执行：首个请求断开连接时订单照常创建，重复请求仍能拿到结果
+        task = asyncio.ensure_future(func())
+        record = self._records[key] = _Record(request_fingerprint, task)
+        task.add_done_callback(lambda t: self._finished(key, record, t))
+        return await asyncio.shield(task), False
+
+    def _finished(self, key: Hashable, record: _Record, task: asyncio.Future) -> None:
+        if task.cancelled() or task.exception() is not None:
+            # 失败不保存，客户端可以用同一个键重试
+            if self._records.get(key) is record:
+                del self._records[key]
+            return
+        record.expires_at = time.monotonic() + self.ttl
+        if self._records.get(key) is record:
+            self._records.move_to_end(key)
+        while len(self._records) > self.maxsize:
+            self._records.popitem(last=False)
+
+    def _expire(self) -> None:
+        # 记录完成时移到末尾，最早过期的在最前面；进行中的记录排在前面时留到下次清理
+        now = time.monotonic()
+        while self._records:
+            record = next(iter(self._records.values()))
+            if record.expires_at is None or record.expires_at > now:
+                break
+            self._records.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self._records),
+            "replayed": self.replayed,
+            "joined": self.joined,
+        }
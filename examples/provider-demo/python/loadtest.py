@@ -0,0 +1,233 @@
+"""
+服务端点压测
+
+按设定的到达速率（泊松到达，开环：不因服务变慢而减少请求）混合调用
+get_menu、create_order、get_order_status，统计每个端点的吞吐、状态码 /
+错误码（SHOP_CLOSED、MIN_AMOUNT_NOT_MET 等）与 p50 / p99 延迟。
+延迟从计划发出的时刻算起，服务端排队的时间也计算在内。
+
+目标可以是进程内的 FastAPI 应用（httpx.ASGITransport，不经过网络），
+也可以是本机运行的服务：
+
+    python loadtest.py --rates 50,100,200 --duration 10
+    SHOP_OPEN=always uvicorn main:app --workers 4 &
+    python loadtest.py --url http://localhost:8000 --rates 200,400,800
+
+--shop-open 控制进程内运行时的营业状态；压测已运行的服务时通过它的
+环境变量 SHOP_OPEN=always 设置。服务端按 Consumer Token 限流，
+--users 决定使用多少个不同的 Token。
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ENDPOINTS = ("get_menu", "create_order", "get_order_status")
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.outcomes: Counter = Counter()
+
+    def record(self, latency: float, outcome: str) -> None:
+        self.latencies.append(latency)
+        self.outcomes[outcome] += 1
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+
+class LoadTest:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        mix: Dict[str, float],
+        users: int,
+        invalid: float,
+        max_in_flight: int,
+    ):
+        self.client = client
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.tokens = [f"token_load_{i}" for i in range(users)]
+        self.invalid = invalid
+        self.max_in_flight = max_in_flight
+        self.order_nos: List[Tuple[str, str]] = []  # (token, order_no)
+
+    def _order(self) -> dict:
+        items = [{"product_id": random.randint(1, 4), "quantity": random.randint(1, 3)}]
+        if random.random() < self.invalid:
+            items = [{"product_id": 1, "quantity": 0}]  # 触发 MIN_AMOUNT_NOT_MET
+        return {"items": items, "address": "压测地址", "phone": "13800000000"}
+
+    async def _call(self, name: str) -> Tuple[str, Optional[httpx.Response]]:
+        token = random.choice(self.tokens)
+        if name == "get_order_status" and not self.order_nos:
+            name = "create_order"
+        if name == "get_menu":
+            response = await self.client.get(
+                "/api/menu", headers={"X-Consumer-Token": token}
+            )
+            return name, response
+        if name == "create_order":
+            response = await self.client.post(
+                "/api/orders", json=self._order(), headers={"X-Consumer-Token": token}
+            )
+            if response.status_code == 200:
+                self.order_nos.append((token, response.json()["order_no"]))
+            return name, response
+        token, order_no = random.choice(self.order_nos)
+        response = await self.client.get(
+            f"/api/orders/{order_no}", headers={"X-Consumer-Token": token}
+        )
+        return name, response
+
+    async def _one(self, scheduled: float, stats: Dict[str, EndpointStats]) -> None:
+        name = random.choices(self.names, self.weights)[0]
+        try:
+            name, response = await self._call(name)
+            outcome = _outcome(response)
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        stats[name].record(time.perf_counter() - scheduled, outcome)
+
+    async def stage(
+        self, rate: float, duration: float
+    ) -> Tuple[Dict[str, EndpointStats], int, float]:
+        """以 rate 请求/秒运行 duration 秒，返回 (各端点统计, 丢弃数, 实际耗时)"""
+        stats = {name: EndpointStats() for name in ENDPOINTS}
+        tasks = set()
+        dropped = 0
+        start = time.perf_counter()
+        scheduled = start
+        while scheduled < start + duration:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= self.max_in_flight:
+                dropped += 1
+            else:
+                task = asyncio.create_task(self._one(scheduled, stats))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            scheduled += random.expovariate(rate)
+        await asyncio.gather(*tasks)
+        return stats, dropped, time.perf_counter() - start
+
+
+def _outcome(response: httpx.Response) -> str:
+    """200，或 A2E 错误码，或 HTTP 状态码"""
+    if response.status_code < 400:
+        return str(response.status_code)
+    try:
+        detail = response.json().get("detail")
+    except ValueError:
+        detail = None
+    if isinstance(detail, dict) and "code" in detail:
+        return detail["code"]
+    return str(response.status_code)
+
+
+def report(
+    rate: float, stats: Dict[str, EndpointStats], dropped: int, elapsed: float
+) -> None:
+    total = sum(len(s.latencies) for s in stats.values())
+    print(
+        f"\n到达速率 {rate:g}/s  完成 {total} 个请求  吞吐 {total / elapsed:.0f}/s"
+        f"  丢弃 {dropped}（超过最大并发）"
+    )
+    for name, s in stats.items():
+        if not s.latencies:
+            continue
+        ok = s.outcomes.get("200", 0)
+        outcomes = "  ".join(f"{k}={v}" for k, v in s.outcomes.most_common())
+        print(
+            f"  {name:<17} {ok / elapsed:>7.0f} 成功/秒"
+            f"  p50 {s.percentile(50):>7.1f} ms  p99 {s.percentile(99):>7.1f} ms  {outcomes}"
+        )
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"未知端点 {name}，可选 {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight)
+    return mix
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=30,
+            limits=httpx.Limits(max_connections=args.max_in_flight),
+        )
+    else:
+        import main as provider
+
+        if args.shop_open != "real":
+            provider.check_shop_open = lambda: args.shop_open == "open"
+        if args.no_limits:
+            provider.ADMISSION.limits.clear()
+        else:
+            # 进程内的请求都来自同一个客户端地址，只保留按 Token 的限流
+            provider.ADMISSION.limits.pop("ip", None)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=provider.app), base_url="http://provider"
+        )
+    async with client:
+        test = LoadTest(
+            client, parse_mix(args.mix), args.users, args.invalid, args.max_in_flight
+        )
+        for rate in [float(r) for r in args.rates.split(",")]:
+            report(rate, *await test.stage(rate, args.duration))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="服务端点压测")
+    parser.add_argument(
+        "--url", help="压测已运行的服务，例如 http://localhost:8000；不填则在进程内运行"
+    )
+    parser.add_argument(
+        "--rates", default="50,100,200", help="依次运行的到达速率（请求/秒）"
+    )
+    parser.add_argument("--duration", type=float, default=10, help="每个速率运行的秒数")
+    parser.add_argument(
+        "--mix",
+        default="get_menu=5,create_order=2,get_order_status=3",
+        help="各端点的请求比例",
+    )
+    parser.add_argument(
+        "--users", type=int, default=1000, help="使用的 Consumer Token 数"
+    )
+    parser.add_argument(
+        "--invalid",
+        type=float,
+        default=0.05,
+        help="create_order 中故意不满足起送金额的比例",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=1000,
+        help="同时未完成的请求上限，超过时丢弃新到达的请求",
+    )
+    parser.add_argument(
+        "--shop-open",
+        choices=("open", "closed", "real"),
+        default="open",
+        help="进程内运行时的营业状态，real 表示按实际时间",
+    )
+    parser.add_argument("--no-limits", action="store_true", help="进程内运行时关闭限流")
+    asyncio.run(main(parser.parse_args()))
@@ -4,16 +4,62 @@
 演示奶茶店如何创建符合 A2E 协议的服务
 """
 
-from fastapi import FastAPI, Header, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from pathlib import Path
+import json
+import os
 import secrets
 
+import httpx
+
+from protocol_doc import InvalidProtocolError, ProtocolDocument
+from order_store import (
+    DuplicateOrderError,
+    InvalidTransitionError,
+    OrderStore,
+    open_order_store,
+)
+from menu_catalog import MenuCatalog
+from order_events import TERMINAL_STATUSES, OrderEventBus
+from admission import AdmissionControl, AdmissionMiddleware, RateLimit
+from idempotency import IdempotencyKeyReusedError, IdempotencyStore, fingerprint
+from token_verifier import (
+    HTTPPlatformClient,
+    InvalidTokenError,
+    PlatformUnavailableError,
+    TokenVerifier,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await ORDERS.close()
+    await TOKENS.platform.aclose()
+
+
 app = FastAPI(
     title="示例奶茶店 API",
     description="A2E协议服务提供商示例",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# 准入控制：按客户端 IP 与已验证的 Consumer Token 限流，并限制同时处理的请求数
+# （中间件在下方 TOKENS 创建后注册）。IP_RATE_LIMIT 为每个 IP 每秒的请求数，NAT / 网关后的
+# 多个用户共用一个 IP，需按部署情况调整
+IP_RATE_LIMIT = float(os.environ.get("IP_RATE_LIMIT", "50"))
+ADMISSION = AdmissionControl(
+    limits={
+        "token": RateLimit(10, burst=20),
+        "ip": RateLimit(IP_RATE_LIMIT, burst=2 * IP_RATE_LIMIT),
+    },
+    max_concurrency=int(os.environ.get("MAX_CONCURRENCY", "256")),
 )
 
 # ============ 数据模型 ============
@@ -50,6 +96,14 @@ class CreateOrderRequest(BaseModel):
     note: Optional[str] = None
 
 
+class BatchCreateOrderRequest(BaseModel):
+    orders: List[CreateOrderRequest] = Field(..., min_length=1, max_length=100)
+
+
+class UpdateStatusRequest(BaseModel):
+    status: str
+
+
 class OrderResponse(BaseModel):
     order_no: str
     total_amount: float
@@ -96,14 +150,76 @@ MENU: List[Product] = [
     ),
 ]
 
-# 订单存储（模拟数据库）
-ORDERS: Dict[str, dict] = {}
+# 菜单目录：商品索引、可选项集合与 get_menu 响应，修改 MENU 后调用 CATALOG.refresh(MENU)
+CATALOG = MenuCatalog(MENU)
+
+# 订单存储，例如 ORDER_STORE=sqlite:///orders.db（多个 worker 可共用一个文件）
+ORDERS: OrderStore = open_order_store(os.environ.get("ORDER_STORE", "memory://"))
+
+# 协议文档：启动时解析一次 protocol.yaml，预序列化、预压缩
+PROTOCOL = ProtocolDocument(Path(__file__).resolve().parent.parent / "protocol.yaml")
+
+
+def create_platform_client() -> HTTPPlatformClient:
+    """
+    A2E 平台客户端
+
+    设置 A2E_PLATFORM_URL 时调用真实平台，否则在进程内调用 platform_stub 替身
+    """
+    app_id = os.environ.get("A2E_APP_ID", "")
+    app_secret = os.environ.get("A2E_APP_SECRET", "")
+    url = os.environ.get("A2E_PLATFORM_URL")
+    if url:
+        return HTTPPlatformClient(url, app_id, app_secret)
+    import platform_stub
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=platform_stub.app))
+    return HTTPPlatformClient("http://platform", app_id, app_secret, client=client)
+
+
+# 订单状态推送：状态变化时通知 SSE / 长轮询的订阅者
+EVENTS = OrderEventBus()
+
+STATUS_TEXT = {
+    "pending_payment": "待支付",
+    "paid": "已支付",
+    "preparing": "制作中",
+    "delivering": "配送中",
+    "completed": "已完成",
+    "cancelled": "已取消",
+}
+
+# 订单正常流转的顺序，状态只能向后变更（可跳过中间状态）；未结束的订单可随时取消
+STATUS_FLOW = ["pending_payment", "paid", "preparing", "delivering", "completed"]
+
+# 幂等键：同一用户的同一个 Idempotency-Key 只创建一个订单，重复请求返回首次的响应
+IDEMPOTENCY = IdempotencyStore()
+
+# 订单号冲突时最多尝试保存的次数
+ORDER_NO_ATTEMPTS = 5
+
+# SSE 心跳间隔（秒），防止代理断开空闲连接
+SSE_HEARTBEAT = 15.0
+
+# Token 验证：缓存验证结果，同一 Token 的并发验证只请求平台一次
+TOKENS = TokenVerifier(create_platform_client())
+
+# 只有验证通过的 Token 才单独建桶，随机伪造的 Token 只计入 IP 限额
+app.add_middleware(AdmissionMiddleware, control=ADMISSION, verified=TOKENS.is_verified)
 
 
 # ============ 工具函数 ============
 
 def check_shop_open() -> bool:
-    """检查店铺是否营业"""
+    """
+    检查店铺是否营业
+
+    环境变量 SHOP_OPEN=always / never 可忽略营业时间（压测、演示用）
+    """
+    override = os.environ.get("SHOP_OPEN")
+    if override == "always":
+        return True
+    if override == "never":
+        return False
     hour = datetime.now().hour
     return 9 <= hour < 21
 
@@ -115,27 +231,95 @@ def generate_order_no() -> str:
     return f"A2E{now}{random_part}"
 
 
-def verify_consumer_token(token: str) -> dict:
+def unique_order_no(taken: set) -> str:
+    """生成一个不在 taken 中的订单号"""
+    order_no = generate_order_no()
+    while order_no in taken:
+        order_no = generate_order_no()
+    return order_no
+
+
+async def save_orders(orders: List[dict]) -> None:
+    """
+    在同一事务中保存订单
+
+    订单号的随机部分在同一秒内可能与已有订单重复（包括其他 worker 刚创建的），
+    冲突时为该订单重新生成订单号后重试，多次仍冲突返回 409
+    """
+    for _ in range(ORDER_NO_ATTEMPTS):
+        try:
+            await ORDERS.create_many(orders)
+            return
+        except DuplicateOrderError as e:
+            taken = {order["order_no"] for order in orders}
+            for order in orders:
+                if order["order_no"] == e.order_no:
+                    order["order_no"] = unique_order_no(taken)
+    raise HTTPException(status_code=409, detail={
+        "code": "ORDER_NO_CONFLICT",
+        "message": "订单号冲突，请重试"
+    })
+
+
+async def verify_consumer_token(token: str) -> dict:
     """
     验证 Consumer Token
-    
-    实际应用中需要：
-    1. 调用 A2E 平台 API 验证 Token 有效性
-    2. 获取 Token 关联的用户信息
+
+    通过 A2E 平台验证 Token 有效性并获取关联的用户信息，结果由 TOKENS 缓存
     """
-    if not token or not token.startswith("token_"):
+    if not token:
         raise HTTPException(status_code=401, detail={
             "code": "INVALID_TOKEN",
             "message": "无效的用户Token"
         })
-    
-    # 模拟返回用户信息
+    try:
+        return await TOKENS.verify(token)
+    except InvalidTokenError as e:
+        raise HTTPException(status_code=401, detail={
+            "code": e.code,
+            "message": e.message
+        })
+    except PlatformUnavailableError:
+        raise HTTPException(status_code=503, detail={
+            "code": "AUTH_UNAVAILABLE",
+            "message": "暂时无法验证用户身份，请稍后重试"
+        })
+
+
+def order_event(order: dict) -> dict:
+    """推送给订阅者的订单状态"""
     return {
-        "user_id": "user_12345",
-        "nickname": "张三"
+        "order_no": order["order_no"],
+        "status": order["status"],
+        "status_text": order["status_text"],
+        "estimated_time": order.get("estimated_time"),
     }
 
 
+def previous_statuses(status: str) -> List[str]:
+    """可以变更为 status 的当前状态"""
+    if status == "cancelled":
+        return [s for s in STATUS_FLOW if s not in TERMINAL_STATUSES]
+    return STATUS_FLOW[:STATUS_FLOW.index(status)]
+
+
+async def get_user_order(order_no: str, token: str) -> dict:
+    """验证 Token 并返回属于该用户的订单"""
+    user_info = await verify_consumer_token(token)
+    order = await ORDERS.get(order_no)
+    if order is None:
+        raise HTTPException(status_code=404, detail={
+            "code": "ORDER_NOT_FOUND",
+            "message": f"订单 {order_no} 不存在"
+        })
+    if order["user_id"] != user_info["user_id"]:
+        raise HTTPException(status_code=403, detail={
+            "code": "ACCESS_DENIED",
+            "message": "无权访问此订单"
+        })
+    return order
+
+
 # ============ API 端点 ============
 
 @app.get("/api/menu")
@@ -144,32 +328,17 @@ async def get_menu(category: Optional[str] = Query(None, description="按分类
     获取菜单
     
     A2E 协议端点: get_menu
+    响应体由 CATALOG 预先序列化，按分类整理
     """
-    menu = MENU
-    
-    if category:
-        menu = [p for p in MENU if p.category == category]
-    
-    # 按分类组织
-    categories: Dict[str, list] = {}
-    for product in menu:
-        if product.category not in categories:
-            categories[product.category] = []
-        categories[product.category].append(product.model_dump())
-    
-    return {
-        "categories": [
-            {"name": name, "items": items}
-            for name, items in categories.items()
-        ],
-        "total_count": len(menu)
-    }
+    return Response(content=CATALOG.menu_json(category), media_type="application/json")
 
 
 @app.post("/api/orders", response_model=OrderResponse)
 async def create_order(
     request: CreateOrderRequest,
-    x_consumer_token: str = Header(..., description="A2E平台用户Token")
+    response: Response,
+    x_consumer_token: str = Header(..., description="A2E平台用户Token"),
+    idempotency_key: Optional[str] = Header(None, description="幂等键，重试时保持不变")
 ):
     """
     创建订单
@@ -177,39 +346,85 @@ async def create_order(
     A2E 协议端点: create_order
     需要用户授权: user_phone, user_address
     需要支付: 是
+
+    携带 Idempotency-Key 时可安全重试：同一个键的重复请求（包括首次请求
+    尚未完成时到达的）返回首次创建的订单，响应头 Idempotent-Replayed: true
     """
     # 1. 验证 Token
-    user_info = verify_consumer_token(x_consumer_token)
-    
+    user_info = await verify_consumer_token(x_consumer_token)
+
+    if idempotency_key is None:
+        return await place_order(request, user_info)
+    check_idempotency_key(idempotency_key)
+    try:
+        result, replayed = await IDEMPOTENCY.run(
+            (user_info["user_id"], idempotency_key),
+            fingerprint(request.model_dump_json().encode("utf-8")),
+            lambda: place_order(request, user_info),
+        )
+    except IdempotencyKeyReusedError:
+        raise HTTPException(status_code=422, detail={
+            "code": "IDEMPOTENCY_KEY_REUSED",
+            "message": "该 Idempotency-Key 已用于另一个不同的请求"
+        })
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+def check_idempotency_key(key: str) -> None:
+    """Idempotency-Key 须为 1-255 个可见 ASCII 字符，create_order 与 create_orders 共用"""
+    if not (0 < len(key) <= 255 and key.isascii() and key.isprintable()):
+        raise HTTPException(status_code=400, detail={
+            "code": "INVALID_IDEMPOTENCY_KEY",
+            "message": "Idempotency-Key 应为 1-255 个可见 ASCII 字符"
+        })
+
+
+async def place_order(request: CreateOrderRequest, user_info: dict) -> OrderResponse:
+    """校验并创建订单"""
     # 2. 检查营业时间
+    ensure_shop_open()
+
+    # 3-5. 验证商品与起送金额，生成订单
+    order = build_order(request, user_info)
+    await save_orders([order])
+    EVENTS.publish(order["order_no"], order_event(order))
+    return created_response(order)
+
+
+def ensure_shop_open() -> None:
     if not check_shop_open():
         raise HTTPException(status_code=400, detail={
             "code": "SHOP_CLOSED",
             "message": "店铺已打烊，营业时间为 9:00-21:00"
         })
-    
+
+
+def build_order(request: CreateOrderRequest, user_info: dict) -> dict:
+    """按 CATALOG 校验商品与选项并生成订单（尚未保存），不合法时抛出 HTTPException"""
     # 3. 验证商品
-    product_map = {p.id: p for p in MENU}
     total_amount = 0.0
     order_items = []
     
     for item in request.items:
-        if item.product_id not in product_map:
+        entry = CATALOG.get(item.product_id)
+        if entry is None:
             raise HTTPException(status_code=400, detail={
                 "code": "INVALID_PRODUCT",
                 "message": f"商品ID {item.product_id} 不存在"
             })
         
-        product = product_map[item.product_id]
+        product = entry.product
         
         # 验证选项
         if item.options:
-            if item.options.sugar and item.options.sugar not in product.options.sugar:
+            if not entry.allows("sugar", item.options.sugar):
                 raise HTTPException(status_code=400, detail={
                     "code": "INVALID_OPTIONS",
                     "message": f"商品 {product.name} 不支持 {item.options.sugar} 选项"
                 })
-            if item.options.ice and item.options.ice not in product.options.ice:
+            if not entry.allows("ice", item.options.ice):
                 raise HTTPException(status_code=400, detail={
                     "code": "INVALID_OPTIONS",
                     "message": f"商品 {product.name} 不支持 {item.options.ice} 选项"
@@ -250,19 +465,89 @@ async def create_order(
         "created_at": datetime.now().isoformat(),
         "estimated_time": estimated_time
     }
-    
-    ORDERS[order_no] = order
-    
+    return order
+
+
+def created_response(order: dict) -> OrderResponse:
+    order_no = order["order_no"]
+    total_amount = order["total_amount"]
     return OrderResponse(
         order_no=order_no,
         total_amount=total_amount,
         status="pending_payment",
         status_text="待支付",
         payment_url=f"https://pay.a2e-platform.com/pay?order={order_no}&amount={total_amount}",
-        estimated_time=f"预计 {estimated_time} 送达"
+        estimated_time=f"预计 {order['estimated_time']} 送达"
     )
 
 
+@app.post("/api/orders/batch")
+async def create_orders(
+    request: BatchCreateOrderRequest,
+    response: Response,
+    x_consumer_token: str = Header(..., description="A2E平台用户Token"),
+    idempotency_key: Optional[str] = Header(None, description="幂等键，重试时保持不变")
+):
+    """
+    批量创建订单（团购、办公室订餐）
+
+    Token 只验证一次，每个订单独立校验，合法的订单在同一事务中保存。
+    results 与请求中的 orders 一一对应，成功项带 order，失败项带 error，
+    部分订单不合法不影响其他订单。支持与 create_order 相同的 Idempotency-Key。
+    """
+    user_info = await verify_consumer_token(x_consumer_token)
+    ensure_shop_open()
+
+    if idempotency_key is None:
+        return await place_orders(request.orders, user_info)
+    check_idempotency_key(idempotency_key)
+    try:
+        result, replayed = await IDEMPOTENCY.run(
+            (user_info["user_id"], "batch", idempotency_key),
+            fingerprint(request.model_dump_json().encode("utf-8")),
+            lambda: place_orders(request.orders, user_info),
+        )
+    except IdempotencyKeyReusedError:
+        raise HTTPException(status_code=422, detail={
+            "code": "IDEMPOTENCY_KEY_REUSED",
+            "message": "该 Idempotency-Key 已用于另一个不同的请求"
+        })
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+async def place_orders(requests: List[CreateOrderRequest], user_info: dict) -> dict:
+    results: List[Dict[str, Any]] = []
+    orders = []
+    order_nos = set()
+    for index, request in enumerate(requests):
+        try:
+            order = build_order(request, user_info)
+        except HTTPException as e:
+            results.append({"index": index, "success": False, "error": e.detail})
+            continue
+        # 同一秒内生成的订单号可能重复，批内去重
+        if order["order_no"] in order_nos:
+            order["order_no"] = unique_order_no(order_nos)
+        order_nos.add(order["order_no"])
+        orders.append(order)
+        results.append({"index": index, "success": True, "order": order})
+
+    if orders:
+        await save_orders(orders)
+    for result in results:
+        if result["success"]:
+            order = result["order"]
+            EVENTS.publish(order["order_no"], order_event(order))
+            result["order"] = created_response(order).model_dump()
+    return {
+        "results": results,
+        "created": len(orders),
+        "failed": len(results) - len(orders),
+    }
+
+
 @app.get("/api/orders/{order_no}", response_model=OrderResponse)
 async def get_order_status(
     order_no: str,
@@ -273,24 +558,7 @@ async def get_order_status(
     
     A2E 协议端点: get_order_status
     """
-    # 1. 验证 Token
-    user_info = verify_consumer_token(x_consumer_token)
-    
-    # 2. 查询订单
-    if order_no not in ORDERS:
-        raise HTTPException(status_code=404, detail={
-            "code": "ORDER_NOT_FOUND",
-            "message": f"订单 {order_no} 不存在"
-        })
-    
-    order = ORDERS[order_no]
-    
-    # 3. 验证订单归属
-    if order["user_id"] != user_info["user_id"]:
-        raise HTTPException(status_code=403, detail={
-            "code": "ACCESS_DENIED",
-            "message": "无权访问此订单"
-        })
+    order = await get_user_order(order_no, x_consumer_token)
     
     return OrderResponse(
         order_no=order["order_no"],
@@ -301,30 +569,171 @@ async def get_order_status(
     )
 
 
+@app.get("/api/orders/{order_no}/events")
+async def watch_order_status(
+    order_no: str,
+    x_consumer_token: str = Header(..., description="A2E平台用户Token"),
+    last_event_id: Optional[int] = Header(None, description="断线重连时携带")
+):
+    """
+    订阅订单状态（Server-Sent Events）
+
+    连接后先推送当前状态，之后每次状态变化推送一个 status 事件，
+    订单完成或取消后结束。事件 id 为状态版本号，断线重连时通过
+    Last-Event-ID 从上次的位置继续；编号超出本进程已知的范围时
+    （重启、重连到另一个 worker），先推送一次当前状态再继续。
+    """
+    order = await get_user_order(order_no, x_consumer_token)
+
+    def message(version: int, event: dict) -> bytes:
+        data = json.dumps(event, ensure_ascii=False)
+        return f"id: {version}\nevent: status\ndata: {data}\n\n".encode("utf-8")
+
+    async def stream():
+        after = last_event_id
+        if after is None:
+            version, event = EVENTS.latest(order_no) or (0, order_event(order))
+            yield message(version, event)
+            if event["status"] in TERMINAL_STATUSES:
+                return
+            after = version
+        else:
+            EVENTS.resume(order_no, after, order_event(order))
+            if order["status"] in TERMINAL_STATUSES and not EVENTS.since(order_no, after):
+                return
+        while True:
+            if after > EVENTS.version(order_no):
+                # 等待期间订单被淘汰出 EVENTS
+                current = await ORDERS.get(order_no)
+                if current is not None:
+                    EVENTS.resume(order_no, after, order_event(current))
+            events = await EVENTS.wait(order_no, after, SSE_HEARTBEAT)
+            if not events:
+                yield b": ping\n\n"
+                continue
+            for version, event in events:
+                yield message(version, event)
+                after = version
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/orders/{order_no}/wait")
+async def wait_order_status(
+    order_no: str,
+    after: Optional[int] = Query(None, description="上次收到的 version"),
+    timeout: float = Query(25.0, ge=0, le=60, description="最长等待秒数"),
+    x_consumer_token: str = Header(..., description="A2E平台用户Token")
+):
+    """
+    长轮询订单状态
+
+    不带 after 时立即返回当前状态；带 after 时等到 version 大于 after 的
+    状态出现再返回，超时则返回当前状态且 changed 为 false。
+    无法使用 SSE 的客户端可用此端点代替反复查询 get_order_status。
+    """
+    order = await get_user_order(order_no, x_consumer_token)
+    if after is not None:
+        EVENTS.resume(order_no, after, order_event(order))
+    version, event = EVENTS.latest(order_no) or (0, order_event(order))
+    if after is not None and version <= after and event["status"] not in TERMINAL_STATUSES:
+        events = await EVENTS.wait(order_no, after, timeout)
+        if events:
+            version, event = events[-1]
+    return {**event, "version": version, "changed": after is None or version > after}
+
+
+def check_merchant_key(x_merchant_key: Optional[str]) -> None:
+    """商家接口鉴权：X-Merchant-Key 须与环境变量 MERCHANT_KEY 一致，未设置时接口关闭"""
+    merchant_key = os.environ.get("MERCHANT_KEY")
+    if not merchant_key:
+        raise HTTPException(status_code=503, detail={
+            "code": "MERCHANT_KEY_NOT_SET",
+            "message": "未配置 MERCHANT_KEY，商家接口已关闭"
+        })
+    if not secrets.compare_digest(x_merchant_key or "", merchant_key):
+        raise HTTPException(status_code=403, detail={
+            "code": "ACCESS_DENIED",
+            "message": "商家密钥错误"
+        })
+
+
+@app.post("/api/orders/{order_no}/status")
+async def update_order_status(
+    order_no: str,
+    request: UpdateStatusRequest,
+    x_merchant_key: Optional[str] = Header(None, description="商家密钥")
+):
+    """
+    更新订单状态（商家后台 / 支付回调）
+
+    需要携带与环境变量 MERCHANT_KEY 匹配的 X-Merchant-Key；未设置 MERCHANT_KEY
+    时此接口不可用。状态只能按 STATUS_FLOW 向后变更，或取消未结束的订单
+    """
+    check_merchant_key(x_merchant_key)
+    if request.status not in STATUS_TEXT:
+        raise HTTPException(status_code=400, detail={
+            "code": "INVALID_STATUS",
+            "message": f"未知的订单状态 {request.status}"
+        })
+    try:
+        order = await ORDERS.update_status(
+            order_no,
+            request.status,
+            STATUS_TEXT[request.status],
+            allowed_from=previous_statuses(request.status),
+        )
+    except InvalidTransitionError as e:
+        raise HTTPException(status_code=409, detail={
+            "code": "INVALID_STATUS_TRANSITION",
+            "message": str(e)
+        })
+    if order is None:
+        raise HTTPException(status_code=404, detail={
+            "code": "ORDER_NOT_FOUND",
+            "message": f"订单 {order_no} 不存在"
+        })
+    version = EVENTS.publish(order_no, order_event(order))
+    return {**order_event(order), "version": version}
+
+
 @app.get("/api/a2e/protocol")
-async def get_protocol():
+async def get_protocol(request: Request):
     """
     获取 A2E 协议定义
-    
-    AI Agent 可以通过此端点获取服务的完整协议信息
+
+    AI Agent 可以通过此端点获取服务的完整协议信息。
+    内容即 protocol.yaml，支持 gzip/br 压缩与 If-None-Match 条件请求
     """
-    return {
-        "version": "1.0.0",
-        "service": {
-            "id": "demo_tea_shop",
-            "name": "示例奶茶店",
-            "type": "food_delivery"
-        },
-        "semantic": {
-            "description": "示例奶茶店，提供各类奶茶、果茶",
-            "capabilities": ["在线点餐", "自定义口味", "外卖配送"]
-        },
-        "endpoints": [
-            {"name": "get_menu", "path": "/api/menu", "method": "GET"},
-            {"name": "create_order", "path": "/api/orders", "method": "POST"},
-            {"name": "get_order_status", "path": "/api/orders/{order_no}", "method": "GET"}
-        ]
-    }
+    PROTOCOL.maybe_reload()
+    return PROTOCOL.response(request.headers)
+
+
+@app.post("/api/a2e/protocol/reload")
+async def reload_protocol(
+    x_merchant_key: Optional[str] = Header(None, description="商家密钥")
+):
+    """
+    修改 protocol.yaml 后立即重新加载（无需等待自动检查）
+
+    与订单状态更新接口一样需要 X-Merchant-Key。文件格式错误时返回 422，
+    继续提供旧版本
+    """
+    check_merchant_key(x_merchant_key)
+    try:
+        changed = PROTOCOL.reload()
+    except InvalidProtocolError as e:
+        raise HTTPException(status_code=422, detail={
+            "code": "INVALID_PROTOCOL",
+            "message": str(e)
+        })
+    return {"changed": changed, "etag": PROTOCOL.etag}
 
 
 # ============ 健康检查 ============
@@ -335,6 +744,17 @@ async def health_check():
     return {"status": "healthy", "shop_open": check_shop_open()}
 
 
+@app.get("/metrics")
+async def metrics():
+    """运行指标：Token 缓存、订单推送、幂等键与准入控制的计数"""
+    return {
+        "token_verifier": TOKENS.stats(),
+        "order_events": EVENTS.stats(),
+        "idempotency": IDEMPOTENCY.stats(),
+        "admission": ADMISSION.stats(),
+    }
+
+
 # ============ 启动 ============
 
 if __name__ == "__main__":
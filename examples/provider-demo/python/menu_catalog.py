@@ -0,0 +1,84 @@
+"""
+菜单目录
+
+菜单变化时构建一次：商品 ID 索引、每个商品的可选项集合（O(1) 校验），
+以及 get_menu 在每种分类筛选下的响应 JSON 字节。请求处理时只做字典查找。
+"""
+
+import json
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+
+class CatalogItem:
+    """一个商品及其可选项集合"""
+
+    __slots__ = ("product", "options")
+
+    def __init__(self, product: Any):
+        self.product = product
+        self.options: Dict[str, FrozenSet[str]] = {
+            name: frozenset(values)
+            for name, values in product.options.model_dump().items()
+        }
+
+    def allows(self, option: str, value: Optional[str]) -> bool:
+        """value 为空表示未指定，总是允许"""
+        return not value or value in self.options.get(option, ())
+
+
+def _body(groups: Dict[str, list]) -> bytes:
+    payload = {
+        "categories": [
+            {"name": name, "items": items} for name, items in groups.items()
+        ],
+        "total_count": sum(len(items) for items in groups.values()),
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class _Snapshot:
+    def __init__(self, products: List[Any]):
+        self.items = {p.id: CatalogItem(p) for p in products}
+        # 每个商品只 model_dump 一次，按分类分组后复用
+        groups: Dict[str, list] = {}
+        for product in products:
+            groups.setdefault(product.category, []).append(product.model_dump())
+        self.bodies: Dict[Optional[str], bytes] = {None: _body(groups)}
+        for category, items in groups.items():
+            self.bodies[category] = _body({category: items})
+        self.empty = _body({})
+
+
+class MenuCatalog:
+    """
+    预计算的菜单
+
+    refresh() 整体替换快照，进行中的请求继续使用旧快照。
+    """
+
+    def __init__(self, products: Iterable[Any]):
+        self._lock = threading.Lock()
+        self.version = 0
+        self.refresh(products)
+
+    def refresh(self, products: Iterable[Any]) -> None:
+        """菜单变化后调用"""
+        snapshot = _Snapshot(list(products))
+        with self._lock:
+            self._snapshot = snapshot
+            self.version += 1
+
+    def get(self, product_id: int) -> Optional[CatalogItem]:
+        return self._snapshot.items.get(product_id)
+
+    def menu_json(self, category: Optional[str] = None) -> bytes:
+        """get_menu 的响应体；未知分类返回空菜单"""
+        snapshot = self._snapshot
+        return snapshot.bodies.get(category or None, snapshot.empty)
+
+    @property
+    def products(self) -> List[Any]:
+        return [item.product for item in self._snapshot.items.values()]
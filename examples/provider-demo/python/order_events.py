@@ -0,0 +1,123 @@
+"""
+订单状态推送
+
+进程内的发布/订阅：订单状态每变化一次，OrderEventBus 为该订单记录一个
+递增的事件编号。SSE 与长轮询端点按“上次收到的编号”等待新事件，
+不再需要 Agent 反复请求 get_order_status。
+
+每个订单只保留最近 history 个事件，订阅者落后太多时从最近的事件继续；
+订单数超过 max_orders 时淘汰最久未更新的订单。事件只在当前进程内传递，
+多个 worker 部署时需要换成 Redis 等共享的发布/订阅。订阅者带来的编号
+超过本进程已知的编号时（进程重启、订单被淘汰、重连到另一个 worker），
+由 resume 以当前状态接续编号。
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# 到达后不会再变化的状态
+TERMINAL_STATUSES = frozenset({"completed", "cancelled"})
+
+Event = Tuple[int, Dict[str, Any]]
+
+
+class _Topic:
+    __slots__ = ("events", "version", "changed")
+
+    def __init__(self, history: int):
+        self.events: Deque[Event] = deque(maxlen=history)
+        self.version = 0
+        self.changed: Optional[asyncio.Future] = None
+
+
+class OrderEventBus:
+    """按订单号分发状态事件"""
+
+    def __init__(self, history: int = 16, max_orders: int = 10_000):
+        self.history = history
+        self.max_orders = max_orders
+        self.published = 0
+        self._topics: "OrderedDict[str, _Topic]" = OrderedDict()
+
+    def _topic(self, order_no: str) -> _Topic:
+        topic = self._topics.get(order_no)
+        if topic is None:
+            topic = self._topics[order_no] = _Topic(self.history)
+            while len(self._topics) > self.max_orders:
+                _, evicted = self._topics.popitem(last=False)
+                _wake(evicted)
+        return topic
+
+    def publish(self, order_no: str, event: Dict[str, Any]) -> int:
+        """发布一个事件，返回其编号；唤醒所有等待该订单的订阅者"""
+        topic = self._topic(order_no)
+        self._topics.move_to_end(order_no)
+        topic.version += 1
+        topic.events.append((topic.version, event))
+        self.published += 1
+        _wake(topic)
+        return topic.version
+
+    def version(self, order_no: str) -> int:
+        """该订单最新事件的编号，没有记录时为 0"""
+        topic = self._topics.get(order_no)
+        return 0 if topic is None else topic.version
+
+    def resume(self, order_no: str, after: int, event: Dict[str, Any]) -> bool:
+        """
+        订阅者的 after 超出已知编号时，从 after 起重新编号并发布当前状态
+
+        event 应为订单的当前状态（从订单存储读取）。订阅者随后通过 since / wait
+        立即收到它；未超出时什么也不做，返回 False
+        """
+        if after <= self.version(order_no):
+            return False
+        topic = self._topic(order_no)
+        # 旧事件的编号已不可比，不再提供
+        topic.events.clear()
+        topic.version = after
+        self.publish(order_no, event)
+        return True
+
+    def latest(self, order_no: str) -> Optional[Event]:
+        topic = self._topics.get(order_no)
+        if topic is None or not topic.events:
+            return None
+        return topic.events[-1]
+
+    def since(self, order_no: str, after: int) -> List[Event]:
+        """编号大于 after 的事件（不等待）"""
+        topic = self._topics.get(order_no)
+        if topic is None or topic.version <= after:
+            return []
+        return [e for e in topic.events if e[0] > after]
+
+    async def wait(self, order_no: str, after: int, timeout: float) -> List[Event]:
+        """
+        等待编号大于 after 的事件
+
+        已有新事件时立即返回，否则最多等待 timeout 秒，超时返回空列表
+        """
+        events = self.since(order_no, after)
+        if events:
+            return events
+        topic = self._topic(order_no)
+        if topic.changed is None:
+            topic.changed = asyncio.get_running_loop().create_future()
+        try:
+            # shield：单个订阅者超时或断开不影响共享的 future
+            await asyncio.wait_for(asyncio.shield(topic.changed), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self.since(order_no, after)
+
+    def stats(self) -> Dict[str, int]:
+        return {"orders": len(self._topics), "published": self.published}
+
+
+def _wake(topic: _Topic) -> None:
+    if topic.changed is not None:
+        if not topic.changed.done():
+            topic.changed.set_result(None)
+        topic.changed = None
@@ -0,0 +1,354 @@
+"""
+订单存储
+
+create_order / get_order_status 通过 OrderStore 接口读写订单，提供两种实现：
+
+- MemoryOrderStore：进程内字典，带容量上限，适合本地调试
+- SQLiteOrderStore：SQLite WAL 模式，按 order_no 主键、user_id 索引；
+  写入由后台线程合并为批量事务（group commit），读取在线程池中执行，
+  不阻塞事件循环。多个 uvicorn worker 可共用同一个数据库文件。
+
+通过 open_order_store("memory://") 或 open_order_store("sqlite:///orders.db") 创建。
+"""
+
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+
+class DuplicateOrderError(Exception):
+    """订单号已存在"""
+
+    def __init__(self, order_no: str):
+        super().__init__(f"订单 {order_no} 已存在")
+        self.order_no = order_no
+
+
+class InvalidTransitionError(Exception):
+    """订单当前状态不允许变更为目标状态"""
+
+    def __init__(self, order_no: str, current: str, status: str):
+        super().__init__(f"订单 {order_no} 当前状态为 {current}，不能变更为 {status}")
+        self.order_no = order_no
+        self.current = current
+        self.status = status
+
+
+class OrderStore:
+    """订单存储接口"""
+
+    async def create(self, order: Dict[str, Any]) -> None:
+        """保存新订单，返回时已持久化"""
+        await self.create_many([order])
+
+    async def create_many(self, orders: List[Dict[str, Any]]) -> None:
+        """在同一事务中保存多个订单；任一订单号已存在时全部不保存"""
+        raise NotImplementedError
+
+    async def get(self, order_no: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def list_by_user(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """用户最近的订单，新订单在前"""
+        raise NotImplementedError
+
+    async def update_status(
+        self,
+        order_no: str,
+        status: str,
+        status_text: str,
+        allowed_from: Optional[Collection[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        更新订单状态，返回更新后的订单；订单不存在时返回 None
+
+        给出 allowed_from 时，当前状态不在其中则抛出 InvalidTransitionError，
+        检查与更新是原子的，并发的状态变更不会越过检查
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryOrderStore(OrderStore):
+    """进程内存储，超过 max_orders 时淘汰最早的订单"""
+
+    def __init__(self, max_orders: int = 100_000):
+        self.max_orders = max_orders
+        self._orders: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._by_user: Dict[str, "OrderedDict[str, None]"] = {}
+
+    async def create_many(self, orders: List[Dict[str, Any]]) -> None:
+        for order in orders:
+            if order["order_no"] in self._orders:
+                raise DuplicateOrderError(order["order_no"])
+        for order in orders:
+            self._orders[order["order_no"]] = order
+            user_orders = self._by_user.setdefault(order["user_id"], OrderedDict())
+            user_orders[order["order_no"]] = None
+        while len(self._orders) > self.max_orders:
+            order_no, evicted = self._orders.popitem(last=False)
+            user_orders = self._by_user[evicted["user_id"]]
+            del user_orders[order_no]
+            if not user_orders:
+                del self._by_user[evicted["user_id"]]
+
+    async def get(self, order_no: str) -> Optional[Dict[str, Any]]:
+        return self._orders.get(order_no)
+
+    async def list_by_user(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        order_nos = list(self._by_user.get(user_id, ()))[-limit:]
+        return [self._orders[n] for n in reversed(order_nos)]
+
+    async def update_status(
+        self,
+        order_no: str,
+        status: str,
+        status_text: str,
+        allowed_from: Optional[Collection[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        order = self._orders.get(order_no)
+        if order is None:
+            return None
+        if allowed_from is not None and order["status"] not in allowed_from:
+            raise InvalidTransitionError(order_no, order["status"], status)
+        order["status"] = status
+        order["status_text"] = status_text
+        return order
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_no   TEXT PRIMARY KEY,
+    user_id    TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id, created_at);
+"""
+
+_INSERT = (
+    "INSERT INTO orders (order_no, user_id, status, created_at, data)"
+    " VALUES (?, ?, ?, ?, ?)"
+)
+_UPDATE = "UPDATE orders SET status = ?, data = ? WHERE order_no = ?"
+
+# 写队列中的一项：操作、参数、完成时回调的 future 及其事件循环
+_Write = Tuple[str, Any, asyncio.Future, asyncio.AbstractEventLoop]
+
+
+class SQLiteOrderStore(OrderStore):
+    """
+    SQLite WAL 存储
+
+    所有写操作进入队列，由一个写线程取出后在一个事务中执行，最多合并
+    max_batch 个，队列为空时立即提交，因此低负载时不增加延迟，高负载时
+    多个请求共享一次 fsync。读操作使用线程池中各自的只读连接。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch: int = 256,
+        readers: int = 4,
+        synchronous: str = "NORMAL",
+    ):
+        self.path = path
+        self.max_batch = max_batch
+        self.synchronous = synchronous
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._local = threading.local()
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="order-read")
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.close()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="order-write", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 自动提交模式，事务由写线程显式控制
+        conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # ---------- 写 ----------
+
+    async def _submit(self, op: str, args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((op, args, future, loop))
+        return await future
+
+    async def create_many(self, orders: List[Dict[str, Any]]) -> None:
+        rows = [
+            (
+                o["order_no"],
+                o["user_id"],
+                o["status"],
+                o["created_at"],
+                json.dumps(o, ensure_ascii=False),
+            )
+            for o in orders
+        ]
+        await self._submit("insert", rows)
+
+    async def update_status(
+        self,
+        order_no: str,
+        status: str,
+        status_text: str,
+        allowed_from: Optional[Collection[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        if allowed_from is not None:
+            allowed_from = tuple(allowed_from)
+        return await self._submit(
+            "status", (order_no, status, status_text, allowed_from)
+        )
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [w for w in batch if w is not None]
+            if batch:
+                self._write_batch(conn, batch)
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[_Write]) -> None:
+        results: List[Any] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, args, _, _ in batch:
+                # 每个请求一个保存点：单个请求失败不影响同批次的其他请求
+                conn.execute("SAVEPOINT request")
+                try:
+                    result = self._apply(conn, op, args)
+                    conn.execute("RELEASE request")
+                    results.append(result)
+                except Exception as e:
+                    # 包括数据损坏导致的 json / KeyError：只让这个请求失败，写线程继续
+                    conn.execute("ROLLBACK TO request")
+                    conn.execute("RELEASE request")
+                    results.append(e)
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [e] * len(batch)
+        self.batches += 1
+        self.writes += len(batch)
+        for (_, _, future, loop), result in zip(batch, results):
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result)
+            except RuntimeError:
+                # 提交请求的事件循环已关闭，没有人在等待结果
+                pass
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, op: str, args: Any) -> Any:
+        if op == "insert":
+            try:
+                conn.executemany(_INSERT, args)
+            except sqlite3.IntegrityError:
+                # 先撤销本请求已插入的行，再找出冲突的订单号
+                conn.execute("ROLLBACK TO request")
+                order_nos = [row[0] for row in args]
+                duplicate = next(
+                    (n for n in order_nos if _exists(conn, n)), order_nos[0]
+                )
+                return DuplicateOrderError(duplicate)
+            return None
+        order_no, status, status_text, allowed_from = args
+        row = conn.execute(
+            "SELECT data FROM orders WHERE order_no = ?", (order_no,)
+        ).fetchone()
+        if row is None:
+            return None
+        order = json.loads(row[0])
+        # 在写事务内检查，其他 worker 的并发变更已串行化
+        if allowed_from is not None and order["status"] not in allowed_from:
+            return InvalidTransitionError(order_no, order["status"], status)
+        order["status"] = status
+        order["status_text"] = status_text
+        conn.execute(_UPDATE, (status, json.dumps(order, ensure_ascii=False), order_no))
+        return order
+
+    # ---------- 读 ----------
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _query(self, sql: str, args: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(sql, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    async def _read(self, sql: str, *args: Any) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._query, sql, args)
+
+    async def get(self, order_no: str) -> Optional[Dict[str, Any]]:
+        rows = await self._read("SELECT data FROM orders WHERE order_no = ?", order_no)
+        return rows[0] if rows else None
+
+    async def list_by_user(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return await self._read(
+            "SELECT data FROM orders WHERE user_id = ?"
+            " ORDER BY created_at DESC LIMIT ?",
+            user_id,
+            limit,
+        )
+
+    async def close(self) -> None:
+        self._queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._writer.join)
+        self._readers.shutdown(wait=True)
+
+
+def _exists(conn: sqlite3.Connection, order_no: str) -> bool:
+    row = conn.execute("SELECT 1 FROM orders WHERE order_no = ?", (order_no,))
+    return row.fetchone() is not None
+
+
+def _resolve(future: asyncio.Future, result: Any) -> None:
+    if future.cancelled():
+        return
+    if isinstance(result, BaseException):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+
+
+def open_order_store(url: str) -> OrderStore:
+    """根据 URL 创建存储：memory:// 或 sqlite:///路径"""
+    if url.startswith("sqlite:///"):
+        return SQLiteOrderStore(url[len("sqlite:///") :])
+    if url in ("memory", "memory://"):
+        return MemoryOrderStore()
+    raise ValueError(f"不支持的订单存储: {url}")
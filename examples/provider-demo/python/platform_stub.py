@@ -0,0 +1,55 @@
+"""
+A2E 平台 Token 验证接口的本地替身
+
+实现 POST /api/v1/open/platform/verify_token，规则与示例一致：
+以 token_ 开头的 Token 有效。可设置 PLATFORM_STUB_LATENCY_MS 模拟网络延迟。
+
+本地调试：
+    python platform_stub.py                              # 监听 9000 端口
+    A2E_PLATFORM_URL=http://localhost:9000 python main.py
+
+未设置 A2E_PLATFORM_URL 时，main.py 通过 httpx.ASGITransport 在进程内调用本替身。
+"""
+
+import asyncio
+import os
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+LATENCY = float(os.environ.get("PLATFORM_STUB_LATENCY_MS", "0")) / 1000
+
+app = FastAPI(title="A2E 平台替身")
+
+# 调用次数，便于观察缓存效果
+calls = {"verify_token": 0}
+
+
+class VerifyTokenRequest(BaseModel):
+    consumer_token: str
+
+
+@app.post("/api/v1/open/platform/verify_token")
+async def verify_token(request: VerifyTokenRequest):
+    calls["verify_token"] += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if not request.consumer_token.startswith("token_"):
+        return JSONResponse(
+            status_code=401,
+            content={
+                "code": "INVALID_TOKEN",
+                "message": "无效的用户Token",
+            },
+        )
+    return {
+        "code": 0,
+        "data": {"user_id": "user_12345", "nickname": "张三", "expires_in": 7200},
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=9000)
@@ -0,0 +1,175 @@
+"""
+A2E 协议文档
+
+启动时解析一次 protocol.yaml，预先序列化为 JSON 字节并预压缩（gzip，安装了
+brotli 时同时生成 br），以强 ETag 提供，条件请求命中时返回 304。
+文件修改后可调用 reload()，或由 maybe_reload() 按间隔检查修改时间自动重新加载。
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+import yaml
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class InvalidProtocolError(Exception):
+    """protocol.yaml 无法解析，或顶层不是映射"""
+
+
+class _Snapshot:
+    """某一版本协议文档的全部预计算表示"""
+
+    def __init__(self, data: Dict[str, Any], mtime: float):
+        self.data = data
+        self.mtime = mtime
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # 不同内容编码是不同的表示，强 ETag 需要区分
+        self.variants: Dict[str, Tuple[bytes, str]] = {
+            "identity": (self.body, f'"{digest}"'),
+            "gzip": (gzip.compress(self.body, 9, mtime=0), f'"{digest}-gz"'),
+        }
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(self.body), f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+
+
+def _accepts(accept_encoding: str) -> Dict[str, float]:
+    """解析 Accept-Encoding，返回 编码 -> q 值"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+class ProtocolDocument:
+    """
+    从 protocol.yaml 加载的协议文档
+
+    响应体为 a2e_protocol 节点下的完整内容。
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        check_interval: float = 5.0,
+        max_age: int = 300,
+    ):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.cache_control = f"public, max-age={max_age}"
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._snapshot = self._load()
+
+    def _load(self) -> _Snapshot:
+        mtime = self.path.stat().st_mtime
+        with open(self.path, encoding="utf-8") as f:
+            try:
+                document = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise InvalidProtocolError(f"{self.path.name} 解析失败: {e}") from e
+        if isinstance(document, dict):
+            document = document.get("a2e_protocol", document)
+        if not isinstance(document, dict):
+            raise InvalidProtocolError(f"{self.path.name} 的协议内容应为映射")
+        return _Snapshot(document, mtime)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self._snapshot.data
+
+    @property
+    def etag(self) -> str:
+        return self._snapshot.variants["identity"][1]
+
+    def reload(self) -> bool:
+        """
+        重新解析文件；内容有变化时返回 True。
+
+        解析失败时保留旧版本并抛出 InvalidProtocolError
+        """
+        with self._lock:
+            snapshot = self._load()
+            changed = snapshot.body != self._snapshot.body
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return changed
+
+    def maybe_reload(self) -> bool:
+        """距上次检查超过 check_interval 且文件修改时间变化时重新加载"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        try:
+            if self.path.stat().st_mtime == self._snapshot.mtime:
+                return False
+            return self.reload()
+        except (OSError, InvalidProtocolError):
+            # 文件正在写入或格式错误时继续提供旧版本
+            return False
+
+    def response(self, headers: Mapping[str, str]) -> Response:
+        """根据请求头选择编码，命中 If-None-Match 时返回 304"""
+        snapshot = self._snapshot
+        accepted = _accepts(headers.get("accept-encoding", ""))
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            q = accepted.get(candidate, accepted.get("*", 0))
+            if candidate in snapshot.variants and q > 0:
+                encoding = candidate
+                break
+        body, etag = snapshot.variants[encoding]
+        response_headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if _matches(headers.get("if-none-match"), snapshot.etags):
+            return Response(status_code=304, headers=response_headers)
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers=response_headers,
+        )
+
+
+def _matches(if_none_match: Optional[str], etags: set) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
@@ -0,0 +1,50 @@
+"""
+测试夹具：进程内的 FastAPI TestClient，订单存储与事件总线每个测试重新创建
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from idempotency import IdempotencyStore  # noqa: E402
+from order_events import OrderEventBus  # noqa: E402
+from order_store import open_order_store  # noqa: E402
+
+TOKEN = {"X-Consumer-Token": "token_test"}
+MERCHANT = {"X-Merchant-Key": "merchant-test"}
+ORDER = {
+    "items": [{"product_id": 1, "quantity": 2}],
+    "address": "北京市朝阳区",
+    "phone": "13800000000",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("SHOP_OPEN", "always")
+    monkeypatch.setenv("MERCHANT_KEY", MERCHANT["X-Merchant-Key"])
+    monkeypatch.setattr(main, "ORDERS", open_order_store("memory://"))
+    monkeypatch.setattr(main, "EVENTS", OrderEventBus())
+    monkeypatch.setattr(main, "IDEMPOTENCY", IdempotencyStore())
+    with TestClient(main.app) as c:
+        yield c
+
+
+def create_order(client) -> str:
+    response = client.post("/api/orders", json=ORDER, headers=TOKEN)
+    assert response.status_code == 200, response.text
+    return response.json()["order_no"]
+
+
+def set_status(client, order_no: str, status: str) -> dict:
+    response = client.post(
+        f"/api/orders/{order_no}/status", json={"status": status}, headers=MERCHANT
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
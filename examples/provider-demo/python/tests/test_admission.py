@@ -0,0 +1,57 @@
+import asyncio
+
+from admission import AdmissionControl, AdmissionMiddleware, RateLimit
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def call(middleware, ip="10.0.0.1", headers=()):
+    scope = {
+        "type": "http",
+        "path": "/api/menu",
+        "client": (ip, 1234),
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    return sent[0]["status"]
+
+
+def make(verified=None, **limits):
+    control = AdmissionControl(
+        limits={kind: RateLimit(0.001, burst) for kind, burst in limits.items()}
+    )
+    return control, AdmissionMiddleware(ok_app, control, verified=verified)
+
+
+def test_ip_limit_applies_whatever_the_headers():
+    _, middleware = make(ip=3, token=100)
+    statuses = [
+        call(middleware, headers=[("x-consumer-token", f"t{i}")]) for i in range(5)
+    ]
+    assert statuses == [200, 200, 200, 429, 429]
+
+
+def test_only_verified_tokens_get_buckets():
+    control, middleware = make(verified=lambda t: t == "good", ip=100, token=2)
+    for i in range(5):
+        call(middleware, headers=[("x-consumer-token", f"random{i}")])
+    assert control.stats()["buckets"] == 1
+    statuses = [
+        call(middleware, headers=[("x-consumer-token", "good")]) for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_spoofed_app_id_cannot_drain_another_app():
+    _, middleware = make(ip=100, app=2)
+    for _ in range(5):
+        call(middleware, ip="10.0.0.66", headers=[("x-app-id", "victim")])
+    assert call(middleware, ip="10.0.0.2", headers=[("x-app-id", "victim")]) == 200
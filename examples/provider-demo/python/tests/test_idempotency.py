@@ -0,0 +1,25 @@
+import pytest
+
+from conftest import ORDER, TOKEN
+
+BATCH = {"orders": [ORDER]}
+ENDPOINTS = [("/api/orders", ORDER), ("/api/orders/batch", BATCH)]
+
+
+@pytest.mark.parametrize("path,body", ENDPOINTS)
+@pytest.mark.parametrize("key", ["x" * 256, "订单-1".encode(), "key\tone"])
+def test_invalid_keys_are_rejected(client, path, body, key):
+    headers = {**TOKEN, "Idempotency-Key": key}
+    response = client.post(path, json=body, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "INVALID_IDEMPOTENCY_KEY"
+
+
+@pytest.mark.parametrize("path,body", ENDPOINTS)
+def test_valid_key_replays_the_first_response(client, path, body):
+    headers = {**TOKEN, "Idempotency-Key": "a" * 255}
+    first = client.post(path, json=body, headers=headers)
+    second = client.post(path, json=body, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import main
+from order_events import OrderEventBus
+
+from conftest import TOKEN, create_order, set_status
+
+
+def sse_events(body: str):
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(
+            line.split(": ", 1)
+            for line in block.splitlines()
+            if not line.startswith(":")
+        )
+        if "data" in lines:
+            events.append((int(lines["id"]), json.loads(lines["data"])["status"]))
+    return events
+
+
+def test_resume_renumbers_from_after():
+    bus = OrderEventBus()
+    bus.publish("N1", {"status": "paid"})
+    assert not bus.resume("N1", 1, {"status": "paid"})
+    assert bus.resume("N1", 3, {"status": "preparing"})
+    assert bus.since("N1", 3) == [(4, {"status": "preparing"})]
+    assert bus.since("N1", 0) == [(4, {"status": "preparing"})]
+
+
+def test_wait_returns_current_state_for_unknown_version():
+    async def run():
+        bus = OrderEventBus()
+        bus.resume("N1", 3, {"status": "paid"})
+        return await bus.wait("N1", 3, timeout=0.1)
+
+    assert asyncio.run(run()) == [(4, {"status": "paid"})]
+
+
+def test_long_poll_after_bus_reset(client, monkeypatch):
+    order_no = create_order(client)
+    for status in ("paid", "preparing"):
+        set_status(client, order_no, status)
+    monkeypatch.setattr(main, "EVENTS", OrderEventBus())  # 模拟重启 / 另一个 worker
+
+    body = client.get(
+        f"/api/orders/{order_no}/wait",
+        params={"after": 3, "timeout": 0.1},
+        headers=TOKEN,
+    ).json()
+    assert (body["status"], body["version"], body["changed"]) == ("preparing", 4, True)
+
+    set_status(client, order_no, "delivering")
+    body = client.get(
+        f"/api/orders/{order_no}/wait",
+        params={"after": 4, "timeout": 0.1},
+        headers=TOKEN,
+    ).json()
+    assert (body["status"], body["version"], body["changed"]) == ("delivering", 5, True)
+
+
+def test_sse_resume_after_bus_reset(client, monkeypatch):
+    order_no = create_order(client)
+    set_status(client, order_no, "paid")
+    set_status(client, order_no, "completed")
+    monkeypatch.setattr(main, "EVENTS", OrderEventBus())
+
+    response = client.get(
+        f"/api/orders/{order_no}/events",
+        headers={**TOKEN, "Last-Event-ID": "3"},
+    )
+    assert sse_events(response.text) == [(4, "completed")]
@@ -0,0 +1,80 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import main
+from order_store import DuplicateOrderError, open_order_store
+
+from conftest import ORDER, TOKEN, create_order
+
+
+def order(order_no, user_id="u1"):
+    return {
+        "order_no": order_no,
+        "user_id": user_id,
+        "status": "pending_payment",
+        "status_text": "待支付",
+        "created_at": "2026-01-01T12:00:00",
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_url(request, tmp_path):
+    if request.param == "memory":
+        return "memory://"
+    return f"sqlite:///{tmp_path / 'orders.db'}"
+
+
+def test_duplicate_order_no(store_url):
+    async def run():
+        store = open_order_store(store_url)
+        try:
+            await store.create(order("N1"))
+            with pytest.raises(DuplicateOrderError) as info:
+                await store.create_many([order("N2"), order("N1")])
+            assert info.value.order_no == "N1"
+            assert await store.get("N2") is None
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+
+
+def test_writer_survives_corrupt_rows(tmp_path):
+    path = tmp_path / "orders.db"
+
+    async def run():
+        store = open_order_store(f"sqlite:///{path}")
+        try:
+            await store.create_many([order("N1"), order("N2")])
+            with sqlite3.connect(path) as conn:
+                conn.execute(
+                    "UPDATE orders SET data = 'not json' WHERE order_no = 'N1'"
+                )
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(store.update_status("N1", "paid", "已支付"), 5)
+            updated = await asyncio.wait_for(
+                store.update_status("N2", "paid", "已支付"), 5
+            )
+            assert updated["status"] == "paid"
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+
+
+def test_order_no_collision_is_regenerated(client, monkeypatch):
+    first = create_order(client)
+    numbers = iter([first, first, "A2E20260101120000ABCDEF"])
+    monkeypatch.setattr(main, "generate_order_no", lambda: next(numbers))
+    assert create_order(client) == "A2E20260101120000ABCDEF"
+
+
+def test_persistent_collision_is_a_conflict(client, monkeypatch):
+    first = create_order(client)
+    monkeypatch.setattr(main, "generate_order_no", lambda: first)
+    monkeypatch.setattr(main, "unique_order_no", lambda taken: first)
+    response = client.post("/api/orders", json=ORDER, headers=TOKEN)
+    assert response.status_code == 409
+    assert response.json()["detail"]["code"] == "ORDER_NO_CONFLICT"
@@ -0,0 +1,40 @@
+import pytest
+
+import main
+from protocol_doc import ProtocolDocument
+
+from conftest import MERCHANT
+
+RELOAD = "/api/a2e/protocol/reload"
+
+
+@pytest.fixture
+def protocol_file(tmp_path, monkeypatch):
+    path = tmp_path / "protocol.yaml"
+    path.write_text("a2e_protocol:\n  version: '1.0'\n", encoding="utf-8")
+    monkeypatch.setattr(main, "PROTOCOL", ProtocolDocument(path))
+    return path
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Merchant-Key": "wrong"}])
+def test_reload_requires_merchant_key(client, protocol_file, headers):
+    response = client.post(RELOAD, headers=headers)
+    assert response.status_code == 403
+    assert response.json()["detail"]["code"] == "ACCESS_DENIED"
+
+
+def test_reload_picks_up_changes(client, protocol_file):
+    protocol_file.write_text("a2e_protocol:\n  version: '2.0'\n", encoding="utf-8")
+    response = client.post(RELOAD, headers=MERCHANT)
+    assert response.status_code == 200
+    assert response.json()["changed"] is True
+    assert client.get("/api/a2e/protocol").json() == {"version": "2.0"}
+
+
+@pytest.mark.parametrize("content", ["a2e_protocol: [unclosed\n", "- just a list\n"])
+def test_invalid_file_keeps_the_old_document(client, protocol_file, content):
+    protocol_file.write_text(content, encoding="utf-8")
+    response = client.post(RELOAD, headers=MERCHANT)
+    assert response.status_code == 422
+    assert response.json()["detail"]["code"] == "INVALID_PROTOCOL"
+    assert client.get("/api/a2e/protocol").json() == {"version": "1.0"}
@@ -0,0 +1,220 @@
+"""
+Consumer Token 验证
+
+通过 A2E 平台验证 Consumer Token，并在前面加一层缓存：
+
+- 验证通过的 Token 缓存 ttl 秒（不超过 Token 自身剩余有效期），LRU 淘汰
+- 无效 Token 缓存 negative_ttl 秒，避免反复请求平台
+- 同一 Token 的并发验证只请求平台一次
+- 平台不可用时不缓存，下次请求重新验证
+
+平台客户端可替换：HTTPPlatformClient 调用平台接口，测试时可传入任意
+实现了 verify_token 的对象，或用 platform_stub.py 中的本地替身。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+
+class InvalidTokenError(Exception):
+    """平台确认 Token 无效或已过期"""
+
+    def __init__(self, code: str = "INVALID_TOKEN", message: str = "无效的用户Token"):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class PlatformUnavailableError(Exception):
+    """平台暂时无法完成验证（网络错误、超时、5xx）"""
+
+
+class PlatformClient:
+    """平台客户端接口"""
+
+    async def verify_token(self, token: str) -> Dict[str, Any]:
+        """
+        返回 Token 关联的用户信息，至少包含 user_id，可选 expires_in（秒）
+
+        Token 无效时抛出 InvalidTokenError，平台不可用时抛出 PlatformUnavailableError
+        """
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HTTPPlatformClient(PlatformClient):
+    """调用 A2E 平台 /api/v1/open/platform/verify_token"""
+
+    def __init__(
+        self,
+        base_url: str,
+        app_id: str = "",
+        app_secret: str = "",
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 5.0,
+    ):
+        self.url = base_url.rstrip("/") + "/api/v1/open/platform/verify_token"
+        self.headers = {"X-App-ID": app_id, "X-App-Secret": app_secret}
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+
+    async def verify_token(self, token: str) -> Dict[str, Any]:
+        try:
+            response = await self._client.post(
+                self.url, json={"consumer_token": token}, headers=self.headers
+            )
+        except httpx.HTTPError as e:
+            raise PlatformUnavailableError(str(e)) from e
+        if response.status_code >= 500:
+            raise PlatformUnavailableError(f"platform returned {response.status_code}")
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            # 网关等返回的 HTML/纯文本错误页：401/403 视为 Token 无效，其余视为平台故障
+            if response.status_code in (401, 403):
+                raise InvalidTokenError()
+            raise PlatformUnavailableError(
+                f"platform returned {response.status_code} without a JSON body"
+            )
+        if response.status_code == 401 or body.get("code") not in (0, None):
+            raise InvalidTokenError(
+                str(body.get("code") or "INVALID_TOKEN"),
+                body.get("message") or "无效的用户Token",
+            )
+        return body.get("data") or {}
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+
+class TokenVerifier:
+    """带缓存与请求合并的 Token 验证"""
+
+    def __init__(
+        self,
+        platform: PlatformClient,
+        maxsize: int = 10_000,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        expiry_margin: float = 30.0,
+    ):
+        self.platform = platform
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.expiry_margin = expiry_margin
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.failures = 0
+        # Token -> (过期时间, 用户信息 dict 或无效 Token 的 (code, message))
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._latencies: Deque[float] = deque(maxlen=4096)
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """返回用户信息；Token 无效时抛出 InvalidTokenError"""
+        entry = self._cache.get(token)
+        if entry is not None:
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._cache.move_to_end(token)
+                if isinstance(value, tuple):
+                    # 每次抛出新的异常：反复抛出同一实例会让其 __traceback__
+                    # 越积越长，并持有每次请求的栈帧
+                    self.negative_hits += 1
+                    raise InvalidTokenError(*value)
+                self.hits += 1
+                return value
+            del self._cache[token]
+
+        future = self._in_flight.get(token)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self._verify_remote(token))
+            self._in_flight[token] = future
+            future.add_done_callback(lambda f: self._in_flight.pop(token, None))
+        # shield：某个等待者被取消不影响其他等待同一 Token 的请求
+        try:
+            return await asyncio.shield(future)
+        except InvalidTokenError as e:
+            # 合并的请求共享同一个 future，同样各自抛出新的异常
+            raise InvalidTokenError(e.code, e.message) from None
+
+    async def _verify_remote(self, token: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            user_info = await self.platform.verify_token(token)
+        except InvalidTokenError as e:
+            self._store(token, (e.code, e.message), self.negative_ttl)
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+        ttl = self.ttl
+        expires_in = user_info.get("expires_in")
+        if expires_in:
+            ttl = min(ttl, max(0.0, expires_in - self.expiry_margin))
+        if ttl > 0:
+            self._store(token, user_info, ttl)
+        return user_info
+
+    def _store(self, token: str, value: Any, ttl: float) -> None:
+        self._cache[token] = (time.monotonic() + ttl, value)
+        self._cache.move_to_end(token)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def is_verified(self, token: str) -> bool:
+        """Token 是否已验证有效且仍在缓存中；不会请求平台"""
+        entry = self._cache.get(token)
+        return (
+            entry is not None
+            and isinstance(entry[1], dict)
+            and time.monotonic() < entry[0]
+        )
+
+    def invalidate(self, token: str) -> None:
+        self._cache.pop(token, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中率与平台验证延迟（毫秒）"""
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(p / 100 * len(latencies)))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "hit_ratio": (
+                round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+            ),
+            "verify_latency_ms": {
+                "p50": percentile(50),
+                "p99": percentile(99),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
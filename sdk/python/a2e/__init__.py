@@ -11,8 +11,24 @@ from .models import (
     SearchResult,
     ExecuteResult,
     AuthResult,
+    BatchResult,
+    OrderEvent,
+)
+from .exceptions import A2EError, CircuitOpenError, ValidationError
+from .cache import ProtocolCache, CacheStats
+from .diskcache import DiskCache, DiskProtocolCache
+from .auth import TokenManager, AsyncTokenManager
+from .transport import ConnectionPool, PoolConfig, PoolStats
+from .resilience import RetryPolicy, CircuitBreaker, CircuitBreakerRegistry
+from .pipeline import AgentPipeline, PipelineResult
+from .search import ServiceIndex
+from .geo import SpatialIndex
+from .instrumentation import (
+    RequestTiming,
+    RequestObserver,
+    LatencyHistogram,
+    LatencyCollector,
 )
-from .exceptions import A2EError
 
 __version__ = "1.0.0"
 __all__ = [
@@ -23,5 +39,29 @@ __all__ = [
     "SearchResult",
     "ExecuteResult",
     "AuthResult",
+    "BatchResult",
+    "OrderEvent",
     "A2EError",
+    "ValidationError",
+    "CircuitOpenError",
+    "ProtocolCache",
+    "CacheStats",
+    "DiskCache",
+    "DiskProtocolCache",
+    "TokenManager",
+    "AsyncTokenManager",
+    "ConnectionPool",
+    "PoolConfig",
+    "PoolStats",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "AgentPipeline",
+    "PipelineResult",
+    "ServiceIndex",
+    "SpatialIndex",
+    "RequestTiming",
+    "RequestObserver",
+    "LatencyHistogram",
+    "LatencyCollector",
 ]
@@ -0,0 +1,175 @@
+"""
+A2E Consumer Token Management
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from .models import AuthResult
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+TokenKey = Tuple[str, str]
+
+
+@dataclass
+class TokenStats:
+    """Token manager counters."""
+
+    hits: int = 0
+    fetches: int = 0
+    refreshes: int = 0
+    refresh_failures: int = 0
+
+
+@dataclass
+class CachedToken:
+    """A consumer token and the times it must be refreshed and dropped."""
+
+    auth: AuthResult
+    refresh_at: float
+    expires_at: float
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    @property
+    def needs_refresh(self) -> bool:
+        return time.monotonic() >= self.refresh_at
+
+
+def _cache_entry(
+    auth: AuthResult,
+    expiry_margin: float,
+    refresh_fraction: float,
+) -> Optional[CachedToken]:
+    lifetime = auth.expires_in - expiry_margin
+    if lifetime <= 0:
+        return None
+    now = time.monotonic()
+    return CachedToken(
+        auth=auth,
+        refresh_at=now + lifetime * refresh_fraction,
+        expires_at=now + lifetime,
+    )
+
+
+class TokenManager:
+    """
+    Cache consumer tokens per ``(auth_type, auth_code)``.
+
+    Tokens are reused until ``expiry_margin`` seconds before they expire.
+    Once ``refresh_fraction`` of that lifetime has passed, the cached token
+    is still returned while a background thread fetches a new one.
+    Concurrent fetches for the same key share a single request.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], AuthResult],
+        expiry_margin: float = 30.0,
+        refresh_fraction: float = 0.8,
+    ):
+        self.fetch = fetch
+        self.expiry_margin = expiry_margin
+        self.refresh_fraction = refresh_fraction
+        self.stats = TokenStats()
+        self._tokens: Dict[TokenKey, CachedToken] = {}
+        self._flight = SingleFlight()
+
+    def get(self, auth_type: str, auth_code: str) -> AuthResult:
+        """Return a valid ``AuthResult``, fetching one if needed."""
+        key = (auth_type, auth_code)
+        cached = self._tokens.get(key)
+        if cached is not None and not cached.expired:
+            self.stats.hits += 1
+            if cached.needs_refresh and not self._flight.in_flight(key):
+                threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+            return cached.auth
+        return self._flight.do(key, lambda: self._fetch(key))
+
+    def get_token(self, auth_type: str, auth_code: str) -> str:
+        """Return just the consumer token string."""
+        return self.get(auth_type, auth_code).consumer_token
+
+    def invalidate(self, auth_type: str, auth_code: str) -> None:
+        """Forget a token, e.g. after the platform rejected it."""
+        self._tokens.pop((auth_type, auth_code), None)
+
+    def _fetch(self, key: TokenKey) -> AuthResult:
+        self.stats.fetches += 1
+        auth = self.fetch(*key)
+        entry = _cache_entry(auth, self.expiry_margin, self.refresh_fraction)
+        if entry is not None:
+            self._tokens[key] = entry
+        return auth
+
+    def _refresh(self, key: TokenKey) -> None:
+        self.stats.refreshes += 1
+        try:
+            self._flight.do(key, lambda: self._fetch(key))
+        except Exception:
+            # Keep serving the current token until it actually expires.
+            self.stats.refresh_failures += 1
+
+
+class AsyncTokenManager:
+    """
+    Asynchronous counterpart of ``TokenManager``.
+
+    Background refreshes run as tasks on the running event loop.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], Awaitable[AuthResult]],
+        expiry_margin: float = 30.0,
+        refresh_fraction: float = 0.8,
+    ):
+        self.fetch = fetch
+        self.expiry_margin = expiry_margin
+        self.refresh_fraction = refresh_fraction
+        self.stats = TokenStats()
+        self._tokens: Dict[TokenKey, CachedToken] = {}
+        self._flight = AsyncSingleFlight()
+        self._background: Set["asyncio.Task[None]"] = set()
+
+    async def get(self, auth_type: str, auth_code: str) -> AuthResult:
+        """Return a valid ``AuthResult``, fetching one if needed."""
+        key = (auth_type, auth_code)
+        cached = self._tokens.get(key)
+        if cached is not None and not cached.expired:
+            self.stats.hits += 1
+            if cached.needs_refresh and not self._flight.in_flight(key):
+                task = asyncio.create_task(self._refresh(key))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return cached.auth
+        return await self._flight.do(key, lambda: self._fetch(key))
+
+    async def get_token(self, auth_type: str, auth_code: str) -> str:
+        """Return just the consumer token string."""
+        return (await self.get(auth_type, auth_code)).consumer_token
+
+    def invalidate(self, auth_type: str, auth_code: str) -> None:
+        """Forget a token, e.g. after the platform rejected it."""
+        self._tokens.pop((auth_type, auth_code), None)
+
+    async def _fetch(self, key: TokenKey) -> AuthResult:
+        self.stats.fetches += 1
+        auth = await self.fetch(*key)
+        entry = _cache_entry(auth, self.expiry_margin, self.refresh_fraction)
+        if entry is not None:
+            self._tokens[key] = entry
+        return auth
+
+    async def _refresh(self, key: TokenKey) -> None:
+        self.stats.refreshes += 1
+        try:
+            await self._flight.do(key, lambda: self._fetch(key))
+        except Exception:
+            # Keep serving the current token until it actually expires.
+            self.stats.refresh_failures += 1
@@ -0,0 +1,125 @@
+"""
+A2E Protocol Cache
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from .models import Protocol
+
+
+@dataclass
+class CacheStats:
+    """Protocol cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class CacheEntry:
+    """A parsed protocol plus the validators needed to revalidate it."""
+
+    protocol: Protocol
+    expires_at: float
+    etag: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ProtocolCache:
+    """
+    Size-bounded LRU cache of parsed protocol documents.
+
+    Entries are fresh for ``ttl`` seconds. Stale entries are kept so the
+    client can revalidate them with ``If-None-Match`` instead of
+    downloading and re-parsing the document. A ``maxsize`` of 0 disables
+    the cache.
+    """
+
+    # Whether lookups and stores may block on I/O; the async client runs
+    # them in a worker thread when they do.
+    blocking = False
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def lookup(self, service_id: str) -> Optional[CacheEntry]:
+        """Return the entry for a service, fresh or stale, and count the lookup."""
+        with self._lock:
+            entry = self._entries.get(service_id)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(service_id)
+            if entry.fresh:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            return entry
+
+    def peek(self, service_id: str) -> Optional[CacheEntry]:
+        """Return the in-memory entry for a service without counting a lookup."""
+        return self._entries.get(service_id)
+
+    def put(
+        self,
+        service_id: str,
+        protocol: Protocol,
+        etag: Optional[str] = None,
+    ) -> None:
+        """Store a freshly downloaded protocol."""
+        if not self.enabled:
+            return
+        entry = CacheEntry(
+            protocol=protocol,
+            expires_at=time.monotonic() + self.ttl,
+            etag=etag,
+        )
+        with self._lock:
+            self._entries[service_id] = entry
+            self._entries.move_to_end(service_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def revalidated(self, service_id: str, entry: CacheEntry) -> Protocol:
+        """Mark a stale entry fresh again after a 304 Not Modified."""
+        with self._lock:
+            entry.expires_at = time.monotonic() + self.ttl
+            self.stats.revalidations += 1
+        return entry.protocol
+
+    def invalidate(self, service_id: Optional[str] = None) -> None:
+        """Drop one service, or every service when ``service_id`` is None."""
+        with self._lock:
+            if service_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(service_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, service_id: str) -> bool:
+        return service_id in self._entries
@@ -2,7 +2,26 @@
 A2E Protocol Client
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import math
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 import httpx
 
 from .models import (
@@ -11,8 +30,22 @@ from .models import (
     SearchResult,
     ExecuteResult,
     AuthResult,
+    BatchResult,
+    OrderEvent,
+    _build,
 )
-from .exceptions import A2EError
+from .events import SSEDecoder, SSEMessage
+from .exceptions import A2EError, CircuitOpenError
+from .cache import CacheEntry, ProtocolCache
+from .diskcache import DiskCache, DiskProtocolCache
+from .auth import AsyncTokenManager, TokenManager
+from .codec import JSONCodec, default_codec
+from .transport import ConnectionPool, PoolConfig
+from .resilience import CircuitBreakerRegistry, RetryPolicy, is_failure
+from .instrumentation import RequestObserver, RequestTimer, notify
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+T = TypeVar("T")
 
 
 class A2EClient:
@@ -24,12 +57,40 @@ class A2EClient:
         app_id: Optional[str] = None,
         app_secret: Optional[str] = None,
         timeout: int = 30,
+        protocol_cache: Optional[ProtocolCache] = None,
+        token_manager: Optional[TokenManager] = None,
+        codec: Optional[JSONCodec] = None,
+        pool: Optional[ConnectionPool] = None,
+        retry: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        observers: Optional[List[RequestObserver]] = None,
+        idempotency_keys: bool = False,
+        disk_cache: Optional[DiskCache] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.app_id = app_id
         self.app_secret = app_secret
         self.timeout = timeout
-        self._client = httpx.Client(timeout=timeout)
+        self.disk_cache = disk_cache
+        if protocol_cache is None:
+            protocol_cache = (
+                DiskProtocolCache(disk_cache, base_url=self.base_url)
+                if disk_cache is not None
+                else ProtocolCache()
+            )
+        self.protocol_cache = protocol_cache
+        self.tokens = token_manager or TokenManager(self.get_consumer_token)
+        self.codec = codec or default_codec()
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(PoolConfig(timeout=timeout))
+        self._client = self.pool.client
+        self.retry = retry or RetryPolicy()
+        self.breakers = breakers or CircuitBreakerRegistry()
+        self.observers: List[RequestObserver] = list(observers or [])
+        self.idempotency_keys = idempotency_keys
+        self._search_flight = SingleFlight()
+        self._protocol_flight = SingleFlight()
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
 
     def _get_headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
@@ -37,17 +98,172 @@ class A2EClient:
             headers["X-App-ID"] = self.app_id
         return headers
 
-    def _handle_response(self, response: httpx.Response) -> Dict[str, Any]:
+    def _handle_response(
+        self,
+        response: httpx.Response,
+        timer: Optional[RequestTimer] = None,
+    ) -> Dict[str, Any]:
         response.raise_for_status()
-        data = response.json()
-        
+        if timer is not None:
+            timer.decoding()
+        data = self.codec.loads(response.content)
+        if timer is not None:
+            timer.decoded()
+
         if data.get("code", 0) != 0:
             raise A2EError(
-                code=str(data.get("code")),
-                message=data.get("message", "Unknown error")
+                code=str(data.get("code")), message=data.get("message", "Unknown error")
+            )
+
+        result: Dict[str, Any] = data.get("data", {})
+        return result
+
+    @contextmanager
+    def _observe(self, api: str, method: str, url: str) -> Iterator[RequestTimer]:
+        """Time one API call and report it to ``observers``."""
+        timer = RequestTimer(api, method, url[len(self.base_url) :])
+        error = None
+        try:
+            yield timer
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if self.observers:
+                notify(self.observers, timer.finish(error))
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        service_id: Optional[str] = None,
+        idempotent: bool = False,
+        hedge: bool = False,
+        timer: Optional[RequestTimer] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a request through the circuit breaker and retry policy.
+
+        Only idempotent calls are retried or hedged. Transport errors, 429
+        and 5xx responses count as failures against ``service_id``'s
+        breaker; a call cancelled or interrupted by any other error counts
+        as neither failure nor success.
+        Every attempt is traced separately; ``timer`` keeps the trace of
+        the attempt whose response is returned.
+        """
+        breaker = self.breakers.get(service_id) if service_id else None
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                code="CIRCUIT_OPEN",
+                message=f"Service {service_id} is unavailable, "
+                f"retry in {breaker.retry_in():.1f}s",
+            )
+
+        attempts = self.retry.max_attempts if idempotent else 1
+        hedged = hedge and idempotent and self.retry.hedge_delay is not None
+        response = None
+        failed: Optional[bool] = None
+        try:
+            for attempt in range(attempts):
+                last = attempt == attempts - 1
+                try:
+                    if hedged:
+                        response, trace = self._hedged_request(
+                            method, url, timer, **kwargs
+                        )
+                    else:
+                        response, trace = self._request(method, url, timer, **kwargs)
+                except httpx.TransportError:
+                    failed = True
+                    if last:
+                        raise
+                    time.sleep(self.retry.backoff(attempt))
+                    continue
+                failed = is_failure(response)
+                if timer is not None and trace is not None:
+                    timer.adopt(trace)
+                if last or not self.retry.should_retry(response):
+                    break
+                time.sleep(self.retry.backoff(attempt, response))
+        finally:
+            if breaker is not None:
+                if failed is None:
+                    breaker.release()
+                elif failed:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+        # The last attempt either produced a response or raised.
+        assert response is not None
+        return response
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        timer: Optional[RequestTimer],
+        **kwargs: Any,
+    ) -> Tuple[httpx.Response, Optional[RequestTimer]]:
+        """One HTTP request, with its own trace when observers are registered."""
+        if timer is None or not self.observers:
+            return self._client.request(method, url, **kwargs), None
+        attempt = timer.attempt()
+        response = self._client.request(
+            method, url, extensions={"trace": attempt.trace}, **kwargs
+        )
+        return response, attempt
+
+    def _hedged_request(
+        self,
+        method: str,
+        url: str,
+        timer: Optional[RequestTimer],
+        **kwargs: Any,
+    ) -> Tuple[httpx.Response, Optional[RequestTimer]]:
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=8)
+        submit = self._hedge_executor.submit
+        first = submit(self._request, method, url, timer, **kwargs)
+        done, _ = wait([first], timeout=self.retry.hedge_delay)
+        if done:
+            return first.result()
+        second = submit(self._request, method, url, timer, **kwargs)
+        done, pending = wait([first, second], return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+        if pending:
+            return pending.pop().result()
+        return first.result()
+
+    def discover(self) -> Dict[str, Any]:
+        """
+        Get the platform discovery document (platform info and endpoints).
+
+        With a ``disk_cache`` the document is shared by every process using
+        the cache file and only fetched once it has expired.
+        """
+        key = f"discovery:{self.base_url}"
+        if self.disk_cache is not None:
+            stored = self.disk_cache.get(key)
+            if stored is not None and stored.fresh:
+                document: Dict[str, Any] = self.codec.loads(stored.value)
+                return document
+
+        url = f"{self.base_url}/api/v1/open/discovery"
+        with self._observe("discovery", "GET", url) as timer:
+            response = timer.response = self._send(
+                "GET",
+                url,
+                idempotent=True,
+                headers=self._get_headers(),
+                timer=timer,
             )
-        
-        return data.get("data", {})
+            data = self._handle_response(response, timer)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, self.codec.dumps(data))
+        return data
 
     def search_services(
         self,
@@ -57,65 +273,329 @@ class A2EClient:
         page: int = 1,
         size: int = 10,
     ) -> SearchResult:
-        """Search for services by keyword."""
+        """
+        Search for services by keyword.
+
+        Identical searches issued while one is already in flight share its
+        request and its ``SearchResult`` object.
+        """
+        # location may arrive as a list (e.g. decoded JSON); keys must be hashable
+        place = tuple(location) if location is not None else None
+        key = (keyword, service_type, place, page, size)
+        return self._search_flight.do(
+            key,
+            lambda: self._search_services(keyword, service_type, location, page, size),
+        )
+
+    def _search_services(
+        self,
+        keyword: str,
+        service_type: Optional[str],
+        location: Optional[Tuple[float, float]],
+        page: int,
+        size: int,
+    ) -> SearchResult:
         payload = {
             "keyword": keyword,
             "page": page,
             "size": size,
         }
-        
+
         if service_type:
             payload["type"] = service_type
-        
+
         if location:
             payload["location"] = {
                 "latitude": location[0],
                 "longitude": location[1],
             }
 
-        response = self._client.post(
-            f"{self.base_url}/api/v1/open/services/search",
-            json=payload,
-            headers=self._get_headers(),
-        )
-        
-        data = self._handle_response(response)
-        return SearchResult(
-            total=data.get("total", 0),
-            list=[Service(**s) for s in data.get("list", [])]
-        )
+        url = f"{self.base_url}/api/v1/open/services/search"
+        with self._observe("search", "POST", url) as timer:
+            response = timer.response = self._send(
+                "POST",
+                url,
+                idempotent=True,
+                hedge=True,
+                content=self.codec.dumps(payload),
+                headers=self._get_headers(),
+                timer=timer,
+            )
+            data = self._handle_response(response, timer)
+            return SearchResult(total=data.get("total", 0), list=data.get("list", []))
+
+    def iter_services(
+        self,
+        keyword: str,
+        service_type: Optional[str] = None,
+        location: Optional[Tuple[float, float]] = None,
+        size: int = 50,
+        prefetch: int = 1,
+    ) -> Iterator[Service]:
+        """
+        Iterate over every matching service, page by page.
+
+        While the caller consumes one page, up to ``prefetch`` following
+        pages are fetched in background threads. Only those pages are held
+        in memory at any time.
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        current = self.search_services(keyword, service_type, location, 1, size)
+        last_page = math.ceil(current.total / size)
+        pool = ThreadPoolExecutor(max_workers=prefetch) if prefetch > 0 else None
+        pending: Deque["Future[SearchResult]"] = deque()
+        next_page = 2
+        try:
+            while True:
+                while (
+                    pool is not None
+                    and next_page <= last_page
+                    and len(pending) < prefetch
+                ):
+                    pending.append(
+                        pool.submit(
+                            self.search_services,
+                            keyword,
+                            service_type,
+                            location,
+                            next_page,
+                            size,
+                        )
+                    )
+                    next_page += 1
+                yield from current.list
+                if not current.list:
+                    return
+                if pending:
+                    current = pending.popleft().result()
+                elif next_page <= last_page:
+                    current = self.search_services(
+                        keyword, service_type, location, next_page, size
+                    )
+                    next_page += 1
+                else:
+                    return
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
 
     def get_protocol(self, service_id: str) -> Protocol:
-        """Get the A2E protocol document for a service."""
-        response = self._client.get(
-            f"{self.base_url}/api/v1/open/services/{service_id}/protocol",
-            headers=self._get_headers(),
+        """
+        Get the A2E protocol document for a service.
+
+        Parsed documents are served from ``protocol_cache`` while fresh and
+        revalidated with ``If-None-Match`` once stale. Concurrent misses for
+        the same service share one request and one parsed ``Protocol``.
+        """
+        entry = self.protocol_cache.lookup(service_id)
+        if entry is not None and entry.fresh:
+            return entry.protocol
+        return self._protocol_flight.do(
+            service_id, lambda: self._fetch_protocol(service_id, entry)
         )
-        
-        data = self._handle_response(response)
-        return Protocol(**data)
+
+    def _fetch_protocol(
+        self,
+        service_id: str,
+        entry: Optional[CacheEntry],
+    ) -> Protocol:
+        headers = self._get_headers()
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        url = f"{self.base_url}/api/v1/open/services/{service_id}/protocol"
+        with self._observe("protocol", "GET", url) as timer:
+            response = timer.response = self._send(
+                "GET",
+                url,
+                service_id=service_id,
+                idempotent=True,
+                hedge=True,
+                headers=headers,
+                timer=timer,
+            )
+            if response.status_code == 304 and entry is not None:
+                return self.protocol_cache.revalidated(service_id, entry)
+
+            data = self._handle_response(response, timer)
+            protocol = Protocol(**data)
+        self.protocol_cache.put(service_id, protocol, etag=response.headers.get("ETag"))
+        return protocol
 
     def execute(
         self,
         service_id: str,
         endpoint: str,
-        consumer_token: str,
-        input_data: Dict[str, Any],
+        consumer_token: Optional[str] = None,
+        input_data: Optional[Dict[str, Any]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        validate: bool = False,
+        idempotency_key: Optional[str] = None,
     ) -> ExecuteResult:
-        """Execute a service endpoint."""
+        """
+        Execute a service endpoint.
+
+        Pass ``auth=(auth_type, auth_code)`` instead of ``consumer_token`` to
+        use a token from ``self.tokens``, fetched and refreshed as needed.
+        With ``validate=True`` the input is checked against the endpoint's
+        ``input_schema`` (from the cached protocol) before any request is
+        made, raising ``ValidationError`` on mismatch.
+
+        An ``idempotency_key`` (generated per call when the client was
+        created with ``idempotency_keys=True``) is sent as the
+        ``Idempotency-Key`` header. Every attempt reuses the same key, so
+        the call is retried like an idempotent one.
+        """
+        if input_data is None:
+            input_data = {}
+        if validate:
+            protocol = self.get_protocol(service_id)
+            spec = protocol.get_endpoint(endpoint)
+            if spec is not None:
+                spec.validate(input_data)
+        if consumer_token is None:
+            if auth is None:
+                raise ValueError("either consumer_token or auth is required")
+            consumer_token = self.tokens.get_token(*auth)
+
         payload = {
             "consumer_token": consumer_token,
             "input": input_data,
         }
 
-        response = self._client.post(
-            f"{self.base_url}/api/v1/open/services/{service_id}/execute/{endpoint}",
-            json=payload,
-            headers=self._get_headers(),
+        headers = self._get_headers()
+        if idempotency_key is None and self.idempotency_keys:
+            idempotency_key = uuid.uuid4().hex
+        if idempotency_key is not None:
+            headers["Idempotency-Key"] = idempotency_key
+
+        url = f"{self.base_url}/api/v1/open/services/{service_id}/execute/{endpoint}"
+        with self._observe("execute", "POST", url) as timer:
+            response = timer.response = self._send(
+                "POST",
+                url,
+                service_id=service_id,
+                idempotent=idempotency_key is not None,
+                content=self.codec.dumps(payload),
+                headers=headers,
+                timer=timer,
+            )
+            try:
+                data = self._handle_response(response, timer)
+            except httpx.HTTPStatusError:
+                if auth is not None and response.status_code == 401:
+                    self.tokens.invalidate(*auth)
+                raise
+            result: ExecuteResult = _build(ExecuteResult, data)
+            return result
+
+    def create_orders(
+        self,
+        service_id: str,
+        orders: List[Dict[str, Any]],
+        consumer_token: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        endpoint: str = "create_orders",
+        idempotency_key: Optional[str] = None,
+    ) -> List[BatchResult]:
+        """
+        Place many orders with one call to a batch endpoint.
+
+        ``orders`` are ``create_order`` inputs, sent as ``{"orders": [...]}``.
+        The service checks each order on its own, so the returned list
+        holds one ``BatchResult`` per order, in order: ``result.output`` is
+        the created order, or ``error`` says why that order was rejected.
+        """
+        result = self.execute(
+            service_id,
+            endpoint,
+            consumer_token,
+            {"orders": orders},
+            auth,
+            idempotency_key=idempotency_key,
         )
-        
-        data = self._handle_response(response)
-        return ExecuteResult(**data)
+        return _batch_results(service_id, endpoint, orders, result)
+
+    def watch_order(
+        self,
+        service_id: str,
+        order_no: str,
+        consumer_token: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        url: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[OrderEvent]:
+        """
+        Stream an order's status changes as they happen.
+
+        Yields the current status and then one ``OrderEvent`` per change,
+        stopping once the order is completed or cancelled. A dropped stream
+        is resumed with ``Last-Event-ID`` after a ``self.retry`` backoff.
+        ``timeout`` bounds the whole watch in seconds: connects, reads and
+        backoffs are capped at the time left (for reads, the time left when
+        the stream was opened). ``url`` replaces the platform stream, e.g. a
+        provider's ``/api/orders/{order_no}/events``.
+        """
+        if consumer_token is None:
+            if auth is None:
+                raise ValueError("either consumer_token or auth is required")
+            consumer_token = self.tokens.get_token(*auth)
+        url = _events_url(self.base_url, service_id, order_no, url)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        decoder = SSEDecoder()
+        failures = 0
+        while True:
+            retry_response = None
+            try:
+                with self._client.stream(
+                    "GET",
+                    url,
+                    headers=_stream_headers(
+                        self._get_headers(), consumer_token, decoder
+                    ),
+                    timeout=_stream_timeout(self._client.timeout, deadline),
+                ) as response:
+                    if response.status_code >= 400:
+                        response.read()
+                        if auth is not None and response.status_code == 401:
+                            self.tokens.invalidate(*auth)
+                        if not self.retry.should_retry(response):
+                            response.raise_for_status()
+                        retry_response = response
+                    else:
+                        for line in response.iter_lines():
+                            message = decoder.feed(line)
+                            if message is not None and message.event == "status":
+                                failures = 0
+                                event = _order_event(self.codec, message)
+                                yield event
+                                if event.terminal:
+                                    return
+                            if _expired(deadline):
+                                return
+            except httpx.TransportError:
+                # Includes the read timeout capped at the deadline.
+                if _expired(deadline):
+                    return
+                failures += 1
+                if failures >= self.retry.max_attempts:
+                    raise
+            else:
+                # Stream ended early or a retryable status: reconnect.
+                failures += 1
+                if failures >= self.retry.max_attempts:
+                    if retry_response is not None:
+                        retry_response.raise_for_status()
+                    raise A2EError(
+                        code="STREAM_CLOSED",
+                        message=f"Order {order_no} event stream ended early",
+                    )
+            if _expired(deadline):
+                return
+            time.sleep(
+                _capped(self.retry.backoff(failures - 1, retry_response), deadline)
+            )
 
     def get_consumer_token(
         self,
@@ -128,18 +608,33 @@ class A2EClient:
             "auth_code": auth_code,
         }
 
-        response = self._client.post(
-            f"{self.base_url}/api/v1/open/platform/get_user_token",
-            json=payload,
-            headers=self._get_headers(),
-        )
-        
-        data = self._handle_response(response)
-        return AuthResult(**data)
+        url = f"{self.base_url}/api/v1/open/platform/get_user_token"
+        with self._observe("token", "POST", url) as timer:
+            response = timer.response = self._send(
+                "POST",
+                url,
+                content=self.codec.dumps(payload),
+                headers=self._get_headers(),
+                timer=timer,
+            )
+            data = self._handle_response(response, timer)
+            result: AuthResult = _build(AuthResult, data)
+            return result
+
+    @property
+    def coalesced(self) -> Dict[str, int]:
+        """How many ``search`` and ``protocol`` calls joined an in-flight request."""
+        return {
+            "search": self._search_flight.coalesced,
+            "protocol": self._protocol_flight.coalesced,
+        }
 
     def close(self):
-        """Close the HTTP client."""
-        self._client.close()
+        """Close the HTTP client. A shared ``pool`` is left open."""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        if self._owns_pool:
+            self.pool.close()
 
     def __enter__(self):
         return self
@@ -157,12 +652,39 @@ class AsyncA2EClient:
         app_id: Optional[str] = None,
         app_secret: Optional[str] = None,
         timeout: int = 30,
+        protocol_cache: Optional[ProtocolCache] = None,
+        token_manager: Optional[AsyncTokenManager] = None,
+        codec: Optional[JSONCodec] = None,
+        pool: Optional[ConnectionPool] = None,
+        retry: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        observers: Optional[List[RequestObserver]] = None,
+        idempotency_keys: bool = False,
+        disk_cache: Optional[DiskCache] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.app_id = app_id
         self.app_secret = app_secret
         self.timeout = timeout
-        self._client = httpx.AsyncClient(timeout=timeout)
+        self.disk_cache = disk_cache
+        if protocol_cache is None:
+            protocol_cache = (
+                DiskProtocolCache(disk_cache, base_url=self.base_url)
+                if disk_cache is not None
+                else ProtocolCache()
+            )
+        self.protocol_cache = protocol_cache
+        self.tokens = token_manager or AsyncTokenManager(self.get_consumer_token)
+        self.codec = codec or default_codec()
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(PoolConfig(timeout=timeout))
+        self._client = self.pool.async_client
+        self.retry = retry or RetryPolicy()
+        self.breakers = breakers or CircuitBreakerRegistry()
+        self.observers: List[RequestObserver] = list(observers or [])
+        self.idempotency_keys = idempotency_keys
+        self._search_flight = AsyncSingleFlight()
+        self._protocol_flight = AsyncSingleFlight()
 
     def _get_headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
@@ -170,17 +692,177 @@ class AsyncA2EClient:
             headers["X-App-ID"] = self.app_id
         return headers
 
-    def _handle_response(self, response: httpx.Response) -> Dict[str, Any]:
+    def _handle_response(
+        self,
+        response: httpx.Response,
+        timer: Optional[RequestTimer] = None,
+    ) -> Dict[str, Any]:
         response.raise_for_status()
-        data = response.json()
-        
+        if timer is not None:
+            timer.decoding()
+        data = self.codec.loads(response.content)
+        if timer is not None:
+            timer.decoded()
+
         if data.get("code", 0) != 0:
             raise A2EError(
-                code=str(data.get("code")),
-                message=data.get("message", "Unknown error")
+                code=str(data.get("code")), message=data.get("message", "Unknown error")
+            )
+
+        result: Dict[str, Any] = data.get("data", {})
+        return result
+
+    @contextmanager
+    def _observe(self, api: str, method: str, url: str) -> Iterator[RequestTimer]:
+        """Time one API call and report it to ``observers``."""
+        timer = RequestTimer(api, method, url[len(self.base_url) :])
+        error = None
+        try:
+            yield timer
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if self.observers:
+                notify(self.observers, timer.finish(error))
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        service_id: Optional[str] = None,
+        idempotent: bool = False,
+        hedge: bool = False,
+        timer: Optional[RequestTimer] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a request through the circuit breaker and retry policy.
+
+        Only idempotent calls are retried or hedged. Transport errors, 429
+        and 5xx responses count as failures against ``service_id``'s
+        breaker; a call cancelled or interrupted by any other error counts
+        as neither failure nor success.
+        Every attempt is traced separately; ``timer`` keeps the trace of
+        the attempt whose response is returned.
+        """
+        breaker = self.breakers.get(service_id) if service_id else None
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                code="CIRCUIT_OPEN",
+                message=f"Service {service_id} is unavailable, "
+                f"retry in {breaker.retry_in():.1f}s",
+            )
+
+        attempts = self.retry.max_attempts if idempotent else 1
+        hedged = hedge and idempotent and self.retry.hedge_delay is not None
+        response = None
+        failed: Optional[bool] = None
+        try:
+            for attempt in range(attempts):
+                last = attempt == attempts - 1
+                try:
+                    if hedged:
+                        response, trace = await self._hedged_request(
+                            method, url, timer, **kwargs
+                        )
+                    else:
+                        response, trace = await self._request(
+                            method, url, timer, **kwargs
+                        )
+                except httpx.TransportError:
+                    failed = True
+                    if last:
+                        raise
+                    await asyncio.sleep(self.retry.backoff(attempt))
+                    continue
+                failed = is_failure(response)
+                if timer is not None and trace is not None:
+                    timer.adopt(trace)
+                if last or not self.retry.should_retry(response):
+                    break
+                await asyncio.sleep(self.retry.backoff(attempt, response))
+        finally:
+            if breaker is not None:
+                if failed is None:
+                    breaker.release()
+                elif failed:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+        # The last attempt either produced a response or raised.
+        assert response is not None
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        timer: Optional[RequestTimer],
+        **kwargs: Any,
+    ) -> Tuple[httpx.Response, Optional[RequestTimer]]:
+        """One HTTP request, with its own trace when observers are registered."""
+        if timer is None or not self.observers:
+            return await self._client.request(method, url, **kwargs), None
+        attempt = timer.attempt()
+        response = await self._client.request(
+            method, url, extensions={"trace": attempt.atrace}, **kwargs
+        )
+        return response, attempt
+
+    async def _hedged_request(
+        self,
+        method: str,
+        url: str,
+        timer: Optional[RequestTimer],
+        **kwargs: Any,
+    ) -> Tuple[httpx.Response, Optional[RequestTimer]]:
+        first = asyncio.ensure_future(self._request(method, url, timer, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=self.retry.hedge_delay)
+        if done:
+            return first.result()
+        second = asyncio.ensure_future(self._request(method, url, timer, **kwargs))
+        done, pending = await asyncio.wait(
+            {first, second}, return_when=asyncio.FIRST_COMPLETED
+        )
+        try:
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if pending:
+                return await pending.pop()
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def discover(self) -> Dict[str, Any]:
+        """
+        Get the platform discovery document (platform info and endpoints).
+
+        With a ``disk_cache`` the document is shared by every process using
+        the cache file and only fetched once it has expired.
+        """
+        key = f"discovery:{self.base_url}"
+        if self.disk_cache is not None:
+            stored = await asyncio.to_thread(self.disk_cache.get, key)
+            if stored is not None and stored.fresh:
+                document: Dict[str, Any] = self.codec.loads(stored.value)
+                return document
+
+        url = f"{self.base_url}/api/v1/open/discovery"
+        with self._observe("discovery", "GET", url) as timer:
+            response = timer.response = await self._send(
+                "GET",
+                url,
+                idempotent=True,
+                headers=self._get_headers(),
+                timer=timer,
             )
-        
-        return data.get("data", {})
+            data = self._handle_response(response, timer)
+        if self.disk_cache is not None:
+            await asyncio.to_thread(self.disk_cache.set, key, self.codec.dumps(data))
+        return data
 
     async def search_services(
         self,
@@ -190,65 +872,445 @@ class AsyncA2EClient:
         page: int = 1,
         size: int = 10,
     ) -> SearchResult:
-        """Search for services by keyword."""
+        """
+        Search for services by keyword.
+
+        Identical searches issued while one is already in flight share its
+        request and its ``SearchResult`` object.
+        """
+        # location may arrive as a list (e.g. decoded JSON); keys must be hashable
+        place = tuple(location) if location is not None else None
+        key = (keyword, service_type, place, page, size)
+        return await self._search_flight.do(
+            key,
+            lambda: self._search_services(keyword, service_type, location, page, size),
+        )
+
+    async def _search_services(
+        self,
+        keyword: str,
+        service_type: Optional[str],
+        location: Optional[Tuple[float, float]],
+        page: int,
+        size: int,
+    ) -> SearchResult:
         payload = {
             "keyword": keyword,
             "page": page,
             "size": size,
         }
-        
+
         if service_type:
             payload["type"] = service_type
-        
+
         if location:
             payload["location"] = {
                 "latitude": location[0],
                 "longitude": location[1],
             }
 
-        response = await self._client.post(
-            f"{self.base_url}/api/v1/open/services/search",
-            json=payload,
-            headers=self._get_headers(),
-        )
-        
-        data = self._handle_response(response)
-        return SearchResult(
-            total=data.get("total", 0),
-            list=[Service(**s) for s in data.get("list", [])]
-        )
+        url = f"{self.base_url}/api/v1/open/services/search"
+        with self._observe("search", "POST", url) as timer:
+            response = timer.response = await self._send(
+                "POST",
+                url,
+                idempotent=True,
+                hedge=True,
+                content=self.codec.dumps(payload),
+                headers=self._get_headers(),
+                timer=timer,
+            )
+            data = self._handle_response(response, timer)
+            return SearchResult(total=data.get("total", 0), list=data.get("list", []))
+
+    async def iter_services(
+        self,
+        keyword: str,
+        service_type: Optional[str] = None,
+        location: Optional[Tuple[float, float]] = None,
+        size: int = 50,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Service]:
+        """
+        Iterate over every matching service, page by page.
+
+        While the caller consumes one page, up to ``prefetch`` following
+        pages are requested concurrently. Only those pages are held in
+        memory at any time.
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        current = await self.search_services(keyword, service_type, location, 1, size)
+        last_page = math.ceil(current.total / size)
+        pending: Deque["asyncio.Task[SearchResult]"] = deque()
+        next_page = 2
+        try:
+            while True:
+                while next_page <= last_page and len(pending) < max(prefetch, 0):
+                    pending.append(
+                        asyncio.create_task(
+                            self.search_services(
+                                keyword,
+                                service_type,
+                                location,
+                                next_page,
+                                size,
+                            )
+                        )
+                    )
+                    next_page += 1
+                for service in current.list:
+                    yield service
+                if not current.list:
+                    return
+                if pending:
+                    current = await pending.popleft()
+                elif next_page <= last_page:
+                    current = await self.search_services(
+                        keyword, service_type, location, next_page, size
+                    )
+                    next_page += 1
+                else:
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def get_protocol(self, service_id: str) -> Protocol:
-        """Get the A2E protocol document for a service."""
-        response = await self._client.get(
-            f"{self.base_url}/api/v1/open/services/{service_id}/protocol",
-            headers=self._get_headers(),
+        """
+        Get the A2E protocol document for a service.
+
+        Parsed documents are served from ``protocol_cache`` while fresh and
+        revalidated with ``If-None-Match`` once stale. Concurrent misses for
+        the same service share one request and one parsed ``Protocol``.
+        """
+        entry = await self._lookup_protocol(service_id)
+        if entry is not None and entry.fresh:
+            return entry.protocol
+        return await self._protocol_flight.do(
+            service_id, lambda: self._fetch_protocol(service_id, entry)
+        )
+
+    async def _fetch_protocol(
+        self,
+        service_id: str,
+        entry: Optional[CacheEntry],
+    ) -> Protocol:
+        headers = self._get_headers()
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        url = f"{self.base_url}/api/v1/open/services/{service_id}/protocol"
+        with self._observe("protocol", "GET", url) as timer:
+            response = timer.response = await self._send(
+                "GET",
+                url,
+                service_id=service_id,
+                idempotent=True,
+                hedge=True,
+                headers=headers,
+                timer=timer,
+            )
+            if response.status_code == 304 and entry is not None:
+                return await self._cache_call(
+                    self.protocol_cache.revalidated, service_id, entry
+                )
+
+            data = self._handle_response(response, timer)
+            protocol = Protocol(**data)
+        await self._cache_call(
+            self.protocol_cache.put,
+            service_id,
+            protocol,
+            response.headers.get("ETag"),
         )
-        
-        data = self._handle_response(response)
-        return Protocol(**data)
+        return protocol
+
+    async def _lookup_protocol(self, service_id: str) -> Optional[CacheEntry]:
+        cache = self.protocol_cache
+        if cache.blocking:
+            # Fresh in-memory hits skip the thread hop; the rest may read disk.
+            entry = cache.peek(service_id)
+            if entry is None or not entry.fresh:
+                return await asyncio.to_thread(cache.lookup, service_id)
+        return cache.lookup(service_id)
+
+    async def _cache_call(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Call a protocol cache method, in a worker thread if it may block.
+
+        A ``DiskProtocolCache`` write can wait up to the SQLite busy timeout
+        for another process's lock, which must not stall the event loop.
+        """
+        if self.protocol_cache.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
 
     async def execute(
         self,
         service_id: str,
         endpoint: str,
-        consumer_token: str,
-        input_data: Dict[str, Any],
+        consumer_token: Optional[str] = None,
+        input_data: Optional[Dict[str, Any]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        validate: bool = False,
+        idempotency_key: Optional[str] = None,
     ) -> ExecuteResult:
-        """Execute a service endpoint."""
+        """
+        Execute a service endpoint.
+
+        Pass ``auth=(auth_type, auth_code)`` instead of ``consumer_token`` to
+        use a token from ``self.tokens``, fetched and refreshed as needed.
+        With ``validate=True`` the input is checked against the endpoint's
+        ``input_schema`` (from the cached protocol) before any request is
+        made, raising ``ValidationError`` on mismatch.
+
+        An ``idempotency_key`` (generated per call when the client was
+        created with ``idempotency_keys=True``) is sent as the
+        ``Idempotency-Key`` header. Every attempt reuses the same key, so
+        the call is retried like an idempotent one.
+        """
+        if input_data is None:
+            input_data = {}
+        if validate:
+            protocol = await self.get_protocol(service_id)
+            spec = protocol.get_endpoint(endpoint)
+            if spec is not None:
+                spec.validate(input_data)
+        if consumer_token is None:
+            if auth is None:
+                raise ValueError("either consumer_token or auth is required")
+            consumer_token = await self.tokens.get_token(*auth)
+
         payload = {
             "consumer_token": consumer_token,
             "input": input_data,
         }
 
-        response = await self._client.post(
-            f"{self.base_url}/api/v1/open/services/{service_id}/execute/{endpoint}",
-            json=payload,
-            headers=self._get_headers(),
+        headers = self._get_headers()
+        if idempotency_key is None and self.idempotency_keys:
+            idempotency_key = uuid.uuid4().hex
+        if idempotency_key is not None:
+            headers["Idempotency-Key"] = idempotency_key
+
+        url = f"{self.base_url}/api/v1/open/services/{service_id}/execute/{endpoint}"
+        with self._observe("execute", "POST", url) as timer:
+            response = timer.response = await self._send(
+                "POST",
+                url,
+                service_id=service_id,
+                idempotent=idempotency_key is not None,
+                content=self.codec.dumps(payload),
+                headers=headers,
+                timer=timer,
+            )
+            try:
+                data = self._handle_response(response, timer)
+            except httpx.HTTPStatusError:
+                if auth is not None and response.status_code == 401:
+                    self.tokens.invalidate(*auth)
+                raise
+            result: ExecuteResult = _build(ExecuteResult, data)
+            return result
+
+    async def execute_many(
+        self,
+        jobs: Iterable[Tuple[str, str, Dict[str, Any]]],
+        consumer_token: Optional[str] = None,
+        concurrency: int = 10,
+        ordered: bool = False,
+        auth: Optional[Tuple[str, str]] = None,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Execute many ``(service_id, endpoint, input_data)`` jobs.
+
+        At most ``concurrency`` requests are in flight at once. Results are
+        yielded as they complete, or in job order when ``ordered`` is set.
+        A failing job, including a malformed one, yields a ``BatchResult``
+        carrying the error instead of cancelling the rest of the batch. If
+        ``jobs`` itself raises, no further jobs start; the results of the
+        jobs already started are yielded and then the error is re-raised.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        if consumer_token is None and auth is None:
+            raise ValueError("either consumer_token or auth is required")
+
+        job_iter = enumerate(jobs)
+        results: "asyncio.Queue[Optional[BatchResult]]" = asyncio.Queue()
+        failure: Optional[Exception] = None
+
+        async def worker() -> None:
+            nonlocal failure
+            try:
+                while failure is None:
+                    try:
+                        index, job = next(job_iter)
+                    except StopIteration:
+                        return
+                    except Exception as e:
+                        failure = e
+                        return
+                    item = BatchResult(index=index, service_id="", endpoint="")
+                    try:
+                        service_id, endpoint, input_data = job
+                        item.service_id, item.endpoint = service_id, endpoint
+                        item.result = await self.execute(
+                            service_id, endpoint, consumer_token, input_data, auth
+                        )
+                    except A2EError as e:
+                        item.error = e
+                    except httpx.HTTPError as e:
+                        item.error = A2EError(code="HTTP_ERROR", message=str(e))
+                    except Exception as e:
+                        # e.g. a response the models cannot parse; keep the
+                        # batch going and report it on this job only.
+                        item.error = A2EError(code="CLIENT_ERROR", message=repr(e))
+                        item.error.__cause__ = e
+                    await results.put(item)
+            finally:
+                results.put_nowait(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        pending: Dict[int, BatchResult] = {}
+        next_index = 0
+        running = len(workers)
+        try:
+            while running:
+                item = await results.get()
+                if item is None:
+                    running -= 1
+                    continue
+                if not ordered:
+                    yield item
+                    continue
+                pending[item.index] = item
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        if failure is not None:
+            raise failure
+
+    async def create_orders(
+        self,
+        service_id: str,
+        orders: List[Dict[str, Any]],
+        consumer_token: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        endpoint: str = "create_orders",
+        idempotency_key: Optional[str] = None,
+    ) -> List[BatchResult]:
+        """
+        Place many orders with one call to a batch endpoint.
+
+        ``orders`` are ``create_order`` inputs, sent as ``{"orders": [...]}``.
+        The service checks each order on its own, so the returned list
+        holds one ``BatchResult`` per order, in order: ``result.output`` is
+        the created order, or ``error`` says why that order was rejected.
+        """
+        result = await self.execute(
+            service_id,
+            endpoint,
+            consumer_token,
+            {"orders": orders},
+            auth,
+            idempotency_key=idempotency_key,
         )
-        
-        data = self._handle_response(response)
-        return ExecuteResult(**data)
+        return _batch_results(service_id, endpoint, orders, result)
+
+    async def watch_order(
+        self,
+        service_id: str,
+        order_no: str,
+        consumer_token: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        url: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[OrderEvent]:
+        """
+        Stream an order's status changes as they happen.
+
+        Yields the current status and then one ``OrderEvent`` per change,
+        stopping once the order is completed or cancelled. A dropped stream
+        is resumed with ``Last-Event-ID`` after a ``self.retry`` backoff.
+        ``timeout`` bounds the whole watch in seconds: every connect, read
+        and backoff is cut short at the deadline. ``url`` replaces the
+        platform stream, e.g. a provider's ``/api/orders/{order_no}/events``.
+        """
+        if consumer_token is None:
+            if auth is None:
+                raise ValueError("either consumer_token or auth is required")
+            consumer_token = await self.tokens.get_token(*auth)
+        url = _events_url(self.base_url, service_id, order_no, url)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        decoder = SSEDecoder()
+        failures = 0
+        while True:
+            retry_response = None
+            try:
+                async with self._client.stream(
+                    "GET",
+                    url,
+                    headers=_stream_headers(
+                        self._get_headers(), consumer_token, decoder
+                    ),
+                    timeout=_stream_timeout(self._client.timeout, deadline),
+                ) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        if auth is not None and response.status_code == 401:
+                            self.tokens.invalidate(*auth)
+                        if not self.retry.should_retry(response):
+                            response.raise_for_status()
+                        retry_response = response
+                    else:
+                        lines = response.aiter_lines()
+                        while True:
+                            try:
+                                line = await asyncio.wait_for(
+                                    lines.__anext__(), _remaining(deadline)
+                                )
+                            except StopAsyncIteration:
+                                break
+                            except asyncio.TimeoutError:
+                                return
+                            message = decoder.feed(line)
+                            if message is not None and message.event == "status":
+                                failures = 0
+                                event = _order_event(self.codec, message)
+                                yield event
+                                if event.terminal:
+                                    return
+                            if _expired(deadline):
+                                return
+            except httpx.TransportError:
+                # Includes the read timeout capped at the deadline.
+                if _expired(deadline):
+                    return
+                failures += 1
+                if failures >= self.retry.max_attempts:
+                    raise
+            else:
+                # Stream ended early or a retryable status: reconnect.
+                failures += 1
+                if failures >= self.retry.max_attempts:
+                    if retry_response is not None:
+                        retry_response.raise_for_status()
+                    raise A2EError(
+                        code="STREAM_CLOSED",
+                        message=f"Order {order_no} event stream ended early",
+                    )
+            if _expired(deadline):
+                return
+            await asyncio.sleep(
+                _capped(self.retry.backoff(failures - 1, retry_response), deadline)
+            )
 
     async def get_consumer_token(
         self,
@@ -261,21 +1323,136 @@ class AsyncA2EClient:
             "auth_code": auth_code,
         }
 
-        response = await self._client.post(
-            f"{self.base_url}/api/v1/open/platform/get_user_token",
-            json=payload,
-            headers=self._get_headers(),
-        )
-        
-        data = self._handle_response(response)
-        return AuthResult(**data)
+        url = f"{self.base_url}/api/v1/open/platform/get_user_token"
+        with self._observe("token", "POST", url) as timer:
+            response = timer.response = await self._send(
+                "POST",
+                url,
+                content=self.codec.dumps(payload),
+                headers=self._get_headers(),
+                timer=timer,
+            )
+            data = self._handle_response(response, timer)
+            result: AuthResult = _build(AuthResult, data)
+            return result
+
+    @property
+    def coalesced(self) -> Dict[str, int]:
+        """How many ``search`` and ``protocol`` calls joined an in-flight request."""
+        return {
+            "search": self._search_flight.coalesced,
+            "protocol": self._protocol_flight.coalesced,
+        }
 
     async def close(self):
-        """Close the HTTP client."""
-        await self._client.aclose()
+        """Close the HTTP client. A shared ``pool`` is left open."""
+        if self._owns_pool:
+            await self.pool.aclose()
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
+
+
+def _batch_results(
+    service_id: str,
+    endpoint: str,
+    orders: List[Dict[str, Any]],
+    result: ExecuteResult,
+) -> List[BatchResult]:
+    items = [
+        BatchResult(index=index, service_id=service_id, endpoint=endpoint)
+        for index in range(len(orders))
+    ]
+    for row in result.output.get("results", ()):
+        item = items[row["index"]]
+        if row.get("success"):
+            item.result = ExecuteResult(
+                execution_id=result.execution_id,
+                status=result.status,
+                output=row.get("order") or {},
+            )
+        else:
+            error = row.get("error") or {}
+            item.error = A2EError(
+                code=str(error.get("code", "UNKNOWN")),
+                message=error.get("message", "Unknown error"),
+            )
+    for item in items:
+        if item.result is None and item.error is None:
+            item.error = A2EError(
+                code="NO_RESULT", message="Order missing from batch response"
+            )
+    return items
+
+
+def _events_url(
+    base_url: str,
+    service_id: str,
+    order_no: str,
+    url: Optional[str],
+) -> str:
+    if url is None:
+        url = f"{base_url}/api/v1/open/services/{service_id}/orders/{{order_no}}/events"
+    return url.replace("{order_no}", order_no)
+
+
+def _stream_headers(
+    headers: Dict[str, str],
+    consumer_token: str,
+    decoder: SSEDecoder,
+) -> Dict[str, str]:
+    headers["Accept"] = "text/event-stream"
+    headers["X-Consumer-Token"] = consumer_token
+    if decoder.last_event_id is not None:
+        headers["Last-Event-ID"] = decoder.last_event_id
+    return headers
+
+
+def _order_event(codec: JSONCodec, message: SSEMessage) -> OrderEvent:
+    data = codec.loads(message.data.encode("utf-8"))
+    if message.id and message.id.isdigit():
+        data["version"] = int(message.id)
+    event: OrderEvent = _build(OrderEvent, data)
+    return event
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left before ``deadline``, or None without one."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def _capped(delay: float, deadline: Optional[float]) -> float:
+    remaining = _remaining(deadline)
+    return delay if remaining is None else min(delay, remaining)
+
+
+def _stream_timeout(timeout: httpx.Timeout, deadline: Optional[float]) -> httpx.Timeout:
+    """
+    The client's timeouts, each capped at the time left before ``deadline``.
+
+    httpx applies the read timeout to every read, so a stream that only
+    sends heartbeats still gives up within the remaining time.
+    """
+    remaining = _remaining(deadline)
+    if remaining is None:
+        return timeout
+    remaining = max(remaining, 0.001)
+
+    def cap(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(
+        connect=cap(timeout.connect),
+        read=cap(timeout.read),
+        write=cap(timeout.write),
+        pool=cap(timeout.pool),
+    )
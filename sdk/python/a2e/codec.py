@@ -0,0 +1,86 @@
+"""
+A2E JSON Codecs
+
+The client encodes request bodies and decodes responses through a codec
+object. ``default_codec()`` picks the fastest library installed: orjson,
+then msgspec, then the standard library.
+"""
+
+import json
+from functools import partial
+from typing import Any, Optional
+
+
+class JSONCodec:
+    """Standard-library JSON codec."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by ``orjson``."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        # Like json.dumps, accept int/float/bool keys such as {1: "x"}.
+        self.dumps = partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+        self.loads = orjson.loads
+
+
+class MsgspecCodec(JSONCodec):
+    """Codec backed by ``msgspec.json``."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec  # type: ignore[import-not-found, unused-ignore]
+
+        self.dumps = msgspec.json.Encoder().encode
+        self.loads = msgspec.json.Decoder().decode
+
+
+_CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": JSONCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Return a codec by name, or the fastest installed one.
+
+    Raises ``ImportError`` if a named codec's library is not installed.
+    """
+    if name is not None:
+        if name not in _CODECS:
+            raise ValueError(f"unknown codec {name!r}, expected one of {list(_CODECS)}")
+        return _CODECS[name]()
+    for factory in (OrjsonCodec, MsgspecCodec):
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return JSONCodec()
+
+
+_default: Optional[JSONCodec] = None
+
+
+def default_codec() -> JSONCodec:
+    """Return the shared auto-selected codec."""
+    global _default
+    if _default is None:
+        _default = get_codec()
+    return _default
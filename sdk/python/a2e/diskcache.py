@@ -0,0 +1,239 @@
+"""
+A2E Persistent Disk Cache
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from .cache import CacheEntry, ProtocolCache
+from .codec import JSONCodec, default_codec
+from .models import Protocol
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    value      BLOB NOT NULL,
+    etag       TEXT,
+    expires_at REAL NOT NULL,
+    stored_at  REAL NOT NULL,
+    size       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_stored ON entries (stored_at);
+"""
+
+
+@dataclass(slots=True)
+class DiskEntry:
+    """A stored value with its validator and wall-clock expiry."""
+
+    value: bytes
+    etag: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value cache shared by every process using ``path``.
+
+    The database runs in WAL mode, so any number of processes read while
+    one writes. Values are zlib-compressed. Entries are fresh for ``ttl``
+    seconds and then kept for ``keep_stale`` more seconds so they can be
+    revalidated with their ETag; when the values exceed ``max_bytes`` the
+    least recently stored entries are dropped. Reads never write, which
+    keeps warm starts of many workers free of lock contention.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 3600.0,
+        keep_stale: float = 86400.0,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.keep_stale = keep_stale
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[DiskEntry]:
+        """Return the entry for ``key``, fresh or stale, or None."""
+        row = (
+            self._conn()
+            .execute(
+                "SELECT value, etag, expires_at FROM entries WHERE key = ?", (key,)
+            )
+            .fetchone()
+        )
+        if row is None or row[2] + self.keep_stale < time.time():
+            return None
+        return DiskEntry(zlib.decompress(row[0]), row[1], row[2])
+
+    def set(
+        self,
+        key: str,
+        value: bytes,
+        etag: Optional[str] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        blob = zlib.compress(value)
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (key, value, etag, expires_at, stored_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, etag, expires_at, now, len(blob)),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        """Mark ``key`` fresh again, e.g. after a 304 Not Modified."""
+        now = time.time()
+        self._conn().execute(
+            "UPDATE entries SET expires_at = ?, stored_at = ? WHERE key = ?",
+            (now + (self.ttl if ttl is None else ttl), now, key),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self, prefix: str = "") -> None:
+        """Drop every entry whose key starts with ``prefix``."""
+        self._conn().execute(
+            "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "DELETE FROM entries WHERE expires_at < ?", (now - self.keep_stale,)
+        )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM entries ORDER BY stored_at")
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def __len__(self) -> int:
+        row = self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()
+        count: int = row[0]
+        return count
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class DiskProtocolCache(ProtocolCache):
+    """
+    ``ProtocolCache`` backed by a ``DiskCache``.
+
+    Lookups try memory first, then disk, so a freshly started worker
+    serves protocols that any process stored before without a network
+    call. Stale disk entries come back with their ETag and are
+    revalidated with ``If-None-Match`` like in-memory ones. Keys include
+    ``base_url``, so clients of different platforms (e.g. staging and
+    production) can share one file without serving each other's protocols.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        disk: DiskCache,
+        maxsize: int = 256,
+        ttl: Optional[float] = None,
+        codec: Optional[JSONCodec] = None,
+        base_url: str = "",
+    ):
+        super().__init__(maxsize=maxsize, ttl=disk.ttl if ttl is None else ttl)
+        self.disk = disk
+        self.prefix = f"protocol:{base_url.rstrip('/')}:"
+        self.codec = codec or default_codec()
+        self.disk_hits = 0
+
+    def lookup(self, service_id: str) -> Optional[CacheEntry]:
+        entry = super().lookup(service_id)
+        if entry is not None and entry.fresh:
+            return entry
+        stored = self.disk.get(self._key(service_id))
+        if stored is None or (entry is not None and not stored.fresh):
+            return entry
+        protocol = Protocol(**self.codec.loads(stored.value))
+        remaining = stored.expires_at - time.time()
+        entry = CacheEntry(protocol, time.monotonic() + remaining, stored.etag)
+        with self._lock:
+            self._entries[service_id] = entry
+            self._entries.move_to_end(service_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+            if entry.fresh:
+                # Counted as a miss by the memory lookup; it is a hit after all.
+                self.stats.misses -= 1
+                self.stats.hits += 1
+                self.disk_hits += 1
+        return entry
+
+    def put(
+        self,
+        service_id: str,
+        protocol: Protocol,
+        etag: Optional[str] = None,
+    ) -> None:
+        super().put(service_id, protocol, etag)
+        self.disk.set(
+            self._key(service_id),
+            self.codec.dumps(protocol.to_dict()),
+            etag=etag,
+            ttl=self.ttl,
+        )
+
+    def revalidated(self, service_id: str, entry: CacheEntry) -> Protocol:
+        self.disk.touch(self._key(service_id), ttl=self.ttl)
+        return super().revalidated(service_id, entry)
+
+    def invalidate(self, service_id: Optional[str] = None) -> None:
+        super().invalidate(service_id)
+        if service_id is None:
+            self.disk.clear(self.prefix)
+        else:
+            self.disk.delete(self._key(service_id))
+
+    def _key(self, service_id: str) -> str:
+        return self.prefix + service_id
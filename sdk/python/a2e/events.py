@@ -0,0 +1,55 @@
+"""
+A2E Server-Sent Events Decoding
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class SSEMessage:
+    """One dispatched server-sent event."""
+
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+
+
+class SSEDecoder:
+    """
+    Incremental ``text/event-stream`` decoder.
+
+    Feed it one line at a time (without the line terminator); a blank
+    line dispatches the event built so far. Comments (heartbeats) and
+    events without data are skipped, as the spec requires.
+    """
+
+    def __init__(self):
+        self.last_event_id: Optional[str] = None
+        self._event = ""
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[SSEMessage]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None
+        name, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if name == "data":
+            self._data.append(value)
+        elif name == "event":
+            self._event = value
+        elif name == "id" and "\0" not in value:
+            self.last_event_id = value
+        return None
+
+    def _dispatch(self) -> Optional[SSEMessage]:
+        data, event = self._data, self._event
+        self._data, self._event = [], ""
+        if not data:
+            return None
+        return SSEMessage(
+            event=event or "message", data="\n".join(data), id=self.last_event_id
+        )
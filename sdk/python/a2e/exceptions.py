@@ -2,6 +2,8 @@
 A2E Protocol Exceptions
 """
 
+from typing import List, Optional
+
 
 class A2EError(Exception):
     """Base exception for A2E errors."""
@@ -14,19 +16,42 @@ class A2EError(Exception):
 
 class AuthenticationError(A2EError):
     """Authentication failed."""
+
     pass
 
 
 class PermissionDeniedError(A2EError):
     """Permission denied."""
+
     pass
 
 
 class ServiceNotFoundError(A2EError):
     """Service not found."""
+
     pass
 
 
 class ExecutionError(A2EError):
     """Execution failed."""
+
+    pass
+
+
+class CircuitOpenError(A2EError):
+    """The service's circuit breaker is open; the call was not sent."""
+
     pass
+
+
+class ValidationError(A2EError):
+    """Input data does not match the endpoint's input schema."""
+
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        errors: Optional[List[str]] = None,
+    ):
+        self.errors = errors or []
+        super().__init__(code, message)
@@ -0,0 +1,289 @@
+"""
+A2E Spatial Service Index
+
+Answers "which services deliver to this point" from a locally cached
+catalogue. Each service's delivery disc is registered in every grid cell it
+overlaps, so a lookup only checks the services of one cell. Batch lookups
+group points by cell and, when numpy is installed, compute each cell's
+distance matrix in one vectorised pass.
+"""
+
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+from .models import Protocol
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+_RADIUS = re.compile(
+    r"配送(?:范围|半径)\D{0,6}?(\d+(?:\.\d+)?)\s*(公里|千米|km|米|m)",
+    re.IGNORECASE,
+)
+
+Point = Tuple[float, float]
+Match = Tuple[str, float]
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres between two (lat, lon) points."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((p2 - p1) / 2) ** 2
+        + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def delivery_radius(protocol: Protocol) -> Optional[float]:
+    """
+    Delivery radius in kilometres declared by a protocol, if any.
+
+    Reads constraints such as ``配送范围：3公里内`` or ``配送范围500米``, then
+    the semantic description.
+    """
+    semantic = protocol.semantic
+    if semantic is None:
+        return None
+    for text in [*semantic.constraints, semantic.description]:
+        match = _RADIUS.search(text)
+        if match:
+            value = float(match.group(1))
+            unit = match.group(2).lower()
+            return value / 1000 if unit in ("米", "m") else value
+    return None
+
+
+class SpatialIndex:
+    """
+    Grid index of service locations and delivery radii.
+
+    ``cell_km`` trades memory for lookup cost: a service is stored once per
+    cell its delivery disc overlaps, and a lookup checks every service
+    stored in the point's cell. The default suits radii of a few km.
+    """
+
+    def __init__(self, cell_km: float = 5.0):
+        self.cell_deg = cell_km / _KM_PER_DEGREE
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._types: List[Optional[str]] = []
+        self._lats: List[float] = []
+        self._lons: List[float] = []
+        self._radii: List[float] = []
+        # Radians and cos(latitude), precomputed for distance checks.
+        self._phis: List[float] = []
+        self._lams: List[float] = []
+        self._coss: List[float] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._arrays: Optional[Dict[str, Any]] = None
+        self._cell_arrays: Dict[Tuple[int, int], "np.ndarray"] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, service_id: str) -> bool:
+        return service_id in self._slots
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _covered(self, lat: float, lon: float, radius: float) -> List[Tuple[int, int]]:
+        dlat = radius / _KM_PER_DEGREE
+        # Widen by the latitude nearest the pole, where a degree is shortest.
+        cos = math.cos(math.radians(min(abs(lat) + dlat, 89.9)))
+        dlon = radius / (_KM_PER_DEGREE * cos)
+        row0, col0 = self._cell(lat - dlat, lon - dlon)
+        row1, col1 = self._cell(lat + dlat, lon + dlon)
+        return [
+            (row, col) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)
+        ]
+
+    def add(
+        self,
+        service_id: str,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        service_type: Optional[str] = None,
+    ) -> None:
+        """Store a service, replacing any earlier entry with the same id."""
+        with self._lock:
+            self._discard(service_id)
+            slot = len(self._ids)
+            self._slots[service_id] = slot
+            self._ids.append(service_id)
+            self._types.append(service_type)
+            self._lats.append(latitude)
+            self._lons.append(longitude)
+            self._radii.append(radius_km)
+            phi = math.radians(latitude)
+            self._phis.append(phi)
+            self._lams.append(math.radians(longitude))
+            self._coss.append(math.cos(phi))
+            for cell in self._covered(latitude, longitude, radius_km):
+                self._cells.setdefault(cell, []).append(slot)
+            self._arrays = None
+
+    def add_protocol(
+        self,
+        protocol: Protocol,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float] = None,
+    ) -> None:
+        """
+        Store a service from its protocol document.
+
+        ``radius_km`` defaults to the radius declared in the protocol's
+        constraints; ``ValueError`` is raised if it declares none.
+        """
+        if radius_km is None:
+            radius_km = delivery_radius(protocol)
+            if radius_km is None:
+                raise ValueError(
+                    f"{protocol.service.id}: protocol declares no delivery radius"
+                )
+        service = protocol.service
+        self.add(service.id, latitude, longitude, radius_km, service.type)
+
+    def remove(self, service_id: str) -> bool:
+        with self._lock:
+            return self._discard(service_id)
+
+    def _discard(self, service_id: str) -> bool:
+        slot = self._slots.pop(service_id, None)
+        if slot is None:
+            return False
+        for cell in self._covered(
+            self._lats[slot], self._lons[slot], self._radii[slot]
+        ):
+            slots = self._cells[cell]
+            slots.remove(slot)
+            if not slots:
+                del self._cells[cell]
+        self._ids[slot] = None
+        self._types[slot] = None
+        self._arrays = None
+        return True
+
+    def deliverable(
+        self,
+        latitude: float,
+        longitude: float,
+        service_type: Optional[str] = None,
+    ) -> List[Match]:
+        """``(service_id, distance_km)`` of services delivering here, nearest first."""
+        phi = math.radians(latitude)
+        lam = math.radians(longitude)
+        cos_phi = math.cos(phi)
+        phis, lams, coss = self._phis, self._lams, self._coss
+        radii, types = self._radii, self._types
+        # Only live slots are reachable from a cell, so their ids are set.
+        ids = cast(List[str], self._ids)
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        matches = []
+        for slot in self._cells.get(self._cell(latitude, longitude), ()):
+            if service_type is not None and types[slot] != service_type:
+                continue
+            a = (
+                sin((phis[slot] - phi) / 2) ** 2
+                + cos_phi * coss[slot] * sin((lams[slot] - lam) / 2) ** 2
+            )
+            distance = 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+            if distance <= radii[slot]:
+                matches.append((ids[slot], distance))
+        matches.sort(key=lambda m: m[1])
+        return matches
+
+    def deliverable_many(
+        self,
+        points: Union[Sequence[Point], "np.ndarray"],
+        service_type: Optional[str] = None,
+    ) -> List[List[Match]]:
+        """
+        ``deliverable`` for many points at once.
+
+        Points are grouped by grid cell so each cell's candidates are
+        loaded once; with numpy the distances for a whole cell are computed
+        as one matrix.
+        """
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for i, (lat, lon) in enumerate(points):
+            groups.setdefault(self._cell(lat, lon), []).append(i)
+        results: List[List[Match]] = [[] for _ in range(len(points))]
+        if not HAS_NUMPY:
+            for indices in groups.values():
+                for i in indices:
+                    lat, lon = points[i]
+                    results[i] = self.deliverable(lat, lon, service_type)
+            return results
+
+        arrays = self._vectors()
+        coords = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+        type_code = arrays["codes"].get(service_type, -1)
+        for cell, indices in groups.items():
+            slots = self._cell_slots(cell)
+            if service_type is not None and len(slots):
+                slots = slots[arrays["types"][slots] == type_code]
+            if not len(slots):
+                continue
+            query = coords[indices]
+            distances = _haversine_matrix(
+                arrays["lats"][slots, None],
+                arrays["lons"][slots, None],
+                query[None, :, 0],
+                query[None, :, 1],
+            )
+            inside = distances <= arrays["radii"][slots, None]
+            for column, i in enumerate(indices):
+                rows = np.flatnonzero(inside[:, column])
+                if not len(rows):
+                    continue
+                found = distances[rows, column]
+                order = np.argsort(found, kind="stable")
+                ids = self._ids
+                results[i] = [(ids[slots[rows[r]]], float(found[r])) for r in order]
+        return results
+
+    def _vectors(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._arrays is None:
+                codes: Dict[Optional[str], int] = {}
+                types = [codes.setdefault(t, len(codes)) for t in self._types]
+                self._arrays = {
+                    "lats": np.asarray(self._phis, dtype=np.float64),
+                    "lons": np.asarray(self._lams, dtype=np.float64),
+                    "radii": np.asarray(self._radii, dtype=np.float64),
+                    "types": np.asarray(types, dtype=np.int32),
+                    "codes": codes,
+                }
+                self._cell_arrays = {}
+            return self._arrays
+
+    def _cell_slots(self, cell: Tuple[int, int]) -> "np.ndarray":
+        slots = self._cell_arrays.get(cell)
+        if slots is None:
+            slots = self._cell_arrays[cell] = np.asarray(
+                self._cells.get(cell, ()), dtype=np.intp
+            )
+        return slots
+
+
+def _haversine_matrix(lat1, lon1, lat2, lon2):
+    """Pairwise haversine distances in km for radian arrays that broadcast."""
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
@@ -0,0 +1,252 @@
+"""
+A2E Request Instrumentation
+
+Clients report one ``RequestTiming`` per API call to every registered
+``RequestObserver``. Phase timings come from httpcore trace events, so
+connect time is zero when a pooled connection was reused, and all network
+phases are zero for transports that do not emit traces (e.g. MockTransport).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+PHASES = ("connect", "ttfb", "body_read", "decode", "model", "total")
+
+
+@dataclass(slots=True)
+class RequestTiming:
+    """Timings of one API call, in seconds."""
+
+    api: str
+    method: str
+    endpoint: str
+    status: Optional[int] = None
+    error: Optional[str] = None
+    connect: float = 0.0
+    ttfb: float = 0.0
+    body_read: float = 0.0
+    decode: float = 0.0
+    model: float = 0.0
+    total: float = 0.0
+
+
+class RequestObserver:
+    """
+    Receives a ``RequestTiming`` after every API call.
+
+    Observers run inline on the calling thread or event loop, so they
+    should be fast. Exceptions raised by an observer are ignored.
+    """
+
+    def on_request(self, timing: RequestTiming) -> None:
+        raise NotImplementedError
+
+
+class RequestTimer:
+    """Collects trace events and phase marks for a single API call."""
+
+    __slots__ = (
+        "api",
+        "method",
+        "endpoint",
+        "response",
+        "_start",
+        "_events",
+        "_decode_start",
+        "_decode_end",
+    )
+
+    def __init__(self, api: str, method: str, endpoint: str):
+        self.api = api
+        self.method = method
+        self.endpoint = endpoint
+        self.response: Optional[httpx.Response] = None
+        self._start = time.perf_counter()
+        self._events: Dict[str, float] = {}
+        self._decode_start = 0.0
+        self._decode_end = 0.0
+
+    def trace(self, event: str, info: Dict[str, Any]) -> None:
+        # Drop the "http11." / "http2." / "connection." prefix.
+        self._events[event.split(".", 1)[-1]] = time.perf_counter()
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self.trace(event, info)
+
+    def attempt(self) -> "RequestTimer":
+        """A timer collecting the trace events of one HTTP attempt."""
+        return RequestTimer(self.api, self.method, self.endpoint)
+
+    def adopt(self, attempt: "RequestTimer") -> None:
+        """Use the trace of ``attempt``, the one whose response is returned."""
+        self._events = attempt._events
+
+    def decoding(self) -> None:
+        self._decode_start = time.perf_counter()
+
+    def decoded(self) -> None:
+        self._decode_end = time.perf_counter()
+
+    def _span(self, name: str) -> float:
+        started = self._events.get(f"{name}.started")
+        completed = self._events.get(f"{name}.complete")
+        if started is None or completed is None:
+            return 0.0
+        return completed - started
+
+    def finish(self, error: Optional[BaseException] = None) -> RequestTiming:
+        end = time.perf_counter()
+        sent = self._events.get("send_request_headers.started")
+        headers = self._events.get("receive_response_headers.complete")
+        timing = RequestTiming(
+            api=self.api,
+            method=self.method,
+            endpoint=self.endpoint,
+            connect=self._span("connect_tcp") + self._span("start_tls"),
+            body_read=self._span("receive_response_body"),
+            total=end - self._start,
+        )
+        if self.response is not None:
+            timing.status = self.response.status_code
+        if error is not None:
+            timing.error = type(error).__name__
+        if sent is not None and headers is not None:
+            timing.ttfb = headers - sent
+        if self._decode_end:
+            timing.decode = self._decode_end - self._decode_start
+            timing.model = end - self._decode_end
+        return timing
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are stored in microseconds in buckets whose width is at most
+    ``1 / 2**(precision_bits - 1)`` of their value (under 1.6% with the
+    default of 7 bits), using memory proportional to the number of
+    distinct buckets hit rather than the number of samples.
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.count = 0
+        self.min = 0.0
+        self.max = 0.0
+        self._sum = 0.0
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, micros: int) -> int:
+        shift = max(micros.bit_length() - self.precision_bits, 0)
+        return (shift << self.precision_bits) + (micros >> shift)
+
+    def _value(self, index: int) -> float:
+        # Midpoint of the bucket's value range.
+        shift = index >> self.precision_bits
+        mantissa = index & ((1 << self.precision_bits) - 1)
+        return ((mantissa << shift) + ((1 << shift) >> 1)) / 1e6
+
+    def record(self, seconds: float) -> None:
+        index = self._index(max(int(seconds * 1e6), 0))
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            if not self.count or seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+            self.count += 1
+            self._sum += seconds
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Value in seconds at or below which ``p`` percent of samples fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(p / 100 * self.count))
+        seen = 0
+        with self._lock:
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= rank:
+                    return min(self._value(index), self.max)
+        return self.max
+
+    def percentiles(
+        self,
+        ps: Tuple[float, ...] = (50, 95, 99),
+    ) -> Dict[str, float]:
+        """Count plus mean, max and the requested percentiles in milliseconds."""
+        summary: Dict[str, float] = {
+            "count": self.count,
+            "mean": self.mean * 1e3,
+            "max": self.max * 1e3,
+        }
+        for p in ps:
+            summary[f"p{p:g}"] = self.percentile(p) * 1e3
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self.count = 0
+            self.min = self.max = self._sum = 0.0
+
+
+class LatencyCollector(RequestObserver):
+    """
+    In-memory histograms per API (``search``, ``protocol``, ``execute``,
+    ``token``) and phase.
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.errors: Dict[str, int] = {}
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, api: str, phase: str = "total") -> LatencyHistogram:
+        key = (api, phase)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key, LatencyHistogram(self.precision_bits)
+                )
+        return histogram
+
+    def on_request(self, timing: RequestTiming) -> None:
+        for phase in PHASES:
+            self.histogram(timing.api, phase).record(getattr(timing, phase))
+        if timing.error is not None or (timing.status or 0) >= 400:
+            self.errors[timing.api] = self.errors.get(timing.api, 0) + 1
+
+    def percentiles(self, api: str, phase: str = "total") -> Dict[str, float]:
+        """p50/p95/p99 in milliseconds for one API and phase."""
+        return self.histogram(api, phase).percentiles()
+
+    def summary(self, phase: str = "total") -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 in milliseconds for every API seen so far."""
+        apis = sorted({api for api, _ in list(self._histograms)})
+        return {api: self.percentiles(api, phase) for api in apis}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self.errors.clear()
+
+
+def notify(observers: List[RequestObserver], timing: RequestTiming) -> None:
+    for observer in observers:
+        try:
+            observer.on_request(timing)
+        except Exception:
+            # Instrumentation must never break the call being measured.
+            pass
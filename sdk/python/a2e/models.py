@@ -2,21 +2,98 @@
 A2E Protocol Data Models
 """
 
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from .exceptions import A2EError, ValidationError
+from .validation import compile_schema
 
-@dataclass
+
+class _Raw:
+    """Marks a section that has not been converted to model objects yet."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class _Lazy:
+    """
+    Slot-backed attribute that converts its raw value on first access.
+
+    The converted object replaces the raw value in the slot, so later
+    reads cost one attribute lookup and one type check.
+    """
+
+    def __init__(self, slot: str, convert: Callable[[Any], Any]):
+        self.slot = slot
+        self.convert = convert
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if type(value) is _Raw:
+            value = self.convert(value.value)
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        setattr(obj, self.slot, value)
+
+
+_INIT_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _build(cls: type, data: Any) -> Any:
+    """Build ``cls`` from a dict, ignoring keys the model does not know."""
+    if not isinstance(data, dict):
+        return data
+    try:
+        return cls(**data)
+    except TypeError:
+        pass
+    names = _INIT_FIELDS.get(cls)
+    if names is None:
+        names = _INIT_FIELDS[cls] = tuple(f.name for f in fields(cls) if f.init)
+    return cls(**{k: v for k, v in data.items() if k in names})
+
+
+def _plain(value: Any) -> Any:
+    """Undo ``_build``: model objects back to dicts, skipping non-init fields."""
+    if type(value) is _Raw:
+        return value.value
+    if hasattr(value, "__dataclass_fields__"):
+        return {f.name: _plain(getattr(value, f.name)) for f in fields(value) if f.init}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _build_list(cls: type) -> Callable[[Any], Any]:
+    def convert(items: Any) -> Any:
+        return [_build(cls, item) for item in items or ()]
+
+    return convert
+
+
+@dataclass(slots=True)
 class Provider:
     """Service provider information."""
+
     id: str
     name: str
     certification: str = "none"
 
 
-@dataclass
+@dataclass(slots=True)
 class Service:
     """Service information."""
+
     id: str
     name: str
     type: str
@@ -27,19 +104,37 @@ class Service:
 
     def __post_init__(self):
         if isinstance(self.provider, dict):
-            self.provider = Provider(**self.provider)
+            self.provider = _build(Provider, self.provider)
 
 
-@dataclass
 class SearchResult:
-    """Search result containing services."""
-    total: int
-    list: List[Service] = field(default_factory=list)
+    """
+    Search result containing services.
+
+    Rows are kept as raw dicts until ``list`` is first read.
+    """
+
+    __slots__ = ("total", "_list")
+
+    def __init__(self, total: int, list: Optional[List[Any]] = None):
+        self.total = total
+        self._list = _Raw(list)
+
+    list = _Lazy("_list", _build_list(Service))
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.total, self.list) == (other.total, other.list)
 
+    def __repr__(self) -> str:
+        return f"SearchResult(total={self.total!r}, list={self.list!r})"
 
-@dataclass
+
+@dataclass(slots=True)
 class ServiceInfo:
     """Service information in protocol."""
+
     id: str
     name: str
     type: str
@@ -47,67 +142,64 @@ class ServiceInfo:
 
     def __post_init__(self):
         if isinstance(self.provider, dict):
-            self.provider = Provider(**self.provider)
+            self.provider = _build(Provider, self.provider)
 
 
-@dataclass
+@dataclass(slots=True)
 class SemanticInfo:
     """Semantic description."""
+
     description: str = ""
     keywords: List[str] = field(default_factory=list)
     capabilities: List[str] = field(default_factory=list)
     constraints: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class AuthMethod:
     """Authentication method."""
+
     type: str
     description: str = ""
     endpoint: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class AuthInfo:
     """Authentication configuration."""
+
     required: bool = False
     methods: List[AuthMethod] = field(default_factory=list)
 
     def __post_init__(self):
-        self.methods = [
-            AuthMethod(**m) if isinstance(m, dict) else m
-            for m in self.methods
-        ]
+        self.methods = [_build(AuthMethod, m) for m in self.methods]
 
 
-@dataclass
+@dataclass(slots=True)
 class Permission:
     """Permission requirement."""
+
     name: str
     description: str = ""
     endpoint: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class PermissionInfo:
     """Permission requirements."""
+
     required: List[Permission] = field(default_factory=list)
     optional: List[Permission] = field(default_factory=list)
 
     def __post_init__(self):
-        self.required = [
-            Permission(**p) if isinstance(p, dict) else p
-            for p in self.required
-        ]
-        self.optional = [
-            Permission(**p) if isinstance(p, dict) else p
-            for p in self.optional
-        ]
+        self.required = [_build(Permission, p) for p in self.required]
+        self.optional = [_build(Permission, p) for p in self.optional]
 
 
-@dataclass
+@dataclass(slots=True)
 class Endpoint:
     """API endpoint definition."""
+
     name: str
     path: str
     method: str = "POST"
@@ -116,67 +208,140 @@ class Endpoint:
     input_schema: Dict[str, Any] = field(default_factory=dict)
     output_schema: Dict[str, Any] = field(default_factory=dict)
     output_description: str = ""
-
-
-@dataclass
+    _validator: Optional[Callable[[Any], List[str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def validate(self, input_data: Dict[str, Any]) -> None:
+        """Raise ``ValidationError`` if input does not match ``input_schema``."""
+        if self._validator is None:
+            self._validator = compile_schema(self.input_schema)
+        errors = self._validator(input_data)
+        if errors:
+            raise ValidationError(
+                code="INVALID_INPUT",
+                message=f"{self.name}: {'; '.join(errors)}",
+                errors=errors,
+            )
+
+
+@dataclass(slots=True)
 class ErrorCode:
     """Error code definition."""
+
     code: str
     description: str = ""
     suggestion: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorHandling:
     """Error handling configuration."""
+
     codes: List[ErrorCode] = field(default_factory=list)
 
     def __post_init__(self):
-        self.codes = [
-            ErrorCode(**c) if isinstance(c, dict) else c
-            for c in self.codes
-        ]
+        self.codes = [_build(ErrorCode, c) for c in self.codes]
 
 
-@dataclass
 class Protocol:
-    """A2E Protocol document."""
-    version: str = "1.0.0"
-    service: Optional[ServiceInfo] = None
-    semantic: Optional[SemanticInfo] = None
-    authentication: Optional[AuthInfo] = None
-    permissions: Optional[PermissionInfo] = None
-    endpoints: List[Endpoint] = field(default_factory=list)
-    error_handling: Optional[ErrorHandling] = None
-
-    def __post_init__(self):
-        if isinstance(self.service, dict):
-            self.service = ServiceInfo(**self.service)
-        if isinstance(self.semantic, dict):
-            self.semantic = SemanticInfo(**self.semantic)
-        if isinstance(self.authentication, dict):
-            self.authentication = AuthInfo(**self.authentication)
-        if isinstance(self.permissions, dict):
-            self.permissions = PermissionInfo(**self.permissions)
-        self.endpoints = [
-            Endpoint(**e) if isinstance(e, dict) else e
-            for e in self.endpoints
-        ]
-        if isinstance(self.error_handling, dict):
-            self.error_handling = ErrorHandling(**self.error_handling)
-
-
-@dataclass
+    """
+    A2E Protocol document.
+
+    Nested sections stay raw dicts until first accessed, so fetching a
+    large document only pays for the parts that are actually read.
+    Unknown top-level keys (such as ``data_format``) are ignored.
+    """
+
+    __slots__ = (
+        "version",
+        "_service",
+        "_semantic",
+        "_authentication",
+        "_permissions",
+        "_endpoints",
+        "_error_handling",
+    )
+
+    _FIELDS = (
+        "version",
+        "service",
+        "semantic",
+        "authentication",
+        "permissions",
+        "endpoints",
+        "error_handling",
+    )
+
+    def __init__(
+        self,
+        version: str = "1.0.0",
+        service: Optional[ServiceInfo] = None,
+        semantic: Optional[SemanticInfo] = None,
+        authentication: Optional[AuthInfo] = None,
+        permissions: Optional[PermissionInfo] = None,
+        endpoints: Optional[List[Endpoint]] = None,
+        error_handling: Optional[ErrorHandling] = None,
+        **extra: Any,
+    ):
+        self.version = version
+        self._service = _Raw(service)
+        self._semantic = _Raw(semantic)
+        self._authentication = _Raw(authentication)
+        self._permissions = _Raw(permissions)
+        self._endpoints = _Raw(endpoints)
+        self._error_handling = _Raw(error_handling)
+
+    service = _Lazy("_service", lambda v: _build(ServiceInfo, v))
+    semantic = _Lazy("_semantic", lambda v: _build(SemanticInfo, v))
+    authentication = _Lazy("_authentication", lambda v: _build(AuthInfo, v))
+    permissions = _Lazy("_permissions", lambda v: _build(PermissionInfo, v))
+    endpoints = _Lazy("_endpoints", _build_list(Endpoint))
+    error_handling = _Lazy("_error_handling", lambda v: _build(ErrorHandling, v))
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{n}={getattr(self, n)!r}" for n in self._FIELDS)
+        return f"Protocol({args})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Plain-dict form of the document, suitable for ``Protocol(**d)``.
+
+        Sections that were never read are returned as received, without
+        being converted to model objects first.
+        """
+        data: Dict[str, Any] = {"version": self.version}
+        for name in self._FIELDS[1:]:
+            data[name] = _plain(getattr(self, "_" + name))
+        return data
+
+    def get_endpoint(self, name: str) -> Optional[Endpoint]:
+        """Find an endpoint by name."""
+        endpoints: List[Endpoint] = self.endpoints
+        for endpoint in endpoints:
+            if endpoint.name == name:
+                return endpoint
+        return None
+
+
+@dataclass(slots=True)
 class ExecuteError:
     """Execution error."""
+
     code: str
     message: str = ""
     suggestion: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecuteResult:
     """Execution result."""
+
     execution_id: str = ""
     status: str = ""
     output: Dict[str, Any] = field(default_factory=dict)
@@ -184,23 +349,59 @@ class ExecuteResult:
 
     def __post_init__(self):
         if isinstance(self.error, dict):
-            self.error = ExecuteError(**self.error)
+            self.error = _build(ExecuteError, self.error)
 
 
-@dataclass
+@dataclass(slots=True)
 class UserInfo:
     """User information."""
+
     nickname: str = ""
     avatar: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class AuthResult:
     """Authentication result."""
+
     consumer_token: str = ""
     expires_in: int = 0
     user_info: Optional[UserInfo] = None
 
     def __post_init__(self):
         if isinstance(self.user_info, dict):
-            self.user_info = UserInfo(**self.user_info)
+            self.user_info = _build(UserInfo, self.user_info)
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """Outcome of one job in a batch execution."""
+
+    index: int
+    service_id: str
+    endpoint: str
+    result: Optional[ExecuteResult] = None
+    error: Optional[A2EError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+TERMINAL_ORDER_STATUSES = frozenset({"completed", "cancelled"})
+
+
+@dataclass(slots=True)
+class OrderEvent:
+    """One order status change from ``watch_order``."""
+
+    order_no: str
+    status: str
+    status_text: str = ""
+    estimated_time: Optional[str] = None
+    version: int = 0
+
+    @property
+    def terminal(self) -> bool:
+        """True once the order is completed or cancelled."""
+        return self.status in TERMINAL_ORDER_STATUSES
@@ -0,0 +1,269 @@
+"""
+A2E Agent Pipeline
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import httpx
+
+from .client import AsyncA2EClient
+from .exceptions import A2EError
+from .models import ExecuteResult, Protocol, SearchResult, Service
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class PipelineResult:
+    """Everything one agent request produced, with per-step timings."""
+
+    search: SearchResult
+    service: Optional[Service] = None
+    protocol: Optional[Protocol] = None
+    result: Optional[ExecuteResult] = None
+    discovery: Optional[Dict[str, Any]] = None
+    # step -> (start, end) in milliseconds since the run started
+    timings: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class AgentPipeline:
+    """
+    Run the discover → search → protocol → token → execute workflow.
+
+    ``run`` overlaps the steps that do not depend on each other:
+    discovery and token acquisition run alongside search, and once search
+    returns, protocols for the top ``prefetch`` hits are fetched at once
+    so a fallback to the second or third hit finds them in the cache.
+    The critical path is search, then the chosen protocol, then execute.
+    ``run_sequential`` performs the same calls one after another.
+    """
+
+    def __init__(self, client: AsyncA2EClient, prefetch: int = 3):
+        self.client = client
+        self.prefetch = prefetch
+        self._background: Set["asyncio.Task[Any]"] = set()
+
+    async def run(
+        self,
+        keyword: str,
+        endpoint: str,
+        input_data: Optional[Dict[str, Any]] = None,
+        consumer_token: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        service_type: Optional[str] = None,
+        location: Optional[Tuple[float, float]] = None,
+        select: Optional[Callable[[List[Service]], Optional[Service]]] = None,
+        discover: bool = True,
+        validate: bool = False,
+    ) -> PipelineResult:
+        """
+        Find a service for ``keyword`` and call its ``endpoint``.
+
+        ``select`` picks the service from the search hits (default: the
+        first one). Returns early with no ``result`` when nothing matches.
+        """
+        clock = _Clock()
+        discovery = (
+            self._spawn(clock.timed("discovery", self.client.discover()))
+            if discover
+            else None
+        )
+        token = self._spawn(clock.timed("token", self._token(consumer_token, auth)))
+        search = await clock.timed(
+            "search",
+            self.client.search_services(keyword, service_type, location),
+        )
+        service = (select or _first)(search.list)
+        if service is None:
+            return _result(clock, search, discovery=_discovered(discovery))
+
+        protocols = self._prefetch(clock, search.list, service)
+        protocol = await protocols[service.id]
+        _check_endpoint(protocol, service, endpoint)
+        result = await clock.timed(
+            "execute",
+            self.client.execute(
+                service.id,
+                endpoint,
+                await token,
+                input_data,
+                auth=_refreshable(consumer_token, auth),
+                validate=validate,
+            ),
+        )
+        return _result(clock, search, service, protocol, result, _discovered(discovery))
+
+    async def run_sequential(
+        self,
+        keyword: str,
+        endpoint: str,
+        input_data: Optional[Dict[str, Any]] = None,
+        consumer_token: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        service_type: Optional[str] = None,
+        location: Optional[Tuple[float, float]] = None,
+        select: Optional[Callable[[List[Service]], Optional[Service]]] = None,
+        discover: bool = True,
+        validate: bool = False,
+    ) -> PipelineResult:
+        """Same as ``run`` with every step waiting for the previous one."""
+        clock = _Clock()
+        discovery = None
+        if discover:
+            discovery = await _optional(
+                clock.timed("discovery", self.client.discover())
+            )
+        search = await clock.timed(
+            "search", self.client.search_services(keyword, service_type, location)
+        )
+        service = (select or _first)(search.list)
+        if service is None:
+            return _result(clock, search, discovery=discovery)
+        protocol = await clock.timed(
+            f"protocol:{service.id}", self.client.get_protocol(service.id)
+        )
+        _check_endpoint(protocol, service, endpoint)
+        token = await clock.timed("token", self._token(consumer_token, auth))
+        result = await clock.timed(
+            "execute",
+            self.client.execute(
+                service.id,
+                endpoint,
+                token,
+                input_data,
+                auth=_refreshable(consumer_token, auth),
+                validate=validate,
+            ),
+        )
+        return _result(clock, search, service, protocol, result, discovery)
+
+    async def _token(
+        self,
+        consumer_token: Optional[str],
+        auth: Optional[Tuple[str, str]],
+    ) -> str:
+        if consumer_token is not None:
+            return consumer_token
+        if auth is None:
+            raise ValueError("either consumer_token or auth is required")
+        return await self.client.tokens.get_token(*auth)
+
+    def _prefetch(
+        self,
+        clock: "_Clock",
+        services: List[Service],
+        chosen: Service,
+    ) -> Dict[str, "asyncio.Task[Protocol]"]:
+        """Start ``get_protocol`` for the chosen service and the top hits."""
+        others = [s for s in services[: self.prefetch] if s.id != chosen.id]
+        return {
+            s.id: self._spawn(
+                clock.timed(f"protocol:{s.id}", self.client.get_protocol(s.id))
+            )
+            for s in [chosen] + others
+        }
+
+    def _spawn(self, coro: Awaitable[T]) -> "asyncio.Task[T]":
+        # Keep a reference until done; speculative work may outlive the run.
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(_settle(self._background))
+        return task
+
+    async def drain(self) -> None:
+        """Wait for speculative prefetches still running."""
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    def now(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    async def timed(self, step: str, awaitable: Awaitable[T]) -> T:
+        begin = self.now()
+        try:
+            return await awaitable
+        finally:
+            self.timings[step] = (begin, self.now())
+
+
+def _first(services: List[Service]) -> Optional[Service]:
+    return services[0] if services else None
+
+
+def _refreshable(
+    consumer_token: Optional[str], auth: Optional[Tuple[str, str]]
+) -> Optional[Tuple[str, str]]:
+    # A token from ``tokens`` is dropped on 401; an explicit one is not ours.
+    return auth if consumer_token is None else None
+
+
+def _check_endpoint(protocol: Protocol, service: Service, endpoint: str) -> None:
+    if protocol.get_endpoint(endpoint) is None:
+        raise A2EError(
+            code="ENDPOINT_NOT_FOUND",
+            message=f"Service {service.id} has no endpoint {endpoint}",
+        )
+
+
+async def _optional(awaitable: Awaitable[T]) -> Optional[T]:
+    try:
+        return await awaitable
+    except (A2EError, httpx.HTTPError):
+        return None
+
+
+def _discovered(
+    task: Optional["asyncio.Task[Dict[str, Any]]"],
+) -> Optional[Dict[str, Any]]:
+    # Discovery is informational: never wait for it or fail because of it.
+    if task is None or not task.done() or task.cancelled() or task.exception():
+        return None
+    return task.result()
+
+
+def _settle(tasks: Set["asyncio.Task[Any]"]) -> Callable[["asyncio.Task[Any]"], None]:
+    def done(task: "asyncio.Task[Any]") -> None:
+        tasks.discard(task)
+        if not task.cancelled():
+            task.exception()  # mark retrieved; failures surface where awaited
+
+    return done
+
+
+def _result(
+    clock: _Clock,
+    search: SearchResult,
+    service: Optional[Service] = None,
+    protocol: Optional[Protocol] = None,
+    result: Optional[ExecuteResult] = None,
+    discovery: Optional[Dict[str, Any]] = None,
+) -> PipelineResult:
+    return PipelineResult(
+        search=search,
+        service=service,
+        protocol=protocol,
+        result=result,
+        discovery=discovery,
+        timings=dict(clock.timings),
+        elapsed=clock.now(),
+    )
@@ -0,0 +1,168 @@
+"""
+A2E Retry, Hedging and Circuit Breaking
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """
+    Retry and hedging settings for idempotent calls.
+
+    Retries use exponential backoff with full jitter, honouring a
+    ``Retry-After`` header up to ``max_delay``. ``hedge_delay`` enables
+    hedged requests for ``get_protocol`` and ``search_services``: if the
+    first request has not answered after that many seconds, a second one
+    is sent and whichever finishes first wins.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    hedge_delay: Optional[float] = None
+
+    def backoff(
+        self,
+        attempt: int,
+        response: Optional[httpx.Response] = None,
+    ) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based)."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return min(float(retry_after), self.max_delay)
+                except ValueError:
+                    pass
+        cap = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, cap)
+
+    def should_retry(self, response: httpx.Response) -> bool:
+        return response.status_code in self.retry_statuses
+
+
+@dataclass(slots=True)
+class BreakerState:
+    """Snapshot of one circuit breaker."""
+
+    state: str
+    failures: int
+    opened_at: Optional[float] = None
+    retry_in: float = 0.0
+
+
+@dataclass(slots=True)
+class CircuitBreaker:
+    """
+    Per-service circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``reset_timeout`` seconds. Then a single probe call
+    is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: Optional[float] = None
+    _probing: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed right now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if self.retry_in() > 0:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a probe whose call ended without an outcome, e.g. cancelled."""
+        with self._lock:
+            self._probing = False
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def snapshot(self) -> BreakerState:
+        return BreakerState(
+            state=self.state,
+            failures=self.failures,
+            opened_at=self.opened_at,
+            retry_in=self.retry_in(),
+        )
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers keyed by ``service_id``, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, service_id: str) -> CircuitBreaker:
+        breaker = self._breakers.get(service_id)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    service_id,
+                    CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                )
+        return breaker
+
+    def states(self) -> Dict[str, BreakerState]:
+        """Current state of every breaker, for dashboards and debugging."""
+        return {sid: b.snapshot() for sid, b in list(self._breakers.items())}
+
+    def reset(self, service_id: Optional[str] = None) -> None:
+        """Close one breaker, or all of them."""
+        with self._lock:
+            if service_id is None:
+                self._breakers.clear()
+            else:
+                self._breakers.pop(service_id, None)
+
+
+def is_failure(response: httpx.Response) -> bool:
+    """Whether a response should count against a service's breaker."""
+    return response.status_code == 429 or response.status_code >= 500
@@ -0,0 +1,404 @@
+"""
+A2E Local Service Search
+
+An in-memory inverted index over protocol documents, ranked with BM25, for
+routing without a round trip to ``/services/search``. CJK runs are indexed
+as overlapping character bigrams, plus their single characters at a lower
+weight for one-character queries, so Chinese text needs no dictionary or
+word segmenter.
+"""
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from operator import add
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .geo import SpatialIndex
+from .models import Protocol, SearchResult
+
+_TOKEN = re.compile(
+    r"[a-z0-9]+"
+    r"|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+)
+
+DEFAULT_WEIGHTS = {
+    "name": 2.0,
+    "keywords": 3.0,
+    "capabilities": 1.5,
+    "description": 1.0,
+    "endpoints": 1.0,
+}
+
+# Share of a field's weight given to the single characters of CJK runs.
+UNIGRAM_WEIGHT = 0.25
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    Text is NFKC-normalized and lowercased. Latin letters and digits form
+    words; each CJK run yields its character bigrams, or the character
+    itself when the run is one character long.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    terms: List[str] = []
+    for run in _TOKEN.findall(text.lower()):
+        if len(run) == 1 or run.isascii():
+            terms.append(run)
+        else:
+            terms.extend(map(add, run, run[1:]))
+    return terms
+
+
+def cjk_unigrams(text: str) -> List[str]:
+    """
+    The single characters of CJK runs that ``tokenize`` splits into bigrams.
+
+    Indexing these lets one-character queries such as "茶" match documents
+    that only contain the character inside longer words.
+    """
+    if text.isascii():
+        return []
+    text = unicodedata.normalize("NFKC", text)
+    return [
+        char
+        for run in _TOKEN.findall(text.lower())
+        if len(run) > 1 and not run.isascii()
+        for char in run
+    ]
+
+
+def load_protocol(path: str) -> Protocol:
+    """Read a ``protocol.yaml`` file (requires PyYAML)."""
+    try:
+        import yaml  # type: ignore[import-untyped]
+    except ImportError as e:
+        raise ImportError(
+            "reading protocol.yaml requires PyYAML: pip install a2e-protocol[yaml]"
+        ) from e
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    return Protocol(**data.get("a2e_protocol", data))
+
+
+def _fields(protocol: Protocol) -> Dict[str, List[str]]:
+    semantic = protocol.semantic
+    return {
+        "name": [protocol.service.name],
+        "keywords": list(semantic.keywords) if semantic else [],
+        "capabilities": list(semantic.capabilities) if semantic else [],
+        "description": [semantic.description] if semantic else [],
+        "endpoints": [e.description for e in protocol.endpoints],
+    }
+
+
+def _row(protocol: Protocol) -> Dict[str, Any]:
+    """A ``Service``-shaped search row for a protocol."""
+    service = protocol.service
+    semantic = protocol.semantic
+    provider = service.provider
+    return {
+        "id": service.id,
+        "name": service.name,
+        "type": service.type,
+        "description": semantic.description.strip() if semantic else "",
+        "tags": list(semantic.keywords) if semantic else [],
+        "provider": (
+            {
+                "id": provider.id,
+                "name": provider.name,
+                "certification": provider.certification,
+            }
+            if provider is not None
+            else None
+        ),
+    }
+
+
+class _Postings:
+    """
+    Postings of one term, sorted by score.
+
+    Terms found in many documents also keep a bitmask of them, so counting
+    matches of common terms is a few big-integer operations.
+    """
+
+    __slots__ = ("docs", "scores", "by_doc", "mask")
+
+    def __init__(self, by_doc: Dict[int, float], dense: bool):
+        # Stable sort: equal scores stay in insertion (doc id) order.
+        self.docs = sorted(by_doc, key=by_doc.__getitem__, reverse=True)
+        self.scores = list(map(by_doc.__getitem__, self.docs))
+        self.by_doc = by_doc
+        self.mask = _mask(by_doc) if dense else 0
+
+
+def _mask(docs: Iterable[int]) -> int:
+    """Bitmask with bit ``doc`` set for every doc id."""
+    docs = list(docs)
+    bits = bytearray((max(docs, default=-1) >> 3) + 1)
+    for doc in docs:
+        bits[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(bits, "little")
+
+
+class ServiceIndex:
+    """
+    BM25 index over protocol documents.
+
+    Indexes the service name, ``semantic.keywords``, ``capabilities``,
+    ``description`` and endpoint descriptions, each scaled by ``weights``.
+    Scores are precomputed per posting and postings are sorted by score,
+    so ``search`` can stop as soon as no unseen document can reach the
+    requested page. Adding or removing documents marks the index dirty and
+    the next search rescores it, so load catalogues in bulk.
+
+    With a ``spatial`` index, searches given a ``location`` only return
+    services that deliver there.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        spatial: Optional[SpatialIndex] = None,
+    ):
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.k1 = k1
+        self.b = b
+        self.spatial = spatial
+        self._ids: Dict[str, int] = {}
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        self._lengths: List[float] = []
+        self._doc_terms: List[Tuple[str, ...]] = []
+        self._frequencies: Dict[str, Dict[int, float]] = {}
+        self._types: Dict[str, set] = {}
+        self._type_masks: Dict[str, int] = {}
+        self._postings: Dict[str, _Postings] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, service_id: str) -> bool:
+        return service_id in self._ids
+
+    def add(self, protocol: Union[Protocol, Dict[str, Any]]) -> None:
+        """Index a protocol, replacing any earlier one with the same service id."""
+        if isinstance(protocol, dict):
+            protocol = Protocol(**protocol.get("a2e_protocol", protocol))
+        terms: Dict[str, float] = {}
+        length = 0.0
+        for name, texts in _fields(protocol).items():
+            weight = self.weights.get(name, 0.0)
+            if not weight or not texts:
+                continue
+            # Newlines end CJK runs, so no bigram spans two texts.
+            text = "\n".join(texts)
+            for term, count in Counter(tokenize(text)).items():
+                terms[term] = terms.get(term, 0.0) + weight * count
+                length += weight * count
+            # Unigrams only back up one-character queries; leaving them out
+            # of the length keeps multi-character rankings unchanged.
+            unigram_weight = weight * UNIGRAM_WEIGHT
+            for term, count in Counter(cjk_unigrams(text)).items():
+                terms[term] = terms.get(term, 0.0) + unigram_weight * count
+        row = _row(protocol)
+        with self._lock:
+            self._discard(row["id"])
+            doc = len(self._rows)
+            self._ids[row["id"]] = doc
+            self._rows.append(row)
+            self._lengths.append(length)
+            self._doc_terms.append(tuple(terms))
+            frequencies = self._frequencies
+            for term, tf in terms.items():
+                by_doc = frequencies.get(term)
+                if by_doc is None:
+                    by_doc = frequencies[term] = {}
+                by_doc[doc] = tf
+            self._types.setdefault(row["type"], set()).add(doc)
+            self._dirty = True
+
+    def add_all(self, protocols: Iterable[Union[Protocol, Dict[str, Any]]]) -> None:
+        for protocol in protocols:
+            self.add(protocol)
+
+    def add_file(self, path: str) -> None:
+        """Index a ``protocol.yaml`` file."""
+        self.add(load_protocol(path))
+
+    def remove(self, service_id: str) -> bool:
+        with self._lock:
+            removed = self._discard(service_id)
+            self._dirty = self._dirty or removed
+        return removed
+
+    def _discard(self, service_id: str) -> bool:
+        doc = self._ids.pop(service_id, None)
+        if doc is None:
+            return False
+        row = self._rows[doc]
+        if row is not None:
+            self._types[row["type"]].discard(doc)
+        self._rows[doc] = None
+        self._lengths[doc] = 0.0
+        for term in self._doc_terms[doc]:
+            by_doc = self._frequencies[term]
+            del by_doc[doc]
+            if not by_doc:
+                del self._frequencies[term]
+        self._doc_terms[doc] = ()
+        return True
+
+    def _commit(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            live = len(self._ids)
+            avgdl = sum(self._lengths) / live if live else 0.0
+            k1, b = self.k1, self.b
+            norms = [
+                k1 * (1 - b + b * length / avgdl) if avgdl else k1
+                for length in self._lengths
+            ]
+            dense = max(64, live // 32)
+            postings: Dict[str, _Postings] = {}
+            for term, frequencies in self._frequencies.items():
+                n = len(frequencies)
+                idf = math.log(1 + (live - n + 0.5) / (n + 0.5)) * (k1 + 1)
+                scores = {
+                    doc: idf * tf / (tf + norms[doc]) for doc, tf in frequencies.items()
+                }
+                postings[term] = _Postings(scores, n >= dense)
+            self._postings = postings
+            self._type_masks = {t: _mask(docs) for t, docs in self._types.items()}
+            self._dirty = False
+
+    def search(
+        self,
+        keyword: str,
+        service_type: Optional[str] = None,
+        location: Optional[Tuple[float, float]] = None,
+        page: int = 1,
+        size: int = 10,
+    ) -> SearchResult:
+        """
+        Rank indexed services against ``keyword``.
+
+        Takes the same arguments as ``A2EClient.search_services`` and
+        returns a ``SearchResult`` of ``Service`` rows. A ``location``
+        requires the ``spatial`` index.
+        """
+        if self._dirty:
+            self._commit()
+        postings = self._postings
+        lists = [postings[t] for t in dict.fromkeys(tokenize(keyword)) if t in postings]
+        allowed = allowed_mask = None
+        if service_type is not None:
+            allowed = self._types.get(service_type, set())
+            allowed_mask = self._type_masks.get(service_type, 0)
+        if location is not None:
+            if self.spatial is None:
+                raise ValueError("location search needs a spatial index")
+            ids = self._ids
+            nearby = {
+                ids[service_id]
+                for service_id, _ in self.spatial.deliverable(*location, service_type)
+                if service_id in ids
+            }
+            allowed = nearby if allowed is None else nearby & allowed
+            allowed_mask = None
+        if not lists or allowed is not None and not allowed:
+            return SearchResult(total=0, list=[])
+
+        total = self._count(lists, allowed, allowed_mask)
+        start = (page - 1) * size
+        if start >= total:
+            return SearchResult(total=total, list=[])
+        if len(lists) == 1 and allowed is None:
+            ranked = lists[0].docs[start : start + size]
+        else:
+            top = self._top(lists, start + size, allowed)
+            ranked = [doc for _, doc in top[start:]]
+        rows = self._rows
+        return SearchResult(total=total, list=[rows[doc] for doc in ranked])
+
+    @staticmethod
+    def _count(
+        lists: List[_Postings],
+        allowed: Optional[set],
+        allowed_mask: Optional[int],
+    ) -> int:
+        """Number of ``allowed`` documents matching any of the terms."""
+        if not any(p.mask for p in lists):
+            docs: AbstractSet[int]
+            if len(lists) == 1:
+                docs = lists[0].by_doc.keys()
+            else:
+                docs = set().union(*(p.by_doc.keys() for p in lists))
+            return len(docs & allowed) if allowed is not None else len(docs)
+
+        mask = 0
+        sparse: List[int] = []
+        for p in lists:
+            if p.mask:
+                mask |= p.mask
+            else:
+                sparse.extend(p.by_doc)
+        if sparse:
+            mask |= _mask(sparse)
+        if allowed is not None:
+            mask &= _mask(allowed) if allowed_mask is None else allowed_mask
+        return mask.bit_count()
+
+    @staticmethod
+    def _top(
+        lists: List[_Postings],
+        k: int,
+        allowed: Optional[set],
+    ) -> List[Tuple[float, int]]:
+        """
+        Best ``k`` documents by summed score, using the threshold algorithm.
+
+        Postings are walked in parallel by rank; once the k-th best score
+        reaches the sum of the scores at the current depth, no unseen
+        document can beat it.
+        """
+        heap: List[Tuple[float, int]] = []
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            progressed = False
+            for postings in lists:
+                if depth >= len(postings.docs):
+                    continue
+                progressed = True
+                threshold += postings.scores[depth]
+                doc = postings.docs[depth]
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                if allowed is not None and doc not in allowed:
+                    continue
+                score = 0.0
+                for other in lists:
+                    score += other.by_doc.get(doc, 0.0)
+                # Negated doc so equal scores keep insertion order.
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, -doc))
+                elif (score, -doc) > heap[0]:
+                    heapq.heapreplace(heap, (score, -doc))
+            if not progressed or len(heap) >= k and heap[0][0] >= threshold:
+                break
+            depth += 1
+        return [(score, -neg) for score, neg in sorted(heap, reverse=True)]
@@ -0,0 +1,123 @@
+"""
+A2E Connection Pool Configuration
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+
+@dataclass(slots=True)
+class PoolConfig:
+    """Connection pool settings shared by every client using the pool."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    timeout: float = 30
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Point-in-time connection pool occupancy."""
+
+    open: int = 0
+    idle: int = 0
+    waiting: int = 0
+
+
+class ConnectionPool:
+    """
+    HTTP connection pool that several SDK clients can share.
+
+    The underlying ``httpx.Client`` and ``httpx.AsyncClient`` are created on
+    first use, so a pool used only by async clients never opens a sync
+    pool and vice versa. HTTP/2 needs the ``h2`` package
+    (``pip install "a2e-protocol[http2]"``).
+    """
+
+    def __init__(
+        self,
+        config: Optional[PoolConfig] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.config = config or PoolConfig()
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                timeout=self.config.timeout,
+                limits=self.config.limits(),
+                http2=self.config.http2,
+                transport=self._transport,
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.config.timeout,
+                limits=self.config.limits(),
+                http2=self.config.http2,
+                transport=self._async_transport,
+            )
+        return self._async_client
+
+    def stats(self) -> PoolStats:
+        """Count open, idle and queued connections across both pools."""
+        stats = PoolStats()
+        for client in (self._client, self._async_client):
+            if client is not None:
+                _add_stats(stats, getattr(client, "_transport", None))
+        return stats
+
+    def close(self) -> None:
+        """Close the sync pool."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close both pools."""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+def _add_stats(stats: PoolStats, transport: Any) -> None:
+    # httpcore does not expose pool counters publicly; custom transports
+    # such as MockTransport have no pool and report nothing.
+    pool = getattr(transport, "_pool", None)
+    if pool is None:
+        return
+    for connection in getattr(pool, "connections", []):
+        stats.open += 1
+        if connection.is_idle():
+            stats.idle += 1
+    for request in getattr(pool, "_requests", []):
+        # httpcore 1.x: PoolRequest.is_queued(); 0.18: RequestStatus, which
+        # has no connection until one is assigned.
+        is_queued = getattr(request, "is_queued", None)
+        if is_queued is not None:
+            queued = is_queued()
+        else:
+            queued = getattr(request, "connection", None) is None
+        if queued:
+            stats.waiting += 1
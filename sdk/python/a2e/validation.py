@@ -0,0 +1,220 @@
+"""
+A2E Input Schema Validation
+
+Compiles the JSON Schema subset used by A2E endpoint ``input_schema``
+documents into Python source for a single flat function, so validating a
+payload neither re-reads the schema dict nor pays a call per keyword.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Union, cast
+
+_TYPE_EXPRS: Dict[str, str] = {
+    "string": "isinstance({v}, str)",
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "null": "{v} is None",
+}
+
+_MISSING = object()
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """
+    Compile a schema into a function returning a list of error messages.
+
+    An empty list means the value is valid. Supported keywords are
+    ``type``, ``enum``, ``properties``, ``required``,
+    ``additionalProperties: false``, ``items``, ``minItems``/``maxItems``,
+    ``minLength``/``maxLength``, ``pattern`` and ``minimum``/``maximum``.
+    Anything else is ignored rather than rejected, matching how providers
+    treat unknown keywords; so are keywords whose values have the wrong
+    type, since schemas come from remote services.
+    """
+    gen = _CodeGen()
+    gen.node(schema or {}, "v0", repr("$"), 1)
+    source = "\n".join(
+        ["def validate(v0):", "    errors = []", *gen.lines, "    return errors"]
+    )
+    namespace: Dict[str, Any] = {"MISSING": _MISSING, **gen.consts}
+    exec(compile(source, "<a2e-schema>", "exec"), namespace)
+    return cast(Callable[[Any], List[str]], namespace["validate"])
+
+
+def _count(value: Any) -> Optional[int]:
+    """A non-negative integer keyword value, or None if it is not one."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not value.is_integer():
+        return None
+    return int(value) if value >= 0 else None
+
+
+def _bound(value: Any) -> Optional[Union[int, float]]:
+    """A numeric keyword value, or None if it is not a number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+class _CodeGen:
+    """
+    Emit validation code for one schema node at a time.
+
+    Every value taken from the schema enters the generated source either
+    through ``repr()`` or as a constant in the function's namespace, never
+    spliced in as text. ``path`` arguments are Python expressions that
+    evaluate to the JSON path of the node.
+    """
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.consts: Dict[str, Any] = {}
+        self._counter = 0
+
+    def var(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def const(self, value: Any) -> str:
+        name = self.var("c")
+        self.consts[name] = value
+        return name
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def error(self, indent: int, path: str, message: str) -> None:
+        self.emit(indent, f"errors.append({path} + {': ' + message!r})")
+
+    def node(self, schema: Any, v: str, path: str, indent: int) -> None:
+        if not isinstance(schema, dict):
+            return
+        schema_type = schema.get("type")
+        declared = schema_type if isinstance(schema_type, list) else [schema_type]
+        names: List[str] = [
+            n for n in declared if isinstance(n, str) and n in _TYPE_EXPRS
+        ]
+        if names:
+            expr = " or ".join(_TYPE_EXPRS[n].format(v=v) for n in names)
+            self.emit(indent, f"if not ({expr}):")
+            self.error(indent + 1, path, f"expected {' or '.join(names)}")
+            self.emit(indent, "else:")
+            indent += 1
+            self.emit(indent, "pass")
+
+        allowed = schema.get("enum")
+        if isinstance(allowed, list):
+            self.emit(indent, f"if {v} not in {self.const(allowed)}:")
+            self.error(indent + 1, path, f"must be one of {allowed}")
+
+        only = names[0] if len(names) == 1 else None
+        self._string(schema, v, path, indent, only == "string")
+        self._number(schema, v, path, indent, only in ("integer", "number"))
+        self._object(schema, v, path, indent, only == "object")
+        self._array(schema, v, path, indent, only == "array")
+
+    def _guard(self, indent: int, known: bool, expr: str) -> int:
+        if known:
+            return indent
+        self.emit(indent, f"if {expr}:")
+        return indent + 1
+
+    def _string(self, schema, v, path, indent, known) -> None:
+        min_length = _count(schema.get("minLength"))
+        max_length = _count(schema.get("maxLength"))
+        search = None
+        pattern = schema.get("pattern")
+        if isinstance(pattern, str):
+            try:
+                search = re.compile(pattern).search
+            except re.error:
+                pass
+        if min_length is None and max_length is None and search is None:
+            return
+        indent = self._guard(indent, known, f"isinstance({v}, str)")
+        if min_length is not None:
+            self.emit(indent, f"if len({v}) < {min_length}:")
+            self.error(indent + 1, path, f"shorter than {min_length}")
+        if max_length is not None:
+            self.emit(indent, f"if len({v}) > {max_length}:")
+            self.error(indent + 1, path, f"longer than {max_length}")
+        if search is not None:
+            self.emit(indent, f"if {self.const(search)}({v}) is None:")
+            self.error(indent + 1, path, f"does not match {pattern!r}")
+
+    def _number(self, schema, v, path, indent, known) -> None:
+        minimum = _bound(schema.get("minimum"))
+        maximum = _bound(schema.get("maximum"))
+        if minimum is None and maximum is None:
+            return
+        indent = self._guard(indent, known, _TYPE_EXPRS["number"].format(v=v))
+        if minimum is not None:
+            self.emit(indent, f"if {v} < {self.const(minimum)}:")
+            self.error(indent + 1, path, f"less than {minimum}")
+        if maximum is not None:
+            self.emit(indent, f"if {v} > {self.const(maximum)}:")
+            self.error(indent + 1, path, f"greater than {maximum}")
+
+    def _object(self, schema, v, path, indent, known) -> None:
+        properties = schema.get("properties")
+        if not isinstance(properties, dict):
+            properties = {}
+        required = schema.get("required")
+        if not isinstance(required, list):
+            required = []
+        required = [name for name in required if isinstance(name, str)]
+        closed = schema.get("additionalProperties") is False
+        if not properties and not required and not closed:
+            return
+        guard = len(self.lines)
+        indent = self._guard(indent, known, f"isinstance({v}, dict)")
+        for name in required:
+            self.emit(indent, f"if {name!r} not in {v}:")
+            self.error(indent + 1, f"{path} + {'.' + name!r}", "is required")
+        for name, sub in properties.items():
+            if not isinstance(name, str) or not isinstance(sub, dict):
+                continue
+            child = self.var("v")
+            start = len(self.lines)
+            self.emit(indent, f"{child} = {v}.get({name!r}, MISSING)")
+            self.emit(indent, f"if {child} is not MISSING:")
+            mark = len(self.lines)
+            self.node(sub, child, f"{path} + {'.' + name!r}", indent + 1)
+            if len(self.lines) == mark:
+                del self.lines[start:]
+        if closed:
+            key = self.var("k")
+            known_names = self.const(frozenset(properties))
+            self.emit(indent, f"for {key} in {v}:")
+            self.emit(indent + 1, f"if {key} not in {known_names}:")
+            self.error(indent + 2, f"{path} + '.' + str({key})", "is not allowed")
+        if len(self.lines) == guard + 1 and not known:
+            # Every property schema was empty; drop the bare ``if``.
+            del self.lines[guard:]
+
+    def _array(self, schema, v, path, indent, known) -> None:
+        min_items = _count(schema.get("minItems"))
+        max_items = _count(schema.get("maxItems"))
+        items = schema.get("items")
+        if min_items is None and max_items is None and not isinstance(items, dict):
+            return
+        indent = self._guard(indent, known, f"isinstance({v}, list)")
+        if min_items is not None:
+            self.emit(indent, f"if len({v}) < {min_items}:")
+            self.error(indent + 1, path, f"fewer than {min_items} items")
+        if max_items is not None:
+            self.emit(indent, f"if len({v}) > {max_items}:")
+            self.error(indent + 1, path, f"more than {max_items} items")
+        if isinstance(items, dict):
+            index, child = self.var("i"), self.var("v")
+            start = len(self.lines)
+            self.emit(indent, f"for {index}, {child} in enumerate({v}):")
+            mark = len(self.lines)
+            item_path = f"{path} + '[' + str({index}) + ']'"
+            self.node(items, child, item_path, indent + 1)
+            if len(self.lines) == mark:
+                del self.lines[start:]
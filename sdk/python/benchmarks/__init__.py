@@ -0,0 +1,3 @@
+"""
+A2E SDK benchmarks.
+"""
@@ -0,0 +1,56 @@
+"""
+Benchmark: JSON codecs on realistic protocol and execute payloads.
+
+Every installed codec is measured encoding a request body and decoding a
+response body straight from bytes. Codecs whose library is missing are
+skipped.
+
+Run from ``sdk/python``:
+
+    python -m benchmarks.bench_codec
+"""
+
+import timeit
+from typing import Any, List
+
+from a2e.codec import JSONCodec, get_codec
+
+from .payloads import execute_payload, protocol_payload
+
+
+def available_codecs() -> List[JSONCodec]:
+    codecs = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            print(f"  ({name} not installed, skipped)")
+    return codecs
+
+
+def bench(codecs: List[JSONCodec], label: str, payload: Any, number: int) -> None:
+    body = codecs[0].dumps(payload)
+    print(f"{label} ({len(body) / 1024:.0f} KiB):")
+    baseline = {}
+    for codec in codecs:
+        for op, fn in (
+            ("encode", lambda: codec.dumps(payload)),
+            ("decode", lambda: codec.loads(body)),
+        ):
+            seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+            base = baseline.setdefault(op, seconds)
+            print(
+                f"  {codec.name:<8} {op}  {seconds * 1e6:9.1f} µs"
+                f"  ({base / seconds:.1f}x vs json)"
+            )
+
+
+def main():
+    codecs = available_codecs()
+    protocol = {"code": 0, "message": "success", "data": protocol_payload()}
+    bench(codecs, "protocol document", protocol, 200)
+    bench(codecs, "execute output", execute_payload(), 200)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: spatial "who delivers here" lookups.
+
+Scatters services with 1-5 km delivery radii over a city-sized area and
+times single-point lookups and batched lookups. The batch path is measured
+with numpy when it is installed and with the pure-Python fallback.
+
+Run from ``sdk/python``:
+
+    python -m benchmarks.bench_geo --services 100000 --points 10000
+"""
+
+import argparse
+import random
+import time
+
+import a2e.geo as geo
+from a2e.geo import SpatialIndex
+
+TYPES = ["food_delivery", "retail", "local_service"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=10_000)
+    parser.add_argument(
+        "--area-deg",
+        type=float,
+        default=0.5,
+        help="side of the square area, in degrees",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    base_lat, base_lon = 31.0, 121.2
+
+    def point():
+        return (
+            base_lat + rng.random() * args.area_deg,
+            base_lon + rng.random() * args.area_deg,
+        )
+
+    index = SpatialIndex()
+    start = time.perf_counter()
+    for i in range(args.services):
+        index.add(f"service_{i}", *point(), rng.choice((1, 3, 5)), rng.choice(TYPES))
+    print(f"{len(index)} services indexed in {time.perf_counter() - start:.2f} s")
+
+    points = [point() for _ in range(args.points)]
+    start = time.perf_counter()
+    single = [index.deliverable(lat, lon, "food_delivery") for lat, lon in points]
+    elapsed = time.perf_counter() - start
+    matches = sum(map(len, single)) / len(points)
+    print(
+        f"single lookups: {elapsed / len(points) * 1e6:8.1f} µs/point"
+        f"  ({matches:.0f} matches/point)"
+    )
+
+    has_numpy = geo.HAS_NUMPY
+    for label, enabled in (("numpy", has_numpy), ("pure python", False)):
+        if label == "numpy" and not enabled:
+            print("batch (numpy): numpy not installed, skipped")
+            continue
+        geo.HAS_NUMPY = enabled
+        index.deliverable_many(points[:100], "food_delivery")  # warm-up
+        start = time.perf_counter()
+        index.deliverable_many(points, "food_delivery")
+        elapsed = time.perf_counter() - start
+        print(f"batch ({label}): {elapsed / len(points) * 1e6:8.1f} µs/point")
+    geo.HAS_NUMPY = has_numpy
+
+
+if __name__ == "__main__":
+    main()
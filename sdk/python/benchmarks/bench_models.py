@@ -0,0 +1,184 @@
+"""
+Benchmark: slotted, lazily-materialized models vs. eager dataclasses.
+
+Compares parse time and retained memory for a large protocol document and
+a large search page. The eager baseline mirrors the 1.0.0 model classes.
+
+Run from ``sdk/python``:
+
+    python -m benchmarks.bench_models
+"""
+
+import timeit
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from a2e.models import Protocol, SearchResult
+
+from .payloads import protocol_payload, search_payload
+
+# ============ Eager baseline (a2e 1.0.0 models) ============
+
+
+@dataclass
+class EagerProvider:
+    id: str
+    name: str
+    certification: str = "none"
+
+
+@dataclass
+class EagerService:
+    id: str
+    name: str
+    type: str
+    description: str = ""
+    tags: List[str] = field(default_factory=list)
+    certification_level: int = 0
+    provider: Optional[EagerProvider] = None
+
+    def __post_init__(self):
+        if isinstance(self.provider, dict):
+            self.provider = EagerProvider(**self.provider)
+
+
+@dataclass
+class EagerSearchResult:
+    total: int
+    list: List[EagerService] = field(default_factory=list)
+
+
+@dataclass
+class EagerServiceInfo:
+    id: str
+    name: str
+    type: str
+    provider: Optional[EagerProvider] = None
+
+    def __post_init__(self):
+        if isinstance(self.provider, dict):
+            self.provider = EagerProvider(**self.provider)
+
+
+@dataclass
+class EagerSemanticInfo:
+    description: str = ""
+    keywords: List[str] = field(default_factory=list)
+    capabilities: List[str] = field(default_factory=list)
+    constraints: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EagerEndpoint:
+    name: str
+    path: str
+    method: str = "POST"
+    description: str = ""
+    requires_payment: bool = False
+    input_schema: Dict[str, Any] = field(default_factory=dict)
+    output_schema: Dict[str, Any] = field(default_factory=dict)
+    output_description: str = ""
+
+
+@dataclass
+class EagerErrorCode:
+    code: str
+    description: str = ""
+    suggestion: str = ""
+
+
+@dataclass
+class EagerErrorHandling:
+    codes: List[EagerErrorCode] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.codes = [EagerErrorCode(**c) for c in self.codes]
+
+
+@dataclass
+class EagerProtocol:
+    version: str = "1.0.0"
+    service: Optional[EagerServiceInfo] = None
+    semantic: Optional[EagerSemanticInfo] = None
+    endpoints: List[EagerEndpoint] = field(default_factory=list)
+    error_handling: Optional[EagerErrorHandling] = None
+
+    def __post_init__(self):
+        self.service = EagerServiceInfo(**self.service)
+        self.semantic = EagerSemanticInfo(**self.semantic)
+        self.endpoints = [EagerEndpoint(**e) for e in self.endpoints]
+        self.error_handling = EagerErrorHandling(**self.error_handling)
+
+
+# ============ Harness ============
+
+
+def parse_time(label: str, fn: Callable[[], Any], number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<34} {seconds * 1e6:10.1f} µs")
+    return seconds
+
+
+def retained(label: str, fn: Callable[[], Any], count: int = 200) -> int:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [fn() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    print(f"  {label:<34} {size / count / 1024:10.1f} KiB/object")
+    del keep
+    return size
+
+
+def main():
+    proto = protocol_payload()
+    search = search_payload()
+
+    def eager_protocol():
+        return EagerProtocol(**proto)
+
+    def lazy_protocol():
+        return Protocol(**proto)
+
+    def lazy_protocol_service():
+        p = Protocol(**proto)
+        return p.service.name
+
+    def eager_search():
+        return EagerSearchResult(
+            total=search["total"],
+            list=[EagerService(**s) for s in search["list"]],
+        )
+
+    def lazy_search():
+        return SearchResult(total=search["total"], list=search["list"])
+
+    def lazy_search_all():
+        r = SearchResult(total=search["total"], list=search["list"])
+        return r.list
+
+    print("protocol parse (200 endpoints, 100 error codes):")
+    base = parse_time("eager dataclasses", eager_protocol, 200)
+    fast = parse_time("lazy slots", lazy_protocol, 200)
+    parse_time("lazy slots + read service", lazy_protocol_service, 200)
+    print(f"  speedup: {base / fast:.0f}x")
+
+    print("search page parse (100 rows):")
+    base = parse_time("eager dataclasses", eager_search, 200)
+    parse_time("lazy slots (untouched)", lazy_search, 200)
+    full = parse_time("lazy slots (list materialized)", lazy_search_all, 200)
+    print(f"  speedup when fully read: {base / full:.1f}x")
+
+    print("retained memory, protocol (payload dict shared):")
+    retained("eager dataclasses", eager_protocol)
+    retained("lazy slots", lazy_protocol)
+
+    print("retained memory, search page fully read:")
+    retained("eager dataclasses", lambda: eager_search().list)
+    retained("lazy slots", lazy_search_all)
+
+
+if __name__ == "__main__":
+    main()
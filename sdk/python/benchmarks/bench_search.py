@@ -0,0 +1,185 @@
+"""
+Benchmark: local BM25 service search over a synthetic catalogue.
+
+Builds a ``ServiceIndex`` over generated Chinese protocol documents and
+reports build time plus per-query latency percentiles.
+
+Run from ``sdk/python``:
+
+    python -m benchmarks.bench_search --services 100000
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from a2e.instrumentation import LatencyHistogram
+from a2e.search import ServiceIndex
+
+SHOPS = [
+    "奶茶店",
+    "咖啡馆",
+    "面馆",
+    "烧烤",
+    "花店",
+    "药房",
+    "水果店",
+    "便利店",
+    "火锅",
+    "甜品站",
+    "快餐",
+    "洗衣店",
+    "宠物店",
+    "书店",
+    "打印店",
+]
+AREAS = [
+    "朝阳",
+    "海淀",
+    "西湖",
+    "南山",
+    "浦东",
+    "天河",
+    "武侯",
+    "鼓楼",
+    "江北",
+    "雁塔",
+    "历下",
+    "思明",
+]
+KEYWORDS = [
+    "奶茶",
+    "果茶",
+    "饮品",
+    "外卖",
+    "咖啡",
+    "拿铁",
+    "牛肉面",
+    "烤串",
+    "鲜花",
+    "蛋糕",
+    "药品",
+    "水果",
+    "零食",
+    "火锅",
+    "披萨",
+    "寿司",
+    "汉堡",
+    "炸鸡",
+    "洗衣",
+    "宠物",
+    "图书",
+    "打印",
+    "快递",
+    "跑腿",
+]
+CAPABILITIES = [
+    "在线浏览菜单",
+    "自定义糖度",
+    "自定义温度",
+    "外卖配送",
+    "到店自取",
+    "预约配送",
+    "会员积分",
+    "优惠券",
+    "夜间营业",
+    "发票开具",
+]
+ENDPOINTS = [
+    "获取店铺完整菜单",
+    "创建订单",
+    "查询订单状态",
+    "取消订单",
+    "查询配送进度",
+    "申请退款",
+]
+TYPES = ["food_delivery", "retail", "local_service"]
+QUERIES = [
+    "奶茶",
+    "我想喝奶茶",
+    "附近的咖啡外卖",
+    "半糖少冰果茶",
+    "夜间营业 火锅",
+    "朝阳 鲜花 预约配送",
+    "牛肉面",
+    "24小时药房",
+    "coffee latte",
+    "宠物洗澡",
+]
+
+
+def catalogue(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        shop = rng.choice(SHOPS)
+        area = rng.choice(AREAS)
+        keywords = rng.sample(KEYWORDS, 4)
+        docs.append(
+            {
+                "service": {
+                    "id": f"service_{i}",
+                    "name": f"{area}{shop}{i}号",
+                    "type": rng.choice(TYPES),
+                    "provider": {"id": f"provider_{i}", "name": f"{area}{shop}"},
+                },
+                "semantic": {
+                    "description": (
+                        f"{area}的{shop}，提供{'、'.join(keywords)}，"
+                        f"配送范围为店铺周边{rng.randint(1, 5)}公里内。"
+                    ),
+                    "keywords": keywords,
+                    "capabilities": rng.sample(CAPABILITIES, 3),
+                },
+                "endpoints": [
+                    {"name": f"endpoint_{j}", "path": f"/api/{j}", "description": d}
+                    for j, d in enumerate(rng.sample(ENDPOINTS, 3))
+                ],
+            }
+        )
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = catalogue(args.services)
+    index = ServiceIndex()
+    start = time.perf_counter()
+    index.add_all(docs)
+    added = time.perf_counter()
+    index.search("奶茶")
+    built = time.perf_counter()
+    print(
+        f"{len(index)} services: add {added - start:.2f} s, "
+        f"score {built - added:.2f} s"
+    )
+
+    overall = LatencyHistogram()
+    for query, service_type, page in [(q, None, 1) for q in QUERIES] + [
+        ("奶茶", "retail", 1),
+        ("我想喝奶茶", "food_delivery", 3),
+    ]:
+        histogram = LatencyHistogram()
+        for _ in range(args.rounds):
+            t = time.perf_counter()
+            result = index.search(query, service_type=service_type, page=page)
+            elapsed = time.perf_counter() - t
+            histogram.record(elapsed)
+            overall.record(elapsed)
+        p = histogram.percentiles((50, 99))
+        label = query + (f" [{service_type} p{page}]" if service_type else "")
+        print(
+            f"  {label:<32} total={result.total:<7}"
+            f" p50 {p['p50']:.3f} ms  p99 {p['p99']:.3f} ms"
+        )
+    p = overall.percentiles((50, 99))
+    print(f"all queries: p50 {p['p50']:.3f} ms  p99 {p['p99']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: compiled input_schema validators vs. interpreting the schema.
+
+Run from ``sdk/python``:
+
+    python -m benchmarks.bench_validation
+"""
+
+import re
+import timeit
+from typing import Any, Dict, List
+
+from a2e.validation import compile_schema
+
+CREATE_ORDER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["items", "address", "phone"],
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["product_id", "quantity"],
+                "properties": {
+                    "product_id": {"type": "integer"},
+                    "quantity": {"type": "integer", "minimum": 1},
+                    "options": {
+                        "type": "object",
+                        "properties": {
+                            "sugar": {"type": "string"},
+                            "ice": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        },
+        "address": {"type": "string"},
+        "phone": {"type": "string", "pattern": r"^\d{11}$"},
+        "note": {"type": "string"},
+    },
+}
+
+VALID_INPUT = {
+    "items": [
+        {"product_id": i, "quantity": 1, "options": {"sugar": "半糖", "ice": "少冰"}}
+        for i in range(1, 6)
+    ],
+    "address": "上海市浦东新区世纪大道100号",
+    "phone": "13800138000",
+}
+
+INVALID_INPUT = {
+    "items": [{"product_id": "1"}],
+    "phone": 13800138000,
+}
+
+_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
+
+def interpret(schema: Dict[str, Any], value: Any, path: str = "$") -> List[str]:
+    """Baseline: walk the schema dict on every call."""
+    errors: List[str] = []
+    expected = schema.get("type")
+    if expected and not isinstance(value, _TYPES[expected]):
+        return [f"{path}: expected {expected}"]
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: less than {schema['minimum']}")
+    if "pattern" in schema and not re.search(schema["pattern"], value):
+        errors.append(f"{path}: does not match")
+    if isinstance(value, dict):
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{path}.{name}: is required")
+        for name, sub in schema.get("properties", {}).items():
+            if name in value:
+                errors.extend(interpret(sub, value[name], f"{path}.{name}"))
+    if isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(interpret(schema["items"], item, f"{path}[{i}]"))
+    return errors
+
+
+def bench(label: str, fn, number: int = 20000) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    per_call = seconds / number * 1e6
+    print(f"  {label:<28} {per_call:8.2f} µs/call")
+    return per_call
+
+
+def main():
+    validate = compile_schema(CREATE_ORDER_SCHEMA)
+    assert not validate(VALID_INPUT) and validate(INVALID_INPUT)
+    assert not interpret(CREATE_ORDER_SCHEMA, VALID_INPUT)
+
+    print("compile once:")
+    bench("compile_schema", lambda: compile_schema(CREATE_ORDER_SCHEMA), 2000)
+
+    for name, payload in (("valid", VALID_INPUT), ("invalid", INVALID_INPUT)):
+        print(f"{name} input:")
+        base = bench(
+            "interpret schema dict",
+            lambda: interpret(CREATE_ORDER_SCHEMA, payload),
+        )
+        fast = bench("compiled validator", lambda: validate(payload))
+        print(f"  speedup: {base / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
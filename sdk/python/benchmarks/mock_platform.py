@@ -0,0 +1,150 @@
+"""
+In-process stand-in for the A2E platform API.
+
+Serves ``search``, ``protocol``, ``execute`` and ``get_user_token`` through
+``httpx.MockTransport`` with configurable latency and payload sizes, so
+benchmarks measure the SDK rather than the network. Response bodies are
+encoded once up front; per-request work is limited to routing and the
+simulated latency.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from a2e import A2EClient, AsyncA2EClient, ConnectionPool, ProtocolCache
+
+from .payloads import execute_payload, protocol_payload, search_payload
+
+
+@dataclass
+class PlatformConfig:
+    """Stand-in platform settings."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    services: int = 1000
+    page_size: int = 20
+    protocol_endpoints: int = 20
+    protocol_codes: int = 10
+    menu_items: int = 100
+    token_ttl: int = 3600
+
+
+def _body(data: Any) -> bytes:
+    payload = {"code": 0, "message": "success", "data": data}
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+class MockPlatform:
+    """Routes SDK requests to canned responses."""
+
+    def __init__(self, config: Optional[PlatformConfig] = None):
+        self.config = config or PlatformConfig()
+        self.requests: Dict[str, int] = {}
+        cfg = self.config
+        self._protocol = _body(
+            protocol_payload(cfg.protocol_endpoints, cfg.protocol_codes)
+        )
+        self._protocol_etag = f'"{hash(self._protocol) & 0xFFFFFFFF:08x}"'
+        self._execute = json.dumps(
+            execute_payload(cfg.menu_items), ensure_ascii=False
+        ).encode("utf-8")
+        self._token = _body(
+            {
+                "consumer_token": "token_benchmark",
+                "expires_in": cfg.token_ttl,
+                "user_info": {"nickname": "bench"},
+            }
+        )
+        self._pages: Dict[int, bytes] = {}
+
+    def _delay(self) -> float:
+        cfg = self.config
+        if not cfg.latency and not cfg.jitter:
+            return 0.0
+        return max(0.0, cfg.latency + random.uniform(-cfg.jitter, cfg.jitter))
+
+    def _page(self, page: int) -> bytes:
+        body = self._pages.get(page)
+        if body is None:
+            size = self.config.page_size
+            offset = (page - 1) * size
+            rows = max(0, min(size, self.config.services - offset))
+            body = self._pages[page] = _body(
+                search_payload(rows, total=self.config.services, offset=offset)
+            )
+        return body
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/services/search"):
+            api = "search"
+            page = json.loads(request.content).get("page", 1)
+            response = httpx.Response(200, content=self._page(page))
+        elif path.endswith("/protocol"):
+            api = "protocol"
+            if request.headers.get("If-None-Match") == self._protocol_etag:
+                response = httpx.Response(304)
+            else:
+                response = httpx.Response(
+                    200,
+                    content=self._protocol,
+                    headers={"ETag": self._protocol_etag},
+                )
+        elif "/execute/" in path:
+            api = "execute"
+            response = httpx.Response(200, content=self._execute)
+        elif path.endswith("/platform/get_user_token"):
+            api = "token"
+            response = httpx.Response(200, content=self._token)
+        else:
+            api = "unknown"
+            response = httpx.Response(404)
+        self.requests[api] = self.requests.get(api, 0) + 1
+        response.headers["Content-Type"] = "application/json"
+        return response
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self.respond(request)
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self.respond(request)
+
+    def pool(self) -> ConnectionPool:
+        """A connection pool whose transports are this platform."""
+        return ConnectionPool(
+            transport=httpx.MockTransport(self.handler),
+            async_transport=httpx.MockTransport(self.async_handler),
+        )
+
+    def client(self, cache_protocols: bool = False, **kwargs: Any) -> A2EClient:
+        return A2EClient(
+            base_url="http://a2e.bench",
+            pool=self.pool(),
+            protocol_cache=ProtocolCache(maxsize=256 if cache_protocols else 0),
+            **kwargs,
+        )
+
+    def async_client(
+        self,
+        cache_protocols: bool = False,
+        **kwargs: Any,
+    ) -> AsyncA2EClient:
+        return AsyncA2EClient(
+            base_url="http://a2e.bench",
+            pool=self.pool(),
+            protocol_cache=ProtocolCache(maxsize=256 if cache_protocols else 0),
+            **kwargs,
+        )
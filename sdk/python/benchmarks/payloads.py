@@ -0,0 +1,113 @@
+"""
+Synthetic A2E payloads shared by the benchmarks.
+
+Shapes follow ``examples/provider-demo/protocol.yaml`` and the platform
+API responses, scaled up to stress parsing and serialization.
+"""
+
+from typing import Any, Dict, Optional
+
+
+def protocol_payload(endpoints: int = 200, codes: int = 100) -> Dict[str, Any]:
+    """A protocol document shaped like the provider demo's, scaled up."""
+    return {
+        "version": "1.0.0",
+        "service": {
+            "id": "demo_tea_shop",
+            "name": "示例奶茶店",
+            "type": "food_delivery",
+            "provider": {"id": "provider_demo", "name": "示例奶茶店"},
+        },
+        "semantic": {
+            "description": "示例奶茶店，提供各类奶茶、果茶饮品" * 5,
+            "keywords": ["奶茶", "果茶", "饮品", "外卖"],
+            "capabilities": ["在线浏览菜单", "自定义口味", "外卖配送"],
+            "constraints": ["配送范围：3公里内", "营业时间：9:00-21:00"],
+        },
+        "endpoints": [
+            {
+                "name": f"endpoint_{i}",
+                "path": f"/api/endpoint/{i}",
+                "method": "POST",
+                "description": "获取店铺完整菜单，包含所有可售商品",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {"category": {"type": "string"}},
+                },
+                "output_schema": {
+                    "type": "object",
+                    "properties": {"items": {"type": "array"}},
+                },
+            }
+            for i in range(endpoints)
+        ],
+        "error_handling": {
+            "codes": [
+                {"code": f"ERR_{i}", "description": "错误", "suggestion": "重试"}
+                for i in range(codes)
+            ]
+        },
+    }
+
+
+def search_payload(
+    rows: int = 100,
+    total: Optional[int] = None,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """One page of ``search_services`` results."""
+    return {
+        "total": rows if total is None else total,
+        "list": [
+            {
+                "id": f"service_{i}",
+                "name": f"奶茶店 {i}",
+                "type": "food_delivery",
+                "description": "提供各类奶茶、果茶",
+                "tags": ["奶茶", "外卖"],
+                "provider": {"id": f"provider_{i}", "name": f"店铺 {i}"},
+            }
+            for i in range(offset, offset + rows)
+        ],
+    }
+
+
+def execute_payload(items: int = 500) -> Dict[str, Any]:
+    """An ``execute`` response carrying a ``get_menu`` output."""
+    return {
+        "code": 0,
+        "message": "success",
+        "data": {
+            "execution_id": "exec_20260208_0001",
+            "status": "success",
+            "output": {
+                "categories": [
+                    {
+                        "name": f"分类 {c}",
+                        "items": [
+                            {
+                                "id": c * 1000 + i,
+                                "name": "招牌奶茶",
+                                "price": 12.0,
+                                "description": "经典招牌，香浓醇厚，使用优质红茶配合鲜奶",
+                                "category": f"分类 {c}",
+                                "options": {
+                                    "sugar": [
+                                        "全糖",
+                                        "七分糖",
+                                        "半糖",
+                                        "三分糖",
+                                        "无糖",
+                                    ],
+                                    "ice": ["正常冰", "少冰", "去冰", "热"],
+                                },
+                            }
+                            for i in range(items // 10)
+                        ],
+                    }
+                    for c in range(10)
+                ],
+                "total_count": items,
+            },
+        },
+    }
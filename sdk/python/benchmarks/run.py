@@ -0,0 +1,262 @@
+"""
+A2E SDK benchmark suite.
+
+Drives ``A2EClient`` and ``AsyncA2EClient`` against the in-process stand-in
+platform at several concurrency levels and reports throughput, latency
+percentiles and per-request allocation peaks. Results are written as JSON
+so runs from different SDK versions can be compared.
+
+Run from ``sdk/python``:
+
+    python -m benchmarks.run --concurrency 1,8,32 --output results.json
+    python -m benchmarks.run --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import a2e
+from a2e.codec import default_codec
+from a2e.instrumentation import LatencyHistogram
+
+from .mock_platform import MockPlatform, PlatformConfig
+
+APIS = ("search", "protocol", "protocol_cached", "execute", "token")
+
+
+def _call(client: Any, api: str) -> Callable[[int], Any]:
+    """One request of ``api``; returns a coroutine for async clients."""
+    if api == "search":
+        return lambda i: client.search_services("奶茶", page=i % 10 + 1, size=20)
+    if api in ("protocol", "protocol_cached"):
+        return lambda i: client.get_protocol(f"service_{i % 50}")
+    if api == "execute":
+        return lambda i: client.execute("service_1", "get_menu", "token_bench", {})
+    return lambda i: client.get_consumer_token("wechat", f"code_{i}")
+
+
+def _result(
+    mode: str,
+    api: str,
+    concurrency: int,
+    requests: int,
+    elapsed: float,
+    histogram: LatencyHistogram,
+    alloc_peak: float,
+) -> Dict[str, Any]:
+    latency = histogram.percentiles((50, 95, 99, 99.9))
+    return {
+        "mode": mode,
+        "api": api,
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 4),
+        "req_per_s": round(requests / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {k: round(v, 3) for k, v in latency.items() if k != "count"},
+        "alloc_peak_kib_per_request": round(alloc_peak / 1024, 2),
+    }
+
+
+def _alloc_peak(call: Callable[[], Any], samples: int) -> float:
+    """Average peak traced memory of a single call, in bytes."""
+    tracemalloc.start()
+    total = 0
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - base
+    finally:
+        tracemalloc.stop()
+    return total / samples
+
+
+async def _async_alloc_peak(call: Callable[[int], Any], samples: int) -> float:
+    tracemalloc.start()
+    total = 0
+    try:
+        for i in range(samples):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            await call(i)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - base
+    finally:
+        tracemalloc.stop()
+    return total / samples
+
+
+def run_sync(
+    platform_: MockPlatform,
+    api: str,
+    concurrency: int,
+    requests: int,
+    alloc_samples: int,
+) -> Dict[str, Any]:
+    client = platform_.client(cache_protocols=api == "protocol_cached")
+    call = _call(client, api)
+    histogram = LatencyHistogram()
+    call(0)  # warm-up
+
+    def timed(i: int) -> None:
+        start = time.perf_counter()
+        call(i)
+        histogram.record(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    alloc = _alloc_peak(lambda: call(1), alloc_samples)
+    client.pool.close()
+    return _result("sync", api, concurrency, requests, elapsed, histogram, alloc)
+
+
+async def run_async(
+    platform_: MockPlatform,
+    api: str,
+    concurrency: int,
+    requests: int,
+    alloc_samples: int,
+) -> Dict[str, Any]:
+    client = platform_.async_client(cache_protocols=api == "protocol_cached")
+    call = _call(client, api)
+    histogram = LatencyHistogram()
+    await call(0)  # warm-up
+    jobs = iter(range(requests))
+
+    async def worker() -> None:
+        for i in jobs:
+            start = time.perf_counter()
+            await call(i)
+            histogram.record(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    alloc = await _async_alloc_peak(call, alloc_samples)
+    await client.pool.aclose()
+    return _result("async", api, concurrency, requests, elapsed, histogram, alloc)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print req/s and p99 deltas for scenarios present in both runs."""
+
+    def key(r: Dict[str, Any]):
+        return (r["mode"], r["api"], r["concurrency"])
+
+    before = {key(r): r for r in baseline["results"]}
+    print(f"\ncompared with a2e {baseline['sdk_version']} ({baseline['timestamp']}):")
+    for r in current["results"]:
+        old = before.get(key(r))
+        if old is None:
+            continue
+        rps = (r["req_per_s"] / old["req_per_s"] - 1) * 100 if old["req_per_s"] else 0
+        p99 = r["latency_ms"]["p99"] - old["latency_ms"]["p99"]
+        print(
+            f"  {r['mode']:<5} {r['api']:<16} c={r['concurrency']:<4}"
+            f" req/s {rps:+6.1f}%   p99 {p99:+8.3f} ms"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--apis",
+        default=",".join(APIS),
+        help="comma-separated subset of: " + ", ".join(APIS),
+    )
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="simulated platform latency per request",
+    )
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--menu-items", type=int, default=100, help="products in each execute response"
+    )
+    parser.add_argument("--protocol-endpoints", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--alloc-samples", type=int, default=50)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    config = PlatformConfig(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        page_size=args.page_size,
+        protocol_endpoints=args.protocol_endpoints,
+        menu_items=args.menu_items,
+    )
+    apis = [a for a in args.apis.split(",") if a]
+    modes = [m for m in args.modes.split(",") if m]
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+
+    results = []
+    for mode in modes:
+        for api in apis:
+            for concurrency in levels:
+                platform_ = MockPlatform(config)
+                if mode == "sync":
+                    r = run_sync(
+                        platform_, api, concurrency, args.requests, args.alloc_samples
+                    )
+                else:
+                    r = asyncio.run(
+                        run_async(
+                            platform_,
+                            api,
+                            concurrency,
+                            args.requests,
+                            args.alloc_samples,
+                        )
+                    )
+                results.append(r)
+                print(
+                    f"{mode:<5} {api:<16} c={concurrency:<4}"
+                    f" {r['req_per_s']:>9.1f} req/s"
+                    f"  p50 {r['latency_ms']['p50']:7.3f} ms"
+                    f"  p99 {r['latency_ms']['p99']:7.3f} ms"
+                    f"  alloc {r['alloc_peak_kib_per_request']:7.1f} KiB"
+                )
+
+    report = {
+        "sdk_version": a2e.__version__,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "codec": default_codec().name,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": asdict(config),
+        "requests": args.requests,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Shared fixtures: SDK clients talking to an in-process ``httpx.MockTransport``.
+"""
+
+from typing import Any, Callable, Dict, List
+
+import httpx
+import pytest
+
+from a2e import A2EClient, AsyncA2EClient, ConnectionPool, RetryPolicy
+
+BASE_URL = "http://a2e.test"
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+def ok(data: Any, status: int = 200, **kwargs: Any) -> httpx.Response:
+    """A platform response envelope carrying ``data``."""
+    return httpx.Response(status, json={"code": 0, "data": data}, **kwargs)
+
+
+def fail(code: int, message: str, status: int = 200) -> httpx.Response:
+    return httpx.Response(status, json={"code": code, "message": message})
+
+
+PROTOCOL: Dict[str, Any] = {
+    "version": "1.0",
+    "service": {"id": "svc", "name": "Tea Shop", "type": "food"},
+    "endpoints": [
+        {
+            "name": "get_menu",
+            "path": "/menu",
+            "input_schema": {"type": "object"},
+        },
+    ],
+}
+
+
+class Recorder:
+    """Wraps a handler and remembers every request it served."""
+
+    def __init__(self, handler: Handler):
+        self.handler = handler
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.handler(request)
+
+    @property
+    def paths(self) -> List[str]:
+        return [r.url.path for r in self.requests]
+
+
+# Retries in tests should not sleep.
+FAST_RETRY = RetryPolicy(base_delay=0, max_delay=0)
+
+
+@pytest.fixture
+def make_client() -> Callable[..., A2EClient]:
+    clients: List[A2EClient] = []
+
+    def make(handler: Handler, **kwargs: Any) -> A2EClient:
+        kwargs.setdefault("retry", FAST_RETRY)
+        pool = ConnectionPool(transport=httpx.MockTransport(handler))
+        client = A2EClient(BASE_URL, pool=pool, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+        client.pool.close()
+
+
+@pytest.fixture
+async def make_async_client() -> Callable[..., AsyncA2EClient]:
+    clients: List[AsyncA2EClient] = []
+
+    def make(handler: Handler, **kwargs: Any) -> AsyncA2EClient:
+        kwargs.setdefault("retry", FAST_RETRY)
+        pool = ConnectionPool(async_transport=httpx.MockTransport(handler))
+        client = AsyncA2EClient(BASE_URL, pool=pool, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.close()
+        await client.pool.aclose()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+from a2e import AsyncTokenManager, AuthResult, TokenManager
+
+
+class Platform:
+    """Issues tok1, tok2, ...; ``fail`` makes fetches after the first raise."""
+
+    def __init__(self, expires_in=3600, fail=False, gate=None):
+        self.expires_in = expires_in
+        self.fail = fail
+        self.gate = gate
+        self.calls = 0
+
+    def __call__(self, auth_type, auth_code):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail and self.calls > 1:
+            raise ConnectionError("platform down")
+        return AuthResult(consumer_token=f"tok{self.calls}", expires_in=self.expires_in)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.005)
+
+
+def test_token_is_reused_within_its_lifetime():
+    platform = Platform()
+    tokens = TokenManager(platform)
+    assert tokens.get_token("sms", "1") == "tok1"
+    assert tokens.get_token("sms", "1") == "tok1"
+    assert tokens.get_token("sms", "2") == "tok2"
+    assert platform.calls == 2
+    assert tokens.stats.hits == 1
+
+
+def test_short_lived_tokens_are_not_cached():
+    platform = Platform(expires_in=10)
+    tokens = TokenManager(platform, expiry_margin=30)
+    tokens.get_token("sms", "1")
+    tokens.get_token("sms", "1")
+    assert platform.calls == 2
+
+
+def test_refresh_happens_in_the_background():
+    platform = Platform()
+    tokens = TokenManager(platform, refresh_fraction=0.0)
+    assert tokens.get_token("sms", "1") == "tok1"
+    # Due for refresh: the cached token is served while a new one is fetched.
+    assert tokens.get_token("sms", "1") == "tok1"
+    wait_for(lambda: platform.calls == 2)
+    wait_for(lambda: tokens.get_token("sms", "1") == "tok2")
+    assert tokens.stats.refreshes >= 1
+
+
+def test_failed_refresh_keeps_the_old_token():
+    platform = Platform(fail=True)
+    tokens = TokenManager(platform, refresh_fraction=0.0)
+    assert tokens.get_token("sms", "1") == "tok1"
+    tokens.get_token("sms", "1")
+    wait_for(lambda: tokens.stats.refresh_failures == 1)
+    assert tokens.get_token("sms", "1") == "tok1"
+
+
+def test_concurrent_gets_share_one_fetch():
+    gate = threading.Event()
+    platform = Platform(gate=gate)
+    tokens = TokenManager(platform)
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(tokens.get_token, "sms", "1") for _ in range(8)]
+        wait_for(lambda: platform.calls == 1)
+        time.sleep(0.05)
+        gate.set()
+        assert {f.result() for f in futures} == {"tok1"}
+    assert platform.calls == 1
+
+
+def test_invalidate_forces_a_new_fetch():
+    platform = Platform()
+    tokens = TokenManager(platform)
+    tokens.get_token("sms", "1")
+    tokens.invalidate("sms", "1")
+    tokens.invalidate("sms", "unknown")
+    assert tokens.get_token("sms", "1") == "tok2"
+
+
+def async_platform(sync_platform, release=None):
+    async def fetch(auth_type, auth_code):
+        if release is not None:
+            await release.wait()
+        return sync_platform(auth_type, auth_code)
+
+    return fetch
+
+
+async def test_async_concurrent_gets_share_one_fetch():
+    platform = Platform()
+    release = asyncio.Event()
+    tokens = AsyncTokenManager(async_platform(platform, release))
+    pending = [asyncio.create_task(tokens.get_token("sms", "1")) for _ in range(8)]
+    await asyncio.sleep(0.01)
+    release.set()
+    assert set(await asyncio.gather(*pending)) == {"tok1"}
+    assert platform.calls == 1
+    assert await tokens.get_token("sms", "1") == "tok1"
+    assert tokens.stats.hits == 1
+
+
+async def test_async_refresh_and_failure():
+    platform = Platform(fail=True)
+    tokens = AsyncTokenManager(async_platform(platform), refresh_fraction=0.0)
+    assert await tokens.get_token("sms", "1") == "tok1"
+    assert await tokens.get_token("sms", "1") == "tok1"
+    await asyncio.gather(*tokens._background)
+    assert tokens.stats.refresh_failures == 1
+    assert await tokens.get_token("sms", "1") == "tok1"
+
+    # The last get started another refresh; let that one succeed.
+    platform.fail = False
+    await asyncio.gather(*tokens._background)
+    assert await tokens.get_token("sms", "1") == "tok3"
+
+
+async def test_async_invalidate():
+    platform = Platform()
+    tokens = AsyncTokenManager(async_platform(platform))
+    await tokens.get_token("sms", "1")
+    tokens.invalidate("sms", "1")
+    assert await tokens.get_token("sms", "1") == "tok2"
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from a2e import ProtocolCache
+
+from conftest import PROTOCOL, Recorder, ok
+
+SEARCH = {"total": 1, "list": [{"id": "svc", "name": "Tea Shop", "type": "food"}]}
+
+
+def gated(release: threading.Event):
+    """Serve the protocol or a search page once ``release`` is set."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        release.wait(5)
+        if request.url.path.endswith("/search"):
+            return ok(SEARCH)
+        return ok(PROTOCOL)
+
+    return Recorder(handler)
+
+
+def test_concurrent_protocol_misses_share_one_request(make_client):
+    release = threading.Event()
+    server = gated(release)
+    client = make_client(server, protocol_cache=ProtocolCache(maxsize=0))
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(client.get_protocol, "svc") for _ in range(8)]
+        while client.coalesced["protocol"] < 7:
+            time.sleep(0.001)
+        release.set()
+        protocols = [f.result() for f in futures]
+    assert len(server.requests) == 1
+    assert all(p is protocols[0] for p in protocols)
+
+
+def test_errors_are_shared_and_not_cached(make_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    client = make_client(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("svc")
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("svc")
+    assert len(calls) == 2
+    assert not client._protocol_flight.in_flight("svc")
+
+
+def test_different_searches_are_not_coalesced(make_client):
+    release = threading.Event()
+    release.set()
+    server = gated(release)
+    client = make_client(server)
+    client.search_services("tea")
+    client.search_services("coffee")
+    assert len(server.requests) == 2
+    assert client.coalesced["search"] == 0
+
+
+def test_list_location_is_accepted(make_client):
+    release = threading.Event()
+    release.set()
+    server = gated(release)
+    client = make_client(server)
+    assert client.search_services("tea", location=[39.9, 116.4]).total == 1
+    body = json.loads(server.requests[0].content)
+    assert body["location"] == {"latitude": 39.9, "longitude": 116.4}
+
+
+async def test_async_searches_share_one_request(make_async_client):
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return ok(SEARCH)
+
+    server = Recorder(handler)
+    client = make_async_client(server)
+    tasks = [asyncio.create_task(client.search_services("tea")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+    assert len(server.requests) == 1
+    assert all(r is results[0] for r in results)
+    assert client.coalesced["search"] == 4
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_call(make_async_client):
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return ok(PROTOCOL)
+
+    client = make_async_client(handler, protocol_cache=ProtocolCache(maxsize=0))
+    first = asyncio.create_task(client.get_protocol("svc"))
+    second = asyncio.create_task(client.get_protocol("svc"))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert (await second).service.id == "svc"
+
+
+async def test_shared_call_is_cancelled_when_every_waiter_leaves(make_async_client):
+    cancelled = asyncio.Event()
+
+    async def handler(request):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    client = make_async_client(handler, protocol_cache=ProtocolCache(maxsize=0))
+    waiters = [asyncio.create_task(client.get_protocol("svc")) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for task in waiters:
+        task.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert client.coalesced["protocol"] == 1
+
+
+async def test_async_list_location_shares_one_request(make_async_client):
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return ok(SEARCH)
+
+    server = Recorder(handler)
+    client = make_async_client(server)
+    tasks = [
+        asyncio.create_task(client.search_services("tea", location=location))
+        for location in ([39.9, 116.4], (39.9, 116.4))
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+    assert len(server.requests) == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from a2e.codec import get_codec
+
+
+def available():
+    names = []
+    for name in ("orjson", "msgspec", "json"):
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize("name", available())
+def test_non_string_keys_encode_like_json(name):
+    codec = get_codec(name)
+    data = {"quantities": {1: 2, 3: 4}, "name": "奶茶"}
+    assert codec.loads(codec.dumps(data)) == {
+        "quantities": {"1": 2, "3": 4},
+        "name": "奶茶",
+    }
@@ -0,0 +1,94 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import httpx
+import pytest
+
+from a2e import A2EClient, ConnectionPool, DiskCache
+
+from conftest import PROTOCOL, Recorder, ok
+
+
+@pytest.fixture
+def disk(tmp_path):
+    cache = DiskCache(str(tmp_path / "a2e.db"), ttl=60)
+    yield cache
+    cache.close()
+
+
+def etag_server(name="Tea Shop", etag='"v1"'):
+    protocol = dict(PROTOCOL, service=dict(PROTOCOL["service"], name=name))
+
+    def handler(request):
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return ok(protocol, headers={"ETag": etag})
+
+    return Recorder(handler)
+
+
+def client_for(server, disk, base_url="http://a2e.test"):
+    pool = ConnectionPool(transport=httpx.MockTransport(server))
+    return A2EClient(base_url, pool=pool, disk_cache=disk)
+
+
+def test_warm_start_reads_from_disk(disk):
+    server = etag_server()
+    client_for(server, disk).get_protocol("svc")
+    fresh = client_for(server, disk)
+    assert fresh.get_protocol("svc").service.name == "Tea Shop"
+    assert fresh.protocol_cache.disk_hits == 1
+    assert len(server.requests) == 1
+
+
+def test_keys_are_namespaced_by_base_url(disk):
+    staging = etag_server("Staging Shop")
+    prod = etag_server("Prod Shop")
+    staging_client = client_for(staging, disk, "http://staging.a2e.test")
+    prod_client = client_for(prod, disk, "http://a2e.test/")
+    assert staging_client.get_protocol("svc").service.name == "Staging Shop"
+    assert prod_client.get_protocol("svc").service.name == "Prod Shop"
+    assert len(prod.requests) == 1
+
+    prod_client.protocol_cache.invalidate()
+    again = client_for(staging, disk, "http://staging.a2e.test")
+    assert again.get_protocol("svc").service.name == "Staging Shop"
+    assert len(staging.requests) == 1
+
+
+def test_stale_disk_entry_is_revalidated(disk):
+    server = etag_server()
+    client_for(server, disk).get_protocol("svc")
+    disk.touch("protocol:http://a2e.test:svc", ttl=-1)
+    fresh = client_for(server, disk)
+    assert fresh.get_protocol("svc").service.name == "Tea Shop"
+    assert server.requests[1].headers["If-None-Match"] == '"v1"'
+    assert disk.get("protocol:http://a2e.test:svc").expires_at > time.time()
+
+
+async def test_async_disk_writes_do_not_block_the_loop(disk, make_async_client):
+    client = make_async_client(etag_server(), disk_cache=disk)
+    lock = sqlite3.connect(disk.path, isolation_level=None, check_same_thread=False)
+    lock.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.3, lock.execute, ("COMMIT",))
+    release.start()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        protocol = await client.get_protocol("svc")
+    finally:
+        task.cancel()
+        release.join()
+        lock.close()
+    assert protocol.service.name == "Tea Shop"
+    assert ticks >= 10
+    assert disk.get("protocol:http://a2e.test:svc") is not None
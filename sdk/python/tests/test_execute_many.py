@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from conftest import fail, ok
+
+
+def jobs(n):
+    return [("svc", "get_menu", {"i": i}) for i in range(n)]
+
+
+def echo(request: httpx.Request) -> httpx.Response:
+    body = request.read()
+    return ok({"execution_id": body.decode(), "status": "success"})
+
+
+async def collect(client, *args, **kwargs):
+    return [item async for item in client.execute_many(*args, **kwargs)]
+
+
+async def test_ordered_results(make_async_client):
+    client = make_async_client(echo)
+    results = await collect(client, jobs(25), "tok", concurrency=4, ordered=True)
+    assert [r.index for r in results] == list(range(25))
+    assert all(r.ok and r.result.status == "success" for r in results)
+
+
+async def test_concurrency_is_bounded(make_async_client):
+    in_flight = peak = 0
+
+    async def slow(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        return ok({"status": "success"})
+
+    client = make_async_client(slow)
+    results = await collect(client, jobs(20), "tok", concurrency=3)
+    assert len(results) == 20
+    assert peak == 3
+
+
+async def test_api_error_is_reported_per_job(make_async_client):
+    def handler(request):
+        if json.loads(request.content)["input"]["i"] == 2:
+            return fail(40001, "sold out")
+        return ok({"status": "success"})
+
+    client = make_async_client(handler)
+    results = await collect(client, jobs(4), "tok", ordered=True)
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert results[2].error.code == "40001"
+
+
+async def test_unknown_result_keys_are_ignored(make_async_client):
+    client = make_async_client(lambda r: ok({"status": "success", "surprise": 1}))
+    results = await asyncio.wait_for(collect(client, jobs(3), "tok"), timeout=5)
+    assert all(r.ok and r.result.status == "success" for r in results)
+
+
+async def test_unparseable_result_does_not_hang(make_async_client):
+    client = make_async_client(lambda r: ok({"status": "failed", "error": {}}))
+    results = await asyncio.wait_for(collect(client, jobs(5), "tok"), timeout=5)
+    assert len(results) == 5
+    assert all(r.error.code == "CLIENT_ERROR" for r in results)
+    assert isinstance(results[0].error.__cause__, TypeError)
+
+
+async def test_transport_error_is_reported(make_async_client):
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_async_client(handler)
+    results = await asyncio.wait_for(collect(client, jobs(3), "tok"), timeout=5)
+    assert [r.error.code for r in results] == ["HTTP_ERROR"] * 3
+
+
+async def test_missing_token_fails_before_sending(make_async_client):
+    sent = []
+    client = make_async_client(lambda r: sent.append(r) or ok({}))
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(collect(client, jobs(3)), timeout=5)
+    assert sent == []
+
+
+async def test_malformed_job_is_reported_per_job(make_async_client):
+    client = make_async_client(echo)
+    batch = jobs(5)
+    batch[2] = ("svc", "get_menu")
+    results = await asyncio.wait_for(
+        collect(client, batch, "tok", concurrency=2, ordered=True), timeout=5
+    )
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.ok for r in results] == [True, True, False, True, True]
+    assert results[2].error.code == "CLIENT_ERROR"
+    assert isinstance(results[2].error.__cause__, ValueError)
+
+
+async def test_failing_job_iterator_is_reraised(make_async_client):
+    def failing_jobs():
+        yield ("svc", "get_menu", {"i": 0})
+        raise RuntimeError("job source broke")
+
+    client = make_async_client(echo)
+    seen = []
+    with pytest.raises(RuntimeError, match="job source broke"):
+        async for item in client.execute_many(failing_jobs(), "tok", ordered=True):
+            seen.append(item.index)
+    assert seen == [0]
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from a2e import SpatialIndex, geo
+
+# Tiananmen and a point about 2.2 km east of it.
+CENTER = (39.9087, 116.3975)
+EAST = (39.9087, 116.4235)
+
+
+def make_index():
+    index = SpatialIndex()
+    index.add("near", *CENTER, 3, "food")
+    index.add("small", *CENTER, 1, "food")
+    index.add("shop", *EAST, 5, "retail")
+    return index
+
+
+def test_deliverable_is_nearest_first_and_filters_type():
+    index = make_index()
+    matches = index.deliverable(*CENTER)
+    assert [m[0] for m in matches] == ["near", "small", "shop"]
+    assert matches[2][1] == pytest.approx(geo.haversine(*CENTER, *EAST))
+    assert [m[0] for m in index.deliverable(*EAST, "food")] == ["near"]
+
+
+def test_remove():
+    index = make_index()
+    assert index.remove("near")
+    assert not index.remove("near")
+    assert [m[0] for m in index.deliverable(*EAST)] == ["shop"]
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_deliverable_many_matches_single_lookups(numpy, monkeypatch):
+    if numpy and not geo.HAS_NUMPY:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(geo, "HAS_NUMPY", numpy)
+    rng = random.Random(7)
+    index = SpatialIndex()
+    for i in range(300):
+        lat = CENTER[0] + rng.uniform(-0.1, 0.1)
+        lon = CENTER[1] + rng.uniform(-0.1, 0.1)
+        index.add(f"s{i}", lat, lon, rng.choice((1, 3)), rng.choice(("a", "b")))
+    points = [
+        (CENTER[0] + rng.uniform(-0.1, 0.1), CENTER[1] + rng.uniform(-0.1, 0.1))
+        for _ in range(50)
+    ]
+    batch = index.deliverable_many(points, "a")
+    for point, matches in zip(points, batch):
+        single = index.deliverable(*point, "a")
+        assert [m[0] for m in matches] == [m[0] for m in single]
@@ -0,0 +1,83 @@
+import httpx
+import pytest
+
+from conftest import Recorder, ok
+
+
+def flaky_execute(failures=1):
+    def handler(request):
+        if len(server.requests) <= failures:
+            return httpx.Response(503)
+        return ok({"execution_id": request.headers.get("Idempotency-Key", "")})
+
+    server = Recorder(handler)
+    return server
+
+
+def keys(server):
+    return [r.headers.get("Idempotency-Key") for r in server.requests]
+
+
+def test_key_is_sent_and_reused_on_retry(make_client):
+    server = flaky_execute(2)
+    client = make_client(server)
+    result = client.execute("svc", "create_order", "tok", {}, idempotency_key="k1")
+    assert result.execution_id == "k1"
+    assert keys(server) == ["k1", "k1", "k1"]
+
+
+def test_calls_without_key_are_not_retried(make_client):
+    server = flaky_execute()
+    client = make_client(server)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.execute("svc", "create_order", "tok", {})
+    assert keys(server) == [None]
+
+
+def test_generated_keys_are_per_call(make_client):
+    server = flaky_execute(0)
+    client = make_client(server, idempotency_keys=True)
+    client.execute("svc", "create_order", "tok", {})
+    client.execute("svc", "create_order", "tok", {})
+    first, second = keys(server)
+    assert first and second and first != second
+
+
+def test_reused_key_rejection_is_not_retried(make_client):
+    def handler(request):
+        return httpx.Response(422, json={"detail": {"code": "IDEMPOTENCY_KEY_REUSED"}})
+
+    server = Recorder(handler)
+    client = make_client(server)
+    with pytest.raises(httpx.HTTPStatusError) as info:
+        client.execute("svc", "create_order", "tok", {"x": 2}, idempotency_key="k1")
+    assert info.value.response.status_code == 422
+    assert len(server.requests) == 1
+
+
+def test_batch_orders_share_one_key(make_client):
+    rows = [
+        {"index": 0, "success": True, "order": {"order_no": "N1"}},
+        {"index": 1, "success": False, "error": {"code": "SOLD_OUT"}},
+    ]
+
+    def handler(request):
+        return ok({"status": "success", "output": {"results": rows}})
+
+    server = Recorder(handler)
+    client = make_client(server)
+    orders = [{"items": []}, {"items": []}]
+    results = client.create_orders("svc", orders, "tok", idempotency_key="b1")
+    assert keys(server) == ["b1"]
+    assert results[0].result.output["order_no"] == "N1"
+    assert results[1].error.code == "SOLD_OUT"
+
+
+async def test_async_key_is_reused_on_retry(make_async_client):
+    server = flaky_execute(1)
+    client = make_async_client(server)
+    result = await client.execute(
+        "svc", "create_order", "tok", {}, idempotency_key="k2"
+    )
+    assert result.execution_id == "k2"
+    assert keys(server) == ["k2", "k2"]
@@ -0,0 +1,167 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from a2e import (
+    AsyncA2EClient,
+    ConnectionPool,
+    LatencyCollector,
+    LatencyHistogram,
+    RequestObserver,
+    RetryPolicy,
+)
+
+from conftest import BASE_URL, PROTOCOL, ok
+
+SEARCH = {"total": 1, "list": [{"id": "svc", "name": "Tea Shop", "type": "food"}]}
+
+
+def exact(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(1, round(p / 100 * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize(
+    "draw",
+    [
+        lambda rng: rng.uniform(0.001, 0.5),
+        lambda rng: rng.expovariate(1 / 0.02),
+        lambda rng: rng.lognormvariate(-4, 1.2),
+    ],
+    ids=["uniform", "exponential", "lognormal"],
+)
+def test_percentiles_are_within_bucket_precision(draw):
+    rng = random.Random(42)
+    samples = [draw(rng) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    assert histogram.count == len(samples)
+    assert histogram.max == max(samples)
+    assert histogram.mean == pytest.approx(sum(samples) / len(samples))
+    for p in (50, 90, 99, 99.9):
+        # One bucket is at most 1/64 of its value wide, plus 1 µs of truncation.
+        assert histogram.percentile(p) == pytest.approx(
+            exact(samples, p), rel=0.016, abs=2e-6
+        )
+
+
+def test_percentile_edges():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    samples = [ms / 1000 for ms in (1, 2, 3, 4, 1000)]
+    for sample in samples:
+        histogram.record(sample)
+    assert histogram.percentile(100) == 1.0
+    assert histogram.percentile(50) == pytest.approx(exact(samples, 50), rel=0.016)
+    summary = histogram.percentiles()
+    assert summary["count"] == 5
+    assert summary["max"] == pytest.approx(1000)
+    histogram.reset()
+    assert histogram.count == 0
+
+
+class Recording(RequestObserver):
+    def __init__(self):
+        self.timings = []
+
+    def on_request(self, timing):
+        self.timings.append(timing)
+
+
+class Broken(RequestObserver):
+    def on_request(self, timing):
+        raise RuntimeError("observer bug")
+
+
+def platform(request):
+    path = request.url.path
+    if path.endswith("/discovery"):
+        return ok({"platform": "a2e"})
+    if path.endswith("/search"):
+        return ok(SEARCH)
+    if path.endswith("/protocol"):
+        return ok(PROTOCOL)
+    if path.endswith("/get_user_token"):
+        return ok({"consumer_token": "tok", "expires_in": 3600})
+    return ok({"execution_id": "e1", "status": "success"})
+
+
+def test_every_api_reports_a_timing(make_client):
+    recording, collector = Recording(), LatencyCollector()
+    client = make_client(platform, observers=[Broken(), recording, collector])
+    client.discover()
+    client.search_services("tea")
+    client.get_protocol("svc")
+    client.get_consumer_token("sms", "1234")
+    result = client.execute("svc", "get_menu", "tok", {})
+    assert result.execution_id == "e1"
+
+    apis = [t.api for t in recording.timings]
+    assert apis == ["discovery", "search", "protocol", "token", "execute"]
+    for timing in recording.timings:
+        assert timing.status == 200 and timing.error is None
+        assert timing.total >= timing.decode >= 0
+    assert recording.timings[1].method == "POST"
+    assert recording.timings[2].endpoint == "/api/v1/open/services/svc/protocol"
+    assert set(collector.summary()) == set(apis)
+    assert collector.percentiles("execute")["count"] == 1
+
+
+def test_failed_call_is_reported(make_client):
+    recording, collector = Recording(), LatencyCollector()
+    client = make_client(
+        lambda r: httpx.Response(404), observers=[recording, collector]
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("svc")
+    (timing,) = recording.timings
+    assert (timing.status, timing.error) == (404, "HTTPStatusError")
+    assert collector.errors == {"protocol": 1}
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """
+    The first request connects, then hangs; the hedge reuses a connection
+    and answers after 100 ms.
+    """
+
+    def __init__(self):
+        self.requests = 0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        trace = request.extensions["trace"]
+        if self.requests == 1:
+            await trace("connection.connect_tcp.started", {})
+            await asyncio.sleep(0.1)
+            await trace("connection.connect_tcp.complete", {})
+            await trace("http11.send_request_headers.started", {})
+            await asyncio.sleep(5)
+        await trace("http11.send_request_headers.started", {})
+        await asyncio.sleep(0.1)
+        await trace("http11.receive_response_headers.complete", {})
+        return ok(PROTOCOL)
+
+
+async def test_hedged_attempts_are_traced_separately():
+    recording = Recording()
+    transport = TracingTransport()
+    client = AsyncA2EClient(
+        BASE_URL,
+        pool=ConnectionPool(async_transport=transport),
+        retry=RetryPolicy(hedge_delay=0.05),
+        observers=[recording],
+    )
+    try:
+        await client.get_protocol("svc")
+    finally:
+        await client.close()
+        await client.pool.aclose()
+    assert transport.requests == 2
+    (timing,) = recording.timings
+    # Only the winning attempt's phases: no connect, full 100 ms to headers.
+    assert timing.connect == 0.0
+    assert timing.ttfb == pytest.approx(0.1, abs=0.03)
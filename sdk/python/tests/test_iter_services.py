@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from conftest import Recorder, ok
+
+
+def page_of(request):
+    return json.loads(request.content)["page"]
+
+
+def pages(total, gate=None):
+    """Serve ``total`` services; pages after the first wait for ``gate``."""
+
+    def handler(request):
+        body = json.loads(request.content)
+        page, size = body["page"], body["size"]
+        if gate is not None and page > 1:
+            gate.wait(5)
+        first = (page - 1) * size
+        services = [
+            {"id": f"s{i}", "name": f"Shop {i}", "type": "food"}
+            for i in range(first, min(first + size, total))
+        ]
+        return ok({"total": total, "list": services})
+
+    return Recorder(handler)
+
+
+def requested(server):
+    return sorted(page_of(r) for r in server.requests)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_every_service_once_and_no_page_past_the_last(make_client, prefetch):
+    server = pages(7)
+    client = make_client(server)
+    ids = [s.id for s in client.iter_services("tea", size=3, prefetch=prefetch)]
+    assert ids == [f"s{i}" for i in range(7)]
+    assert requested(server) == [1, 2, 3]
+
+
+def test_exact_multiple_of_size(make_client):
+    server = pages(6)
+    ids = [s.id for s in make_client(server).iter_services("tea", size=3)]
+    assert len(ids) == 6
+    assert requested(server) == [1, 2]
+
+
+def test_size_must_be_positive(make_client):
+    server = pages(3)
+    with pytest.raises(ValueError):
+        next(make_client(server).iter_services("tea", size=0))
+    assert server.requests == []
+
+
+def test_prefetch_depth_and_early_stop(make_client):
+    gate = threading.Event()
+    server = pages(30, gate)
+    services = make_client(server).iter_services("tea", size=3, prefetch=2)
+    next(services)
+    wait_for(lambda: requested(server) == [1, 2, 3])
+    time.sleep(0.05)
+    assert requested(server) == [1, 2, 3]
+    services.close()
+    gate.set()
+    time.sleep(0.05)
+    assert requested(server) == [1, 2, 3]
+
+
+async def test_async_pages_and_last_page(make_async_client):
+    server = pages(7)
+    client = make_async_client(server)
+    ids = [s.id async for s in client.iter_services("tea", size=3, prefetch=2)]
+    assert ids == [f"s{i}" for i in range(7)]
+    assert requested(server) == [1, 2, 3]
+
+
+async def test_async_size_must_be_positive(make_async_client):
+    client = make_async_client(pages(3))
+    with pytest.raises(ValueError):
+        async for _ in client.iter_services("tea", size=0):
+            pass
+
+
+async def test_async_early_stop_cancels_prefetched_pages(make_async_client):
+    cancelled = []
+    never = asyncio.Event()
+
+    async def handler(request):
+        page = page_of(request)
+        if page > 1:
+            try:
+                await never.wait()
+            except asyncio.CancelledError:
+                cancelled.append(page)
+                raise
+        services = [{"id": f"s{i}", "name": "Shop", "type": "food"} for i in range(3)]
+        return ok({"total": 30, "list": services})
+
+    client = make_async_client(handler)
+    async with aclosing(client.iter_services("tea", size=3, prefetch=2)) as services:
+        async for _ in services:
+            await asyncio.sleep(0.01)
+            break
+    assert sorted(cancelled) == [2, 3]
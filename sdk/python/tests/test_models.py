@@ -0,0 +1,64 @@
+from a2e import Protocol, SearchResult
+
+from conftest import PROTOCOL, ok
+
+
+def with_unknown_keys() -> dict:
+    return {
+        **PROTOCOL,
+        "data_format": "json",
+        "service": {
+            **PROTOCOL["service"],
+            "provider": {"id": "p1", "name": "Tea Co", "rating": 4.8},
+        },
+        "authentication": {
+            "required": True,
+            "methods": [{"type": "phone", "otp_length": 6}],
+        },
+        "permissions": {
+            "required": [{"name": "order", "scope": "write"}],
+            "optional": [{"name": "location", "ttl": 60}],
+        },
+        "endpoints": [{**PROTOCOL["endpoints"][0], "examples": [{}]}],
+        "error_handling": {"codes": [{"code": "SOLD_OUT", "http_status": 409}]},
+    }
+
+
+def test_unknown_keys_are_ignored_at_every_level():
+    protocol = Protocol(**with_unknown_keys())
+    assert protocol.service.provider.name == "Tea Co"
+    assert protocol.authentication.methods[0].type == "phone"
+    assert protocol.permissions.required[0].name == "order"
+    assert protocol.permissions.optional[0].name == "location"
+    assert protocol.error_handling.codes[0].code == "SOLD_OUT"
+    assert protocol.get_endpoint("get_menu").path == "/menu"
+
+
+def test_repr_and_equality_do_not_raise_on_unknown_keys():
+    a = Protocol(**with_unknown_keys())
+    b = Protocol(**with_unknown_keys())
+    assert a == b
+    assert "SOLD_OUT" in repr(a)
+
+
+def test_to_dict_round_trips():
+    protocol = Protocol(**with_unknown_keys())
+    protocol.endpoints  # materialize one section, leave the rest raw
+    assert Protocol(**protocol.to_dict()) == protocol
+
+
+def test_search_rows_are_built_lazily():
+    result = SearchResult(1, [{"id": "s", "name": "n", "type": "t", "score": 1}])
+    assert type(result._list).__name__ == "_Raw"
+    assert result.list[0].id == "s"
+
+
+def test_api_results_ignore_unknown_keys(make_client):
+    def handler(request):
+        if request.url.path.endswith("/get_user_token"):
+            return ok({"consumer_token": "tok", "user_info": {"vip": True}, "scope": 1})
+        return ok({"status": "failed", "error": {"code": "X", "trace": "t"}, "x": 1})
+
+    client = make_client(handler)
+    assert client.get_consumer_token("sms", "1234").consumer_token == "tok"
+    assert client.execute("svc", "get_menu", "tok").error.code == "X"
@@ -0,0 +1,61 @@
+import json
+
+import httpx
+import pytest
+
+from a2e import AgentPipeline
+
+from conftest import PROTOCOL, Recorder, ok
+
+SEARCH = {"total": 1, "list": [{"id": "svc", "name": "Tea Shop", "type": "food"}]}
+
+
+def platform(rejected):
+    """Reject execute calls made with a token in ``rejected`` with a 401."""
+    issued = []
+
+    def handler(request):
+        path = request.url.path
+        if path.endswith("/get_user_token"):
+            issued.append(f"tok{len(issued) + 1}")
+            return ok({"consumer_token": issued[-1], "expires_in": 3600})
+        if path.endswith("/search"):
+            return ok(SEARCH)
+        if path.endswith("/protocol"):
+            return ok(PROTOCOL)
+        if "/execute/" in path:
+            if json.loads(request.content)["consumer_token"] in rejected:
+                return httpx.Response(401)
+            return ok({"execution_id": "e1", "status": "success"})
+        return httpx.Response(404)
+
+    return Recorder(handler)
+
+
+@pytest.mark.parametrize("method", ["run", "run_sequential"])
+async def test_rejected_token_is_refetched(make_async_client, method):
+    server = platform(rejected={"tok1"})
+    pipeline = AgentPipeline(make_async_client(server))
+    run = getattr(pipeline, method)
+    with pytest.raises(httpx.HTTPStatusError):
+        await run("tea", "get_menu", {}, auth=("sms", "1234"), discover=False)
+    result = await run("tea", "get_menu", {}, auth=("sms", "1234"), discover=False)
+    await pipeline.drain()
+    assert result.result.execution_id == "e1"
+    assert server.paths.count("/api/v1/open/platform/get_user_token") == 2
+
+
+async def test_explicit_token_is_used_as_given(make_async_client):
+    server = platform(rejected=set())
+    pipeline = AgentPipeline(make_async_client(server))
+    result = await pipeline.run(
+        "tea",
+        "get_menu",
+        {},
+        consumer_token="mine",
+        auth=("sms", "1234"),
+        discover=False,
+    )
+    await pipeline.drain()
+    assert result.result.execution_id == "e1"
+    assert "/api/v1/open/platform/get_user_token" not in server.paths
@@ -0,0 +1,81 @@
+import httpx
+
+from a2e import ProtocolCache
+
+from conftest import PROTOCOL, Recorder, ok
+
+
+def etag_server(etag='"v1"'):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return ok(PROTOCOL, headers={"ETag": etag})
+
+    return Recorder(handler)
+
+
+def test_fresh_entry_is_served_without_a_request(make_client):
+    server = etag_server()
+    client = make_client(server)
+    first = client.get_protocol("svc")
+    assert client.get_protocol("svc") is first
+    assert len(server.requests) == 1
+    assert client.protocol_cache.stats.hits == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(make_client):
+    server = etag_server()
+    cache = ProtocolCache(ttl=0)
+    client = make_client(server, protocol_cache=cache)
+    first = client.get_protocol("svc")
+    second = client.get_protocol("svc")
+    assert second is first
+    assert server.requests[1].headers["If-None-Match"] == '"v1"'
+    assert cache.stats.revalidations == 1
+
+
+def test_changed_document_replaces_entry(make_client):
+    server = etag_server()
+    cache = ProtocolCache(ttl=0)
+    client = make_client(server, protocol_cache=cache)
+    first = client.get_protocol("svc")
+    server.handler = etag_server('"v2"').handler
+    second = client.get_protocol("svc")
+    assert second is not first
+    assert second == first
+    assert cache.stats.revalidations == 0
+
+
+def test_invalidate_forces_download(make_client):
+    server = etag_server()
+    client = make_client(server)
+    client.get_protocol("svc")
+    client.protocol_cache.invalidate("svc")
+    client.get_protocol("svc")
+    assert "If-None-Match" not in server.requests[1].headers
+    assert len(server.requests) == 2
+
+
+def test_lru_eviction(make_client):
+    client = make_client(etag_server(), protocol_cache=ProtocolCache(maxsize=2))
+    for service_id in ("a", "b", "c"):
+        client.get_protocol(service_id)
+    assert "a" not in client.protocol_cache
+    assert client.protocol_cache.stats.evictions == 1
+
+
+def test_maxsize_zero_disables_cache(make_client):
+    server = etag_server()
+    client = make_client(server, protocol_cache=ProtocolCache(maxsize=0))
+    client.get_protocol("svc")
+    client.get_protocol("svc")
+    assert len(server.requests) == 2
+
+
+async def test_async_revalidation(make_async_client):
+    server = etag_server()
+    cache = ProtocolCache(ttl=0)
+    client = make_async_client(server, protocol_cache=cache)
+    first = await client.get_protocol("svc")
+    assert await client.get_protocol("svc") is first
+    assert cache.stats.revalidations == 1
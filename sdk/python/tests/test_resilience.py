@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from a2e import (
+    A2EError,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    ProtocolCache,
+    RetryPolicy,
+)
+
+from conftest import PROTOCOL, Recorder, ok
+
+
+def flaky(failures, status=503):
+    """Fail the first ``failures`` requests, then serve the protocol."""
+
+    def handler(request):
+        if len(server.requests) <= failures:
+            return httpx.Response(status, headers={"Retry-After": "1"})
+        return ok(PROTOCOL)
+
+    server = Recorder(handler)
+    return server
+
+
+def test_idempotent_call_is_retried(make_client):
+    server = flaky(2)
+    client = make_client(server)
+    assert client.get_protocol("svc").service.id == "svc"
+    assert len(server.requests) == 3
+
+
+def test_retries_give_up_after_max_attempts(make_client):
+    server = flaky(10)
+    client = make_client(server)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("svc")
+    assert len(server.requests) == 3
+
+
+def test_transport_errors_are_retried(make_client):
+    def handler(request):
+        if len(server.requests) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return ok(PROTOCOL)
+
+    server = Recorder(handler)
+    client = make_client(server)
+    client.get_protocol("svc")
+    assert len(server.requests) == 2
+
+
+def test_execute_is_not_retried(make_client):
+    server = flaky(1)
+    client = make_client(server)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.execute("svc", "get_menu", "tok")
+    assert len(server.requests) == 1
+
+
+def test_client_errors_are_not_retried(make_client):
+    server = flaky(1, status=404)
+    client = make_client(server)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("svc")
+    assert len(server.requests) == 1
+
+
+def test_breaker_opens_and_fails_fast(make_client):
+    server = flaky(100, status=500)
+    breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+    client = make_client(server, breakers=breakers, retry=RetryPolicy(max_attempts=1))
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get_protocol("svc")
+    with pytest.raises(CircuitOpenError) as info:
+        client.get_protocol("svc")
+    assert isinstance(info.value, A2EError)
+    assert len(server.requests) == 2
+    assert breakers.states()["svc"].state == "open"
+
+
+def test_breaker_probe_closes_circuit(make_client):
+    server = flaky(2, status=500)
+    breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=0)
+    client = make_client(server, breakers=breakers, retry=RetryPolicy(max_attempts=1))
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get_protocol("svc")
+    client.get_protocol("svc")
+    assert breakers.states()["svc"].state == "closed"
+
+
+def test_breakers_are_per_service(make_client):
+    def handler(request):
+        if "/broken/" in request.url.path:
+            return httpx.Response(500)
+        return ok(PROTOCOL)
+
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    client = make_client(handler, breakers=breakers, retry=RetryPolicy(max_attempts=1))
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("broken")
+    assert client.get_protocol("svc").service.id == "svc"
+
+
+async def test_async_retry(make_async_client):
+    server = flaky(2)
+    client = make_async_client(server)
+    protocol = await client.get_protocol("svc")
+    assert protocol.service.id == "svc"
+    assert len(server.requests) == 3
+
+
+def test_rate_limited_responses_count_as_failures(make_client):
+    server = flaky(100, status=429)
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    client = make_client(server, breakers=breakers, retry=RetryPolicy(max_attempts=1))
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_protocol("svc")
+    assert breakers.states()["svc"].state == "open"
+
+
+def test_non_transport_errors_do_not_count(make_client):
+    def handler(request):
+        raise RuntimeError("bug")
+
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    client = make_client(handler, breakers=breakers, retry=RetryPolicy(max_attempts=1))
+    with pytest.raises(RuntimeError):
+        client.get_protocol("svc")
+    assert breakers.states()["svc"].state == "closed"
+    assert breakers.states()["svc"].failures == 0
+
+
+async def test_cancelled_calls_do_not_count(make_async_client):
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.Event().wait()
+
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    client = make_async_client(handler, breakers=breakers)
+    task = asyncio.create_task(client.get_protocol("svc"))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert breakers.states()["svc"].state == "closed"
+    assert breakers.states()["svc"].failures == 0
+
+
+async def test_cancelled_probe_lets_the_next_probe_through(make_async_client):
+    started = asyncio.Event()
+
+    async def handler(request):
+        if not started.is_set():
+            started.set()
+            await asyncio.Event().wait()
+        return ok(PROTOCOL)
+
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    breaker = breakers.get("svc")
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 60
+    client = make_async_client(
+        handler, breakers=breakers, protocol_cache=ProtocolCache(maxsize=0)
+    )
+    task = asyncio.create_task(client.get_protocol("svc"))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert (await client.get_protocol("svc")).service.id == "svc"
+    assert breakers.states()["svc"].state == "closed"
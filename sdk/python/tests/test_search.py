@@ -0,0 +1,62 @@
+from a2e import ServiceIndex
+from a2e.search import tokenize
+
+
+def protocol(service_id, name, keywords=(), service_type="food", description=""):
+    return {
+        "service": {"id": service_id, "name": name, "type": service_type},
+        "semantic": {"description": description, "keywords": list(keywords)},
+        "endpoints": [],
+    }
+
+
+def index(*protocols):
+    idx = ServiceIndex()
+    idx.add_all(protocols)
+    return idx
+
+
+def ids(result):
+    return [s.id for s in result.list]
+
+
+def test_tokenize_bigrams_and_words():
+    assert tokenize("珍珠奶茶 Bubble-Tea") == ["珍珠", "珠奶", "奶茶", "bubble", "tea"]
+    assert tokenize("茶") == ["茶"]
+
+
+def test_single_character_query_matches_inside_words():
+    idx = index(
+        protocol("tea", "珍珠奶茶铺", ["奶茶", "果茶"]),
+        protocol("noodles", "兰州拉面", ["拉面"]),
+    )
+    assert ids(idx.search("茶")) == ["tea"]
+    assert ids(idx.search("奶")) == ["tea"]
+    assert idx.search("饭").total == 0
+
+
+def test_unigrams_do_not_match_multi_character_queries():
+    idx = index(
+        protocol("tea", "奶茶店", ["奶茶"]),
+        protocol("mixed", "牛奶红茶", ["牛奶", "红茶"]),
+    )
+    assert ids(idx.search("奶茶")) == ["tea"]
+
+
+def test_whole_word_ranks_above_character_inside_a_word():
+    idx = index(
+        protocol("inside", "奶茶店", ["奶茶"]),
+        protocol("word", "茶", ["茶"]),
+    )
+    assert ids(idx.search("茶")) == ["word", "inside"]
+
+
+def test_type_filter_paging_and_remove():
+    idx = index(*(protocol(f"s{i}", f"奶茶{i}号店", ["奶茶"]) for i in range(5)))
+    idx.add(protocol("cafe", "奶茶咖啡", ["奶茶"], service_type="coffee"))
+    assert idx.search("奶茶").total == 6
+    assert ids(idx.search("奶茶", service_type="coffee")) == ["cafe"]
+    assert len(idx.search("奶茶", page=2, size=4).list) == 2
+    assert idx.remove("cafe")
+    assert idx.search("奶茶", service_type="coffee").total == 0
+    assert idx.search("茶").total == 5
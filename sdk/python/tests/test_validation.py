@@ -0,0 +1,91 @@
+import pytest
+
+from a2e.validation import compile_schema
+
+ORDER = {
+    "type": "object",
+    "required": ["items", "phone"],
+    "additionalProperties": False,
+    "properties": {
+        "phone": {"type": "string", "minLength": 11, "pattern": "^1\\d+$"},
+        "note": {"type": ["string", "null"], "maxLength": 5},
+        "tip": {"type": "number", "minimum": 0, "maximum": 50},
+        "items": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["product_id"],
+                "properties": {
+                    "product_id": {"type": "integer"},
+                    "sugar": {"enum": ["full", "half", "none"]},
+                },
+            },
+        },
+    },
+}
+
+
+def test_valid_input_has_no_errors():
+    validate = compile_schema(ORDER)
+    value = {"phone": "13800000000", "note": None, "items": [{"product_id": 1}]}
+    assert validate(value) == []
+
+
+def test_errors_carry_json_paths():
+    validate = compile_schema(ORDER)
+    errors = validate(
+        {
+            "phone": "2",
+            "note": "too long",
+            "tip": 80,
+            "items": [{"product_id": True, "sugar": "lots"}, {}],
+            "extra": 1,
+        }
+    )
+    assert errors == [
+        "$.phone: shorter than 11",
+        "$.phone: does not match '^1\\\\d+$'",
+        "$.note: longer than 5",
+        "$.tip: greater than 50",
+        "$.items[0].product_id: expected integer",
+        "$.items[0].sugar: must be one of ['full', 'half', 'none']",
+        "$.items[1].product_id: is required",
+        "$.extra: is not allowed",
+    ]
+    assert validate("x") == ["$: expected object"]
+
+
+@pytest.mark.parametrize("name", ['a"b', "a\rb", "a\nb", "a{b}", "a\\b", "a'''b", " "])
+def test_property_names_are_literals(name):
+    validate = compile_schema(
+        {"required": [name], "properties": {name: {"type": "string"}}}
+    )
+    assert validate({}) == [f"$.{name}: is required"]
+    assert validate({name: 1}) == [f"$.{name}: expected string"]
+
+
+@pytest.mark.parametrize(
+    "schema, value",
+    [
+        ({"type": "string", "minLength": "x", "maxLength": -1, "pattern": 5}, "s"),
+        ({"type": "string", "pattern": "("}, "s"),
+        ({"type": "array", "minItems": 1.5, "maxItems": None}, [1]),
+        ({"type": "number", "minimum": "5", "maximum": [1]}, 7),
+        ({"type": "object", "properties": "bad", "required": "items"}, {}),
+        ({"type": "object", "properties": {"a": "bad", "b": None}}, {"a": 1}),
+        ({"type": "object", "required": [1, None, {"x": 1}]}, {}),
+        ({"type": [{"not": "a type"}, "object"], "enum": "abc"}, {}),
+    ],
+)
+def test_malformed_keywords_are_skipped(schema, value):
+    assert compile_schema(schema)(value) == []
+
+
+def test_non_dict_subschemas_are_ignored():
+    assert compile_schema({"items": "x", "properties": {"a": 1}})([1]) == []
+    assert compile_schema("not a schema")({"a": 1}) == []
+
+
+def test_empty_property_schemas_emit_no_code():
+    assert compile_schema({"properties": {"a": {}, "b": {"title": "B"}}})(1) == []
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from a2e import A2EClient, A2EError
+
+from conftest import Recorder
+
+
+def sse(version, status):
+    data = json.dumps({"order_no": "N1", "status": status})
+    return f"id: {version}\nevent: status\ndata: {data}\n\n"
+
+
+def resumable():
+    """Drop the stream after each event; resume from Last-Event-ID."""
+    events = [sse(1, "pending_payment"), sse(2, "paid"), sse(3, "completed")]
+
+    def handler(request):
+        after = int(request.headers.get("Last-Event-ID", 0))
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "text/event-stream"},
+            content=events[after].encode(),
+        )
+
+    return Recorder(handler)
+
+
+def test_resumes_with_last_event_id(make_client):
+    server = resumable()
+    client = make_client(server)
+    events = list(client.watch_order("svc", "N1", "tok"))
+    assert [(e.version, e.status) for e in events] == [
+        (1, "pending_payment"),
+        (2, "paid"),
+        (3, "completed"),
+    ]
+    assert events[-1].terminal
+    assert [r.headers.get("Last-Event-ID") for r in server.requests] == [None, "1", "2"]
+    assert server.requests[0].headers["X-Consumer-Token"] == "tok"
+
+
+async def test_async_resumes_with_last_event_id(make_async_client):
+    server = resumable()
+    client = make_async_client(server)
+    events = [e async for e in client.watch_order("svc", "N1", "tok")]
+    assert [e.status for e in events] == ["pending_payment", "paid", "completed"]
+    assert len(server.requests) == 3
+
+
+def test_gives_up_after_repeated_early_close(make_client):
+    client = make_client(lambda r: httpx.Response(200, content=b": ping\n\n"))
+    with pytest.raises(A2EError) as info:
+        list(client.watch_order("svc", "N1", "tok"))
+    assert info.value.code == "STREAM_CLOSED"
+
+
+async def test_async_timeout_between_heartbeats(make_async_client):
+    async def heartbeats():
+        while True:
+            yield b": ping\n\n"
+            await asyncio.sleep(5)
+
+    client = make_async_client(lambda r: httpx.Response(200, content=heartbeats()))
+    start = time.monotonic()
+    events = [e async for e in client.watch_order("svc", "N1", "tok", timeout=0.2)]
+    assert events == []
+    assert time.monotonic() - start < 2
+
+
+@pytest.fixture
+def heartbeat_server():
+    """A real HTTP server sending one SSE heartbeat every 5 seconds."""
+    stop = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            while not stop.is_set():
+                try:
+                    self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+                except OSError:
+                    return
+                stop.wait(5)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    stop.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_timeout_between_heartbeats(heartbeat_server):
+    with A2EClient(heartbeat_server) as client:
+        start = time.monotonic()
+        events = list(client.watch_order("svc", "N1", "tok", timeout=0.3))
+    assert events == []
+    assert time.monotonic() - start < 2